@@ -18,7 +18,7 @@ from apscheduler.schedulers.blocking import BlockingScheduler
 from apscheduler.triggers.cron import CronTrigger
 from apscheduler.triggers.interval import IntervalTrigger
 
-# from retrain.top3_transfer_retrain import model1_retrain
+from retrain.top3_transfer_retrain import model1_retrain
 from retrain.icu_congestion_retrain import model2_retrain
 from retrain.icu_discharge_retrain import model3_retrain
 
@@ -52,6 +52,15 @@ def run_in_process(target_func, *args, **kwargs):
 #     replace_existing=True
 # )
 
+# ─── Top3 Transfer pheromone 학습 (모델1) ──────
+scheduler.add_job(
+    func=lambda: run_in_process(model1_retrain),
+    trigger=CronTrigger(hour=0, minute=0),
+    id='top3_transfer_daily',
+    name='Top3 Transfer - 매일 00:00 pheromone 갱신',
+    replace_existing=True
+)
+
 # ─── ICU Congestion 재학습 (모델2) ───────────
 scheduler.add_job(
     func=lambda: run_in_process(model2_retrain),
@@ -1,18 +1,27 @@
 from fastapi import FastAPI, Request
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Any
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from fastapi.exceptions import RequestValidationError
 
 import subprocess
 import os
+import asyncio
 import logging
 from fastapi import FastAPI
 from contextlib import asynccontextmanager
 
-from recommend.top3_transfer_recommend import auto_transfer_recommend
-from recommend.icu_congestion_recommend import auto_congestion_recommend
-from recommend.icu_discharge_recommend import auto_recommend
+from recommend.top3_transfer_recommend import auto_transfer_recommend, auto_transfer_recommend_batch, auto_transfer_assign
+from recommend.icu_congestion_recommend import auto_congestion_recommend, LAG_OFFSETS as CONGESTION_OFFSETS
+from recommend.icu_discharge_recommend import auto_recommend, LAG_OFFSETS as DISCHARGE_OFFSETS
+from utils.snapshot_store import snapshot_store
+from utils.model_registry import model_registry
+from utils.scoring_executor import scoring_executor
+from utils.single_flight import single_flight
+from utils.response_cache import response_cache, render, etag_matches
+from utils.db_loader import log_breaker
+from utils.db_pool import db_pool
+from datetime import date
 
 from dotenv import load_dotenv
 load_dotenv()
@@ -31,7 +40,23 @@ async def lifespan(app: FastAPI):
         logger.info("스케줄러가 백그라운드에서 실행되었습니다.")
     except Exception as e:
         logger.error(f"스케줄러 실행 실패: {e}")
+
+    # 병상 스냅샷 poller: 추천 요청은 DB 대신 메모리 저장소에서 읽음
+    snapshot_store.start()
+    logger.info("병상 스냅샷 poller가 시작되었습니다.")
+
+    # 모델 사전 로딩: 요청 경로에서 unpickle이 일어나지 않도록 레지스트리를 미리 채움
+    asyncio.create_task(asyncio.to_thread(model_registry.preload))
+
+    # 모델 파일 watcher: nightly 재학습이 model/*.pkl을 교체하면 요청 경로 밖에서 재로딩
+    model_watcher = asyncio.create_task(model_registry.watch())
+
     yield  # 서버가 실행됨
+
+    model_watcher.cancel()
+    await snapshot_store.stop()
+    scoring_executor.shutdown()
+    await db_pool.adispose()
 #     logger.info("FastAPI 서버 종료")
 
 
@@ -48,6 +73,7 @@ class RecommendResponse(BaseModel):
     
 class ICDRequest(BaseModel):
     icd: str
+    origin: str | None = None   # 환자의 현재 병동 (병동명 또는 wardCd) — 없으면 1층 기준 거리
 
 # ─── ValidationError 핸들러: success=false 로 반환 ───────
 @app.exception_handler(RequestValidationError)
@@ -63,32 +89,148 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
         }
     )
     
+# ─── 요청 처리 원칙 ──────────────────────────
+# 엔드포인트는 async지만 추천 함수는 동기(pandas / numpy) 계산이므로
+#   1) 스냅샷은 snapshot_store에서 가져오고 (메모리에 있으면 루프에서 바로 읽고, 없을 때만 async DB 조회)
+#   2) 스냅샷 파싱 · 피처 생성 · 추론은 요청당 scoring_executor(고정 크기 스레드 풀) 제출 1회로 실행
+# → 느린 DB 조회나 계산 중에도 이벤트 루프가 다른 요청을 계속 처리
+#   3) 같은 입력 · 같은 스냅샷 버전의 동시 요청은 single_flight로 조회 + 계산 1회를 공유
+#   4) 성공 응답은 같은 key로 response_cache에 보관하고 ETag를 붙여서, 폴링 클라이언트는 304로 끝남
+#   5) DB 장애 시(timeout / breaker open) 마지막 스냅샷으로 응답하고 X-Snapshot-Age / X-Snapshot-Stale 헤더로 표시
+
+def data_versions() -> tuple:
+    """현재 스냅샷 버전(최신 reg_dtm), 날짜, 모델 버전"""
+    return (snapshot_store.version, date.today(), tuple(sorted(model_registry.versions().items())))
+
+def flight_key(endpoint: str, *inputs) -> tuple:
+    """single-flight / 응답 캐시 key: 엔드포인트 + 입력 + data_versions()"""
+    return (endpoint, inputs, *data_versions())
+
+def snapshot_headers(stale: bool) -> dict:
+    """응답에 쓰인 스냅샷의 reg_dtm / 경과 시간(초) / stale 여부 (stale: 응답 계산에 쓴 데이터가 stale이었는지)"""
+    version, age = snapshot_store.version, snapshot_store.age()
+    if version is None:
+        return {"X-Snapshot-Stale": "true"}
+    return {
+        "X-Snapshot-Time": version.isoformat(),
+        "X-Snapshot-Age": str(max(0, int(age))),
+        "X-Snapshot-Stale": "true" if stale or snapshot_store.stale else "false",
+    }
+
+async def cached_json(request: Request, key: tuple, compute) -> Response:
+    """
+    compute()가 만든 (응답 본문 dict, stale)을 캐시 / single-flight를 거쳐 반환.
+    스냅샷 버전을 아직 모르는 경우(key[2] is None), 실패 응답, 이전 이력으로 계산한 응답(stale)은 캐시하지 않음.
+    계산 도중 poller / 모델 교체로 버전이 바뀌었으면 결과가 어느 버전 데이터인지 알 수 없으므로 역시 캐시하지 않음.
+    """
+    entry, stale = response_cache.get(key), False   # 캐시에는 stale이 아닌 응답만 있음
+    if entry is None:
+        async def compute_entry():
+            content, stale = await compute()
+            entry = render(content)
+            if content.get("success") and key[2] is not None and not stale and key[2:5] == data_versions():
+                response_cache.put(key, entry)
+            return entry, stale
+
+        entry, stale = await single_flight.do(key, compute_entry)
+
+    headers = {"ETag": entry.etag, "Cache-Control": "no-cache", **snapshot_headers(stale)}
+    if etag_matches(request.headers.get("if-none-match"), entry.etag):
+        response_cache.not_modified += 1
+        return Response(status_code=304, headers=headers)
+    return Response(content=entry.body, status_code=200, media_type="application/json", headers=headers)
+
 # ─── model1: 전실 추천 (POST + JSON) ─────────────
+def transfer_result(result: dict | Exception) -> dict:
+    """auto_transfer_recommend 결과(또는 예외) → success / result 응답 본문"""
+    if isinstance(result, Exception):
+        return {
+            "success": False,
+            "result": {
+                "message": f"전실 추천 오류: {result}",
+                "ward": []
+            }
+        }
+
+    ward_list = [w["ward"] for w in result.get("recommended_wards", [])]
+    if not ward_list:
+        return {
+            "success": False,
+            "result": {
+                "message": "추천 가능한 병동이 없습니다.",
+                "ward": []
+            }
+        }
+
+    return {
+        "success": True,
+        "result": {
+            "ward": ward_list
+        }
+    }
+
 @app.post("/transfer/recommend", response_model=RecommendResponse)
-async def recommend_transfer(req: ICDRequest):
-    try:
-        icd_code = req.icd.strip().upper()
-        result = auto_transfer_recommend(icd_code)
-        ward_list = [w["ward"] for w in result.get("recommended_wards", [])]
-
-        if not ward_list:
-            return JSONResponse(
-                status_code=200,
-                content={
-                    "success": False,
-                    "result": {
-                        "message": "추천 가능한 병동이 없습니다.",
-                        "ward": []
-                    }
-                }
-            )
+async def recommend_transfer(req: ICDRequest, request: Request):
+    icd_code = req.icd.strip().upper()
+
+    async def compute():
+        try:
+            _, stale = await snapshot_store.alatest()
+            return transfer_result(await scoring_executor.run(auto_transfer_recommend, icd_code, req.origin)), stale
+        except Exception as e:
+            return transfer_result(e), False
+
+    return await cached_json(request, flight_key("transfer", icd_code, req.origin), compute)
+
+# ─── model1: 전실 일괄 추천 (회진용, 여러 환자) ─────────
+class PatientICD(BaseModel):
+    icd: str
+    patient_id: str | None = None
+    origin: str | None = None
 
+# 한 요청의 환자 수 상한 (병동 회진 1회 규모) — joint=true는 환자 × 병동 비용 행렬 배정을 scoring 풀에서 돌리므로
+MAX_BATCH_PATIENTS = 200
+
+class BatchICDRequest(BaseModel):
+    patients: list[PatientICD] = Field(..., min_length=1, max_length=MAX_BATCH_PATIENTS)
+    joint: bool = False   # True: 빈 병상 수를 지키며 환자별 병동 1개씩 동시 배정
+
+def assign_result(assigned: dict | None) -> dict:
+    """auto_transfer_assign 환자별 결과 → success / result 응답 본문"""
+    if assigned is None:
+        return {
+            "success": False,
+            "result": {
+                "message": "배정 가능한 빈 병상이 없습니다.",
+                "ward": []
+            }
+        }
+    return {
+        "success": True,
+        "result": {
+            "ward": [assigned["ward"]]
+        }
+    }
+
+@app.post("/transfer/recommend/batch")
+async def recommend_transfer_batch(req: BatchICDRequest):
+    try:
+        icd_codes = [p.icd.strip().upper() for p in req.patients]
+        origins = [p.origin for p in req.patients]
+        await snapshot_store.alatest()
+        if req.joint:
+            results = [assign_result(a) for a in await scoring_executor.run(auto_transfer_assign, icd_codes, origins)]
+        else:
+            results = [transfer_result(r) for r in await scoring_executor.run(auto_transfer_recommend_batch, icd_codes, origins)]
         return JSONResponse(
             status_code=200,
             content={
                 "success": True,
                 "result": {
-                    "ward": ward_list
+                    "patients": [
+                        {"patient_id": p.patient_id, "icd": icd_code, **r}
+                        for p, icd_code, r in zip(req.patients, icd_codes, results)
+                    ]
                 }
             }
         )
@@ -99,8 +241,8 @@ async def recommend_transfer(req: ICDRequest):
             content={
                 "success": False,
                 "result": {
-                    "message": f"전실 추천 오류: {e}",
-                    "ward": []
+                    "message": f"전실 일괄 추천 오류: {e}",
+                    "patients": []
                 }
             }
         )
@@ -108,68 +250,91 @@ async def recommend_transfer(req: ICDRequest):
 from fastapi import Query
 
 # ─── model2: ICU 혼잡도 (POST) ────────────────
-@app.post("/congestion/recommend")
-async def recommend_congestion():
-    try:
-        res = auto_congestion_recommend({})
-
-        # 실패한 경우 그대로 반환
-        if not res.get("success", False):
-            return JSONResponse(status_code=200, content=res)
+def congestion_content(res: dict) -> dict:
+    """auto_congestion_recommend 결과 → success / result 응답 본문"""
+    # 실패한 경우 그대로 반환
+    if not res.get("success", False):
+        return res
 
-        # 성공한 경우: prediction이 없으면 에러로 처리
-        result = res.get("result", {})
-        if "prediction" not in result:
-            raise ValueError("예측 결과 'prediction'이 없습니다.")
+    # 성공한 경우: prediction이 없으면 에러로 처리
+    result = res.get("result", {})
+    if "prediction" not in result:
+        raise ValueError("예측 결과 'prediction'이 없습니다.")
 
-        prediction = int(result["prediction"])
-        return JSONResponse(
-            status_code=200,
-            content={
-                "success": True,
-                "result": {
-                    "prediction": prediction
-                }
-            }
-        )
+    prediction = int(result["prediction"])
+    return {
+        "success": True,
+        "result": {
+            "prediction": prediction,
+            "threshold": result.get("threshold"),
+            "wards": result.get("wards", [])
+        }
+    }
 
-    except Exception as e:
-        return JSONResponse(
-            status_code=200,
-            content={
+@app.post("/congestion/recommend")
+async def recommend_congestion(request: Request):
+    async def compute():
+        try:
+            snapshots, stale = await snapshot_store.aget_days(CONGESTION_OFFSETS)
+            res = await scoring_executor.run(auto_congestion_recommend, {}, snapshots)
+            return congestion_content(res), stale
+        except Exception as e:
+            return {
                 "success": False,
                 "result": {
                     "message": f"혼잡도 예측 오류: {str(e)}",
                     "prediction": None
                 }
-            }
-        )
+            }, False
+
+    return await cached_json(request, flight_key("congestion"), compute)
 # ─── model3: ICU 퇴실 추천 (POST) ────────────────
-@app.post("/discharge/recommend")
-async def recommend_discharge():
-    try:
-        prediction = auto_recommend()
+def discharge_content(res: dict) -> dict:
+    """auto_recommend 결과 → success / result 응답 본문"""
+    # 실패한 경우 그대로 반환
+    if not res.get("success", False):
+        return res
 
-        return JSONResponse(
-            status_code=200,
-            content={
-                "success": True,
-                "result": {
-                    "prediction": prediction
-                }
-            }
-        )
-    except Exception as e:
-        return JSONResponse(
-            status_code=200,
-            content={
+    # 성공한 경우: 병동 평균 prediction + 병동별 예측
+    result = res.get("result", {})
+    return {
+        "success": True,
+        "result": {
+            "prediction": result.get("prediction"),
+            "wards": result.get("wards", [])
+        }
+    }
+
+@app.post("/discharge/recommend")
+async def recommend_discharge(request: Request):
+    async def compute():
+        try:
+            snapshots, stale = await snapshot_store.aget_days(DISCHARGE_OFFSETS)
+            res = await scoring_executor.run(auto_recommend, snapshots)
+            return discharge_content(res), stale
+        except Exception as e:
+            return {
                 "success": False,
                 "result": {
                     "message": f"퇴원 예측 오류: {str(e)}",
                     "prediction": None
                 }
-            }
-        )
+            }, False
+
+    return await cached_json(request, flight_key("discharge"), compute)
+
+# ─── 응답 캐시 / single-flight 통계 ─────────────
+@app.get("/cache/stats")
+async def cache_stats():
+    return {
+        "response_cache": response_cache.stats(),
+        "single_flight": single_flight.stats(),
+        "log_db": log_breaker.stats(),
+        "db_pool": db_pool.stats(),
+        "snapshot_stale": snapshot_store.stale,
+        "snapshot_version": snapshot_store.version.isoformat() if snapshot_store.version else None,
+        "model_versions": model_registry.versions(),
+    }
 # ─── 루트 엔드포인트 ────────────────────────
 @app.get("/")
 def root():
@@ -178,8 +343,10 @@ def root():
         "endpoints": [
             "/health-check",
             "/transfer/recommend",
+            "/transfer/recommend/batch",
             "/congestion/recommend",
-            "/discharge/recommend"
+            "/discharge/recommend",
+            "/cache/stats"
         ]
     }
 
@@ -0,0 +1,40 @@
+# recommend/aco_colony.py >> model1 pheromone 학습용 개미 군집 시뮬레이션 (NumPy 배열)
+import numpy as np
+
+ETA_EPS = 1e-6        # 빈 병상이 없는 병동도 아주 낮은 확률로는 선택되도록
+CHUNK_ANT_CELLS = 4_000_000   # (사건 × 개미 × 병동) 한 번에 펼칠 최대 크기
+
+
+def colony_deposits(tau: np.ndarray, pr_tr: np.ndarray, candidates: np.ndarray, avail: np.ndarray,
+                    ev_rows: np.ndarray, ev_cols: np.ndarray, ev_snaps: np.ndarray, ev_weights: np.ndarray,
+                    alpha: float, beta: float, n_ants: int, elite: float, seed) -> np.ndarray:
+    """
+    관측된 전실 사건마다 개미 n_ants마리를 한꺼번에 풀어 (ICD × 병동) pheromone 적립량을 계산.
+
+    - 개미는 해당 ICD의 후보 병동(candidates) 중 tau^alpha · eta^beta 비율로 병동 하나를 고름
+      (eta = pr · tr · 사건 시점 스냅샷의 가용률)
+    - 실제 전실 병동을 고른 개미 비율 + elite(관측 경로 자체의 적립)만큼 ev_weights를 곱해 관측 병동에 적립
+    반환: tau와 같은 shape의 적립량 행렬
+    """
+    rng = np.random.default_rng(seed)
+    deposits = np.zeros_like(tau)
+    n_events, n_wards = len(ev_rows), tau.shape[1]
+    step = max(1, CHUNK_ANT_CELLS // max(1, n_ants * n_wards))
+
+    for start in range(0, n_events, step):
+        rows = ev_rows[start:start + step]
+        cols = ev_cols[start:start + step]
+
+        eta = pr_tr[rows] * avail[ev_snaps[start:start + step]] + ETA_EPS
+        weights = np.where(candidates[rows], tau[rows] ** alpha * eta ** beta, 0.0)
+        cdf = np.cumsum(weights, axis=1)
+        cdf /= cdf[:, -1:]
+
+        # 개미별 균등난수 → 누적확률 구간으로 선택 병동 결정 (사건 × 개미)
+        u = rng.random((len(rows), n_ants))
+        choice = (u[:, :, None] > cdf[:, None, :]).sum(axis=2)
+        hit_rate = (choice == cols[:, None]).mean(axis=1)
+
+        np.add.at(deposits, (rows, cols), ev_weights[start:start + step] * (hit_rate + elite))
+    return deposits
+
@@ -0,0 +1,72 @@
+# recommend/congestion_ensemble.py >> model2 앙상블 일괄 추론 (병동 행 전체 × 멤버 전체)
+import numpy as np
+import pandas as pd
+
+from recommend.oblivious_trees import ObliviousTrees, load_tree_bundle
+from utils.ward_snapshot import MODEL2_FEATURES
+
+DEFAULT_THRESHOLD = 0.5
+
+
+class CongestionEnsemble:
+    """
+    model2 번들의 모든 멤버로 병동 행 전체를 한 번에 추론.
+
+    - 초기 학습 번들 {"scaler", "models": [CatBoost × 20], "threshold_logic"}
+        : 이름 없이(numpy) 학습된 멤버 → MODEL2_FEATURES 순서 + scaler 적용
+    - 재학습 번들 {"models": [model]}
+        : 피처 이름으로 학습된 멤버 → 이름으로 열을 골라 입력 (cat feature 포함)
+    멤버(ObliviousTrees)는 로딩 시 트리를 이어 붙인 평가기 하나로 병합해 두고,
+    요청마다 (병동 × 멤버) 확률을 배열 연산 1회로 계산 → 평균이 threshold 이상이면 혼잡(1).
+    """
+
+    def __init__(self, models: list[ObliviousTrees], scaler=None, threshold: float = DEFAULT_THRESHOLD):
+        if not models:
+            raise ValueError("'models' 키에 유효한 모델 리스트가 없습니다.")
+        self.models = list(models)
+        self.scaler = scaler
+        self.threshold = float(threshold)
+        self.merged = ObliviousTrees.merge(self.models)   # 피처 구성이 다르면 ValueError
+
+        names = self.merged.feature_names
+        self.positional = all(n.isdigit() for n in names)
+        if self.positional and len(names) != len(MODEL2_FEATURES):
+            raise ValueError(f"model2 피처 수가 맞지 않습니다: {len(names)} != {len(MODEL2_FEATURES)}")
+
+    @classmethod
+    def from_bundle(cls, bundle: dict) -> "CongestionEnsemble":
+        models = bundle.get("models")
+        if not models or not isinstance(models, (list, tuple)):
+            raise ValueError("'models' 키에 유효한 모델 리스트가 없습니다.")
+        logic = bundle.get("threshold_logic") or {}
+        threshold = bundle.get("threshold", logic.get("default_thr", DEFAULT_THRESHOLD))
+        return cls(models, bundle.get("scaler"), threshold)
+
+    # ─── 입력 구성 ─────────────────────────────
+    def inputs(self, ward_codes: list[str], X: np.ndarray):
+        """model2_features 결과(병동코드, 병동 × MODEL2_FEATURES) → 멤버 공용 입력"""
+        if self.positional:
+            return self.scaler.transform(X) if self.scaler is not None else np.asarray(X, dtype=float)
+
+        columns = {"wardCd": ward_codes, "ward_code": ward_codes, **dict(zip(MODEL2_FEATURES, X.T))}
+        missing = [n for n in self.merged.feature_names if n not in columns]
+        if missing:
+            raise ValueError(f"model2 입력 피처를 만들 수 없습니다: {missing}")
+        return pd.DataFrame({n: columns[n] for n in self.merged.feature_names})
+
+    # ─── 추론 ─────────────────────────────────
+    def member_probas(self, inputs) -> np.ndarray:
+        """(멤버 × 병동) 양성 확률"""
+        return self.merged.member_probas(inputs)
+
+    def predict(self, ward_codes: list[str], X: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """병동별 (앙상블 평균 확률, 혼잡 여부 0/1)"""
+        if len(ward_codes) == 0:
+            return np.zeros(0), np.zeros(0, dtype=int)
+        proba = self.member_probas(self.inputs(ward_codes, X)).mean(axis=0)
+        return proba, (proba >= self.threshold).astype(int)
+
+
+def load_ensemble(path) -> CongestionEnsemble:
+    """model_registry 로더: 트리 번들 JSON → CongestionEnsemble (pickle은 python -m recommend.oblivious_trees로 먼저 변환)"""
+    return CongestionEnsemble.from_bundle(load_tree_bundle(path))
@@ -24,7 +24,6 @@
 # }
 
 # BASE_FLOOR = 1
-# WARD_DISTANCES = {w: abs(f - BASE_FLOOR) * 0.1 for w, f in WARD_FLOORS.items()}
 
 # RAW_PRIORITY_WEIGHTS = {
 #     ('I46','심혈관계중환자실'):0.257, ('I46','83병동'):0.242, ('I46','내과ICU'):0.217,
@@ -165,8 +164,18 @@
 #     fallback = self.edges.get(icd, [])[:top_k]
 #     return [(w, 0.0) for w in fallback]
 #hybrid_scheduler.py
+import json
+import os
 from collections import defaultdict
+from datetime import date, timedelta
+import numpy as np
 import pandas as pd
+from scipy.optimize import linear_sum_assignment
+
+from recommend.aco_colony import colony_deposits
+from recommend.ward_topology import WardTopology
+
+from utils.ward_snapshot import USE, WARD_NAMES, WardSnapshot
 
 # --------- 하이퍼파라미터 ---------
 ALPHA = 1.0
@@ -175,6 +184,14 @@ PHER_INIT = 1.0
 OCC_WEIGHT = 0.7
 DIST_WEIGHT = 0.3
 
+# --------- ACO pheromone 학습 (update_feedback) ---------
+RHO = 0.1            # 하루 증발률
+N_ANTS = 32          # 관측 사건 1건당 개미 수
+Q_DEPOSIT = 0.3      # ICD별 하루 적립 총량 (관측 병동 비율로 나눔)
+ELITE_WEIGHT = 1.0   # 관측 경로 자체의 적립 가중치
+TAU_MIN = 0.1        # MMAS 하한: 한 번도 관측되지 않은 병동도 후보로 남도록
+TAU_MAX = 5.0
+
 # --------- 병동 관련 정보 ---------
 WARD_TOTALS = {
     '심혈관 일일입원실': 27, '응급센터': 0, '내과ICU': 0, '외과ICU': 30, '응급중환자실': 13,
@@ -190,7 +207,18 @@ WARD_FLOORS = {
 }
 
 BASE_FLOOR = 1
-WARD_DISTANCES = {w: abs(f - BASE_FLOOR) * 0.1 for w, f in WARD_FLOORS.items()}
+
+# --------- 병동 배치 (이동 비용 그래프) ---------
+# 실제 건물 / 연결 통로 / 엘리베이터 데이터가 들어오기 전까지의 자리표시 배치:
+# 본관 1개 동에 모든 병동, 연결 통로 없음 → 이동 비용은 기존 abs(층 - 1) * 0.1과 같다
+MAIN_BUILDING = '본관'
+WARD_LOCATIONS = {w: (MAIN_BUILDING, f) for w, f in WARD_FLOORS.items()}   # 병동 → (건물, 층)
+BUILDING_LINKS = []     # 건물 간 연결 통로: ((건물, 층), (건물, 층), 층 수 단위 비용)
+FLOOR_COST = 0.1        # 한 층 이동 비용
+
+WARD_TOPOLOGY = WardTopology(WARD_LOCATIONS, links=BUILDING_LINKS, unit_cost=FLOOR_COST)
+# 출발 병동을 모를 때의 기본 거리: 1층(응급센터)에서 각 병동까지
+WARD_DISTANCES = WARD_TOPOLOGY.costs_from((MAIN_BUILDING, BASE_FLOOR))
 
 RAW_PRIORITY_WEIGHTS = {
     ('I46','심혈관계중환자실'):0.257, ('I46','83병동'):0.242, ('I46','내과ICU'):0.217,
@@ -218,6 +246,19 @@ EDGES_BY_ICD = {
     'I63':['75병동','뇌졸중집중치료실','76병동','응급중환자실','응급센터','외과ICU']
 }
 
+# dissCd(병상 API 질환 구분) → 대표 ICD
+CODE_TO_ICD = {
+    "01": "I21",
+    "02": "I63",
+    "03": "I60",
+    "04": "I71",
+    "05": "I71",
+}
+
+# --------- model1 파라미터 파일 (model/model1.json) ---------
+PARAMS_FORMAT = "rmrp-model1-params"
+PARAMS_SCHEMA_VERSION = 1
+
 def normalize(raw_pw):
     totals = defaultdict(float)
     for (icd, ward), v in raw_pw.items():
@@ -233,6 +274,208 @@ def make_state_from_df(df: pd.DataFrame) -> dict:
     ).reset_index()
     return {r.ward: {'total': int(r.total), 'occupied': int(r.occupied)} for r in agg.itertuples()}
 
+def make_state_from_snapshot(snap: WardSnapshot) -> dict:
+    """
+    모델 1 WardSnapshot(병동명 기준 합산) → make_state_from_df와 같은 state.
+    DataFrame 생성 없이 배열에서 바로 만들고, 병동 순서도 groupby와 같은 병동명 정렬 순.
+    """
+    total = snap.total_beds
+    occupied = snap.counts[:, USE]
+    slots = sorted(np.flatnonzero(snap.present), key=lambda s: WARD_NAMES[s])
+    return {WARD_NAMES[s]: {'total': int(total[s]), 'occupied': int(occupied[s])} for s in slots}
+
+class ScoreMatrix:
+    """
+    HybridScheduler 파라미터를 ICD × 병동 NumPy 배열로 펼친 점수 계산기.
+
+    - pw / tau(pheromone) : (ICD × 병동) 행렬, dist : 병동 벡터, tr_eta / tr_cost : ICD 벡터
+    - travel : (출발 병동 × 병동) 이동 비용 행렬 (WARD_TOPOLOGY). 출발 병동을 모르면 dist 사용
+    - 마지막 행/열은 파라미터에 없는 ICD/병동 자리로, dict .get()의 기본값과 같은 값을 가짐
+    - 실시간 병상(state)은 병동 벡터(total, occupied)로 바꿔서 한 번에 계산
+    계산 순서는 combined_score와 같으므로 결과도 dict 기반 계산과 동일하다.
+    """
+
+    NOT_EDGE = np.iinfo(np.intp).max
+
+    def __init__(self, scheduler: "HybridScheduler"):
+        self.alpha = scheduler.alpha
+        self.beta = scheduler.beta
+        self.edges = {icd: tuple(wards) for icd, wards in scheduler.edges.items()}
+
+        icds = set(self.edges) | set(scheduler.transfer_rates)
+        wards = set(scheduler.distances) | set(WARD_TOTALS) | set(WARD_TOPOLOGY.wards)
+        for icd, w in list(scheduler.pw) + list(scheduler.pheromone):
+            icds.add(icd)
+            wards.add(w)
+        for ws in self.edges.values():
+            wards.update(ws)
+
+        self.icds = tuple(sorted(icds))
+        self.wards = tuple(sorted(wards))
+        self.icd_index = {icd: i for i, icd in enumerate(self.icds)}
+        self.ward_index = {w: j for j, w in enumerate(self.wards)}
+        self.default_icd = len(self.icds)      # 파라미터에 없는 ICD 행
+        self.default_ward = len(self.wards)    # 파라미터에 없는 병동 열
+
+        shape = (len(self.icds) + 1, len(self.wards) + 1)
+        self.pw = np.full(shape, 0.01)
+        self.tau = np.full(shape, float(PHER_INIT))
+        for (icd, w), v in scheduler.pw.items():
+            self.pw[self.icd_index[icd], self.ward_index[w]] = v
+        for (icd, w), v in scheduler.pheromone.items():
+            self.tau[self.icd_index[icd], self.ward_index[w]] = v
+
+        self.tr_eta = np.full(shape[0], 0.01)    # compute_eta 기본값
+        self.tr_cost = np.full(shape[0], 0.5)    # compute_cost 기본값
+        for icd, v in scheduler.transfer_rates.items():
+            self.tr_eta[self.icd_index[icd]] = self.tr_cost[self.icd_index[icd]] = v
+
+        self.dist = np.zeros(shape[1])
+        for w, v in scheduler.distances.items():
+            self.dist[self.ward_index[w]] = v
+
+        # 출발 병동별 이동 비용: 배치 그래프에 있는 (출발, 도착) 쌍만 그래프 값, 나머지(마지막 행 포함)는 dist
+        self.travel = np.tile(self.dist, (shape[1], 1))
+        topo = [w for w in self.wards if w in WARD_TOPOLOGY.ward_index]
+        at = np.array([self.ward_index[w] for w in topo], dtype=np.intp)
+        src = np.array([WARD_TOPOLOGY.ward_index[w] for w in topo], dtype=np.intp)
+        sub = WARD_TOPOLOGY.matrix[np.ix_(src, src)]
+        self.travel[np.ix_(at, at)] = np.where(np.isfinite(sub), sub, self.travel[np.ix_(at, at)])
+
+        # state와 무관한 항은 미리 계산해서 한 배열로 묶어 둠 (요청당 fancy index 1회)
+        #   [0] tau ** alpha   [1] pr * tr   [2] 1 - pr
+        tau_a = [[t ** self.alpha for t in row] for row in self.tau.tolist()]
+        self.params = np.stack([np.array(tau_a), self.pw * self.tr_eta[:, None], 1 - self.pw])
+        self.tr_term = DIST_WEIGHT * (1 - self.tr_cost)
+
+        # ICD별 후보 병동의 edges 순서 (후보가 아니면 NOT_EDGE) — 동점일 때 후보 순서를 지키는 정렬 키
+        self.edge_pos = np.full(shape, self.NOT_EDGE, dtype=np.intp)
+        for icd, ws in self.edges.items():
+            for k, w in reversed(list(enumerate(ws))):   # 중복 병동은 첫 위치
+                self.edge_pos[self.icd_index[icd], self.ward_index[w]] = k
+
+    # ─── state → 병동 벡터 ─────────────────────────
+    def state_vectors(self, state: dict, wards: list[str]) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """wards 순서의 (행렬 열 인덱스, total, occupied) 벡터"""
+        cols = np.array([self.ward_index.get(w, self.default_ward) for w in wards], dtype=np.intp)
+        total = np.array([state[w]['total'] for w in wards], dtype=float)
+        occupied = np.array([state[w]['occupied'] for w in wards], dtype=float)
+        return cols, total, occupied
+
+    def rows(self, icds: list[str]) -> np.ndarray:
+        return np.array([self.icd_index.get(icd, self.default_icd) for icd in icds], dtype=np.intp)
+
+    def origin_rows(self, origins: list[str | None]) -> np.ndarray:
+        """출발 병동 → travel 행 인덱스 (None / 모르는 병동은 기본 거리 행)"""
+        return np.array([self.ward_index.get(o, self.default_ward) for o in origins], dtype=np.intp)
+
+    # ─── 점수 ─────────────────────────────────
+    def score(self, rows: np.ndarray, cols: np.ndarray, total: np.ndarray, occupied: np.ndarray,
+              origins: np.ndarray | None = None) -> np.ndarray:
+        """(len(rows) × len(cols)) combined_score 행렬 (origins: rows와 같은 길이의 travel 행 인덱스)"""
+        avail = np.maximum((total - occupied) / total, 0) if total.all() else None
+        non_positive = total <= 0
+        if non_positive.any():
+            if avail is None:
+                # compute_cost의 occupied / total과 동일하게 처리
+                raise ZeroDivisionError("division by zero")
+            avail[non_positive] = 0   # compute_eta: total <= 0 이면 가용률 0
+
+        tau_a, pr_tr, one_minus_pr = self.params[:, rows[:, None], cols]
+        dist = self.dist[cols] if origins is None else self.travel[origins[:, None], cols]
+        cost = one_minus_pr + OCC_WEIGHT * (occupied / total) + self.tr_term[rows, None] + dist
+        return tau_a * (pr_tr * avail) ** self.beta - cost
+
+    def rank_all(self, state: dict, icds: list[str], top_k: int = 1,
+                 origin: str | None = None) -> dict[str, list | Exception]:
+        """
+        여러 ICD의 HybridScheduler.recommend 결과를 점수 행렬 1회 계산으로 생성 → {icd: 순위 목록 | 예외}. (출발 병동 origin 공통)
+        후보: edges 중 state에 있는 병동 → 없으면 state 전체 병동, 점수 내림차순(동점은 후보 순서 유지).
+        후보 마스킹 / 정렬도 (ICD × 병동) 배열 한 번으로 처리하고, 병상 0인 병동을 후보로 삼는 ICD만 ZeroDivisionError.
+        """
+        wards = list(state)
+        if not wards:
+            return {icd: [] for icd in icds}
+        cols, total, occupied = self.state_vectors(state, wards)
+        rows = self.rows(icds)
+        zero = total == 0
+        origins = None if origin is None else np.full(len(icds), self.ward_index.get(origin, self.default_ward))
+        scores = self.score(rows, cols, np.where(zero, 1, total), occupied, origins)
+
+        pos = self.edge_pos[rows[:, None], cols]
+        candidate = pos != self.NOT_EDGE
+        counts = candidate.sum(axis=1)
+        fallback = counts == 0                    # 후보가 state에 하나도 없음 → state 전체, state 순서
+        if fallback.any():
+            candidate[fallback] = True
+            pos[fallback] = np.arange(len(wards))
+            counts[fallback] = len(wards)
+        errors = (candidate & zero).any(axis=1).tolist() if zero.any() else [False] * len(icds)
+
+        # (점수 내림차순, 후보 순서) 정렬을 행렬 전체에 한 번 — 후보가 아닌 열은 +inf로 뒤로 보냄
+        order = np.lexsort((pos, np.where(candidate, -scores, np.inf)), axis=-1)[:, :top_k].tolist()
+        values, counts = scores.tolist(), counts.tolist()
+
+        result = {}
+        for i, icd in enumerate(icds):
+            if errors[i]:
+                result[icd] = ZeroDivisionError("division by zero")
+            else:
+                row = values[i]
+                result[icd] = [(wards[j], row[j]) for j in order[i][:counts[i]]]
+        return result
+
+    def assign(self, icds: list[str], state: dict,
+               origins: list[str | None] | None = None) -> list[tuple[str, float] | None]:
+        """
+        여러 환자를 빈 병상 수를 넘지 않게 동시에 배정 → 환자 순서대로 (병동, 점수) | None(배정 불가).
+        origins: 환자별 출발 병동 (없으면 기본 거리)
+
+        - 후보 병동은 recommend와 같은 규칙 (edges 중 state에 있는 병동, 없으면 state 전체)
+        - 빈 병상(total - occupied) 1개를 열 1개로 펼친 (환자 × 병상) 행렬에서
+          ① 배정 인원 최대 ② combined_score 합 최대 순으로 linear_sum_assignment로 푼다
+        """
+        result: list[tuple[str, float] | None] = [None] * len(icds)
+        free_wards = [w for w in state if state[w]['total'] - state[w]['occupied'] > 0]
+        if not icds or not free_wards:
+            return result
+
+        origins = origins or [None] * len(icds)
+        uniq = list(dict.fromkeys(zip(icds, origins)))    # (ICD, 출발 병동)이 같은 환자는 같은 점수 행
+        cols, total, occupied = self.state_vectors(state, free_wards)
+        scores = self.score(self.rows([icd for icd, _ in uniq]), cols, total, occupied,
+                            self.origin_rows([o for _, o in uniq]))
+
+        ward_pos = {w: j for j, w in enumerate(free_wards)}
+        allowed = np.zeros(scores.shape, dtype=bool)
+        for i, (icd, _) in enumerate(uniq):
+            candidates = [w for w in self.edges.get(icd, ()) if w in state]
+            if candidates:
+                allowed[i, [ward_pos[w] for w in candidates if w in ward_pos]] = True
+            else:
+                allowed[i] = True
+
+        # 병동 열을 빈 병상 수만큼 복제 (환자 수보다 많이 복제할 필요는 없음)
+        free = (total - occupied).astype(np.intp)
+        slot_ward = np.repeat(np.arange(len(free_wards)), np.minimum(free, len(icds)))
+        icd_pos = {key: i for i, key in enumerate(uniq)}
+        patient_row = np.array([icd_pos[key] for key in zip(icds, origins)])[:, None]
+        slot_scores = scores[patient_row, slot_ward]
+        slot_allowed = allowed[patient_row, slot_ward]
+        if not slot_allowed.any():
+            return result
+
+        # 후보가 아닌 칸은 큰 비용 M: 허용 칸 하나를 더 배정하는 쪽이 항상 이득이 되도록
+        # M > (배정 가능 최대 인원) × (허용 칸 비용 폭)
+        cost = -slot_scores
+        lo, hi = cost[slot_allowed].min(), cost[slot_allowed].max()
+        cost = np.where(slot_allowed, cost - lo, (hi - lo) * min(cost.shape) + 1)
+
+        for r, c in zip(*linear_sum_assignment(cost)):
+            if slot_allowed[r, c]:
+                result[r] = (free_wards[slot_ward[c]], float(slot_scores[r, c]))
+        return result
+
 class HybridScheduler:
     def __init__(self):
         self.alpha = ALPHA
@@ -251,56 +494,211 @@ class HybridScheduler:
         avail = max((s['total'] - s['occupied']) / s['total'], 0) if s['total'] > 0 else 0
         return pr * tr * avail
 
-    def compute_cost(self, icd, ward, state):
+    def compute_cost(self, icd, ward, state, origin=None):
         pr = self.pw.get((icd, ward), 0.01)
         s = state.get(ward, {'total': 1, 'occupied': 0})
         occ_ratio = s['occupied'] / s['total']
+        # 출발 병동을 알면 배치 그래프의 이동 비용, 모르면(또는 그래프에 없으면) 기본 거리
         dist = self.distances.get(ward, 0)
+        if origin in WARD_TOPOLOGY.ward_index:
+            dist = WARD_TOPOLOGY.cost(origin, ward, default=dist)
         tr = self.transfer_rates.get(icd, 0.5)
         return (1 - pr) + OCC_WEIGHT * occ_ratio + DIST_WEIGHT * (1 - tr) + dist
 
-    def combined_score(self, icd, ward, state):
+    def combined_score(self, icd, ward, state, origin=None):
         tau = self.pheromone.get((icd, ward), PHER_INIT) ** self.alpha
         eta = self.compute_eta(icd, ward, state) ** self.beta
-        cost = self.compute_cost(icd, ward, state)
+        cost = self.compute_cost(icd, ward, state, origin)
         return tau * eta - cost
 
-    # def recommend(self, icd: str, df_live: pd.DataFrame = None, top_k=1) -> list:
-    #     if df_live is not None:
-    #         state = make_state_from_df(df_live)
-    #     else:
-    #         state = {w: {'total': WARD_TOTALS[w], 'occupied': 0} for w in WARD_TOTALS}
-    #     scores = {}
-    #     for w in self.edges.get(icd, []):
-    #         s = state.get(w)
-    #         if not s or s['occupied'] >= s['total']:
-    #             continue
-    #         scores[w] = self.combined_score(icd, w, state)
-    #     ranked = sorted(scores.items(), key=lambda x: x[1], reverse=True)
-    #     return ranked[:top_k]
-    def recommend(self, icd: str, df_live: pd.DataFrame = None, top_k=1) -> list:
-        if df_live is not None:
+    # ─── 파라미터 직렬화 ─────────────────────────
+    def to_params(self) -> dict:
+        """pickle 대신 저장할 파라미터 dict ((ICD, 병동) 키는 {ICD: {병동: 값}}으로 펼침)"""
+        return {
+            "format": PARAMS_FORMAT,
+            "schema_version": PARAMS_SCHEMA_VERSION,
+            "alpha": self.alpha,
+            "beta": self.beta,
+            "pheromone": _nest(self.pheromone),
+            "raw_priority_weights": _nest(self.raw_pw),
+            "priority_weights": _nest(self.pw),
+            "transfer_rates": dict(self.transfer_rates),
+            "distances": dict(self.distances),
+            "edges": {icd: list(wards) for icd, wards in self.edges.items()},
+        }
+
+    @classmethod
+    def from_params(cls, params: dict) -> "HybridScheduler":
+        if params.get("format") != PARAMS_FORMAT:
+            raise ValueError(f"model1 파라미터 파일 형식이 아닙니다: {params.get('format')}")
+        if params.get("schema_version") != PARAMS_SCHEMA_VERSION:
+            raise ValueError(f"지원하지 않는 model1 파라미터 버전입니다: {params.get('schema_version')}")
+
+        model = cls.__new__(cls)
+        model.alpha = float(params["alpha"])
+        model.beta = float(params["beta"])
+        model.pheromone = _unnest(params["pheromone"])
+        model.raw_pw = _unnest(params["raw_priority_weights"])
+        model.pw = _unnest(params["priority_weights"])
+        model.transfer_rates = {icd: float(v) for icd, v in params["transfer_rates"].items()}
+        model.distances = {w: float(v) for w, v in params["distances"].items()}
+        model.edges = {icd: list(wards) for icd, wards in params["edges"].items()}
+        return model
+
+    def copy(self) -> "HybridScheduler":
+        """파라미터를 복사한 새 스케줄러 — 공유 중인 모델(model_registry 등)을 고치지 않고 update_feedback할 때"""
+        return type(self).from_params(self.to_params())
+
+    # ─── 행렬 기반 점수 계산 ─────────────────────────
+    @property
+    def matrix(self) -> "ScoreMatrix":
+        """파라미터를 배열로 펼친 ScoreMatrix (처음 접근할 때 1회 생성, 파라미터 변경 시 invalidate)"""
+        m = self.__dict__.get('_matrix')
+        if m is None:
+            m = self._matrix = ScoreMatrix(self)
+        return m
+
+    def invalidate(self):
+        """pheromone / pw / transfer_rates 등을 바꾼 뒤 호출 → 다음 점수 계산 때 행렬 재생성"""
+        self.__dict__.pop('_matrix', None)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.pop('_matrix', None)   # 캐시는 pickle(model1.pkl)에 넣지 않음
+        return state
+
+    def recommend(self, icd: str, df_live: pd.DataFrame = None, top_k=1, state: dict = None,
+                  origin: str = None) -> list:
+        if state is None and df_live is not None:
             state = make_state_from_df(df_live)
-        else:
+        elif state is None:
             state = {w: {'total': WARD_TOTALS[w], 'occupied': 0} for w in WARD_TOTALS}
 
-        scores = {}
-        candidates = self.edges.get(icd, [])
-
-        for w in candidates:
-            if w not in state:
-                 continue  # 해당 ward가 실시간 데이터에 없으면 skip
-
-            score = self.combined_score(icd, w, state)
-            scores[w] = score
-
+        # ICD 1개는 후보 병동이 몇 개뿐이라 dict 계산이 배열 구성보다 빠름 (여러 ICD는 matrix.rank_all / assign)
+        candidates = [w for w in self.edges.get(icd, []) if w in state] or list(state)
+        scores = {w: self.combined_score(icd, w, state, origin) for w in candidates}
         ranked = sorted(scores.items(), key=lambda x: x[1], reverse=True)
+        return ranked[:top_k]
+
+    # ─── ACO pheromone 학습 ─────────────────────────
+    def update_feedback(self, feedbacks: list[dict], rho: float = RHO, n_ants: int = N_ANTS,
+                        seed=None, window: tuple[date, date] | None = None) -> dict:
+        """
+        관측된 전실 피드백으로 pheromone 갱신 (utils.infer_feedback_from_api 출력 형식).
+        feedback: {"icd", "ward", "count", "ts"(선택), "state"(선택, 사건 시점 병상 state)}
+
+        window(시작일, 종료일 포함, 기본: 사건 날짜의 최소~최대)의 날짜마다 하루씩
+          ① 증발   tau ← (1 - rho) · tau            (사건이 없는 날도 증발 → 감쇠는 경과 일수에만 비례)
+          ② 적립   사건마다 개미 n_ants마리가 tau^alpha · eta^beta 비율로 병동을 고르고,
+                    관측 병동을 고른 비율 + ELITE_WEIGHT 만큼 관측 병동에 적립 (ICD별 하루 총량 Q_DEPOSIT)
+          ③ 제한   TAU_MIN ≤ tau ≤ TAU_MAX
+        ts가 없는 사건은 날짜 구간 앞에 하루치로 한 번 반영. edges에 없는 (ICD, 병동) 사건은 건너뛴다.
+        self를 바꾸므로 요청 간에 공유되는 모델에는 copy()한 뒤 호출한다.
+        """
+        m = self.matrix
+        candidates = np.zeros(m.tau.shape, dtype=bool)
+        for icd, wards in m.edges.items():
+            candidates[m.icd_index[icd], [m.ward_index[w] for w in wards]] = True
+
+        snap_index: dict[int | None, int] = {}
+        avail_rows: list[np.ndarray] = []
+        days = defaultdict(list)
+        skipped = 0
+        for fb in feedbacks:
+            i, j = m.icd_index.get(fb.get('icd')), m.ward_index.get(fb.get('ward'))
+            count = fb.get('count', 1)
+            if i is None or j is None or not candidates[i, j] or count <= 0:
+                skipped += 1
+                continue
+            state = fb.get('state')
+            key = id(state) if state is not None else None
+            if key not in snap_index:
+                snap_index[key] = len(avail_rows)
+                avail_rows.append(self._avail_vector(state))
+            ts = fb.get('ts')
+            days[ts.date() if ts is not None else None].append((i, j, snap_index[key], count))
+
+        dated = [d for d in days if d is not None]
+        if window is None and dated:
+            window = (min(dated), max(dated))
+        day_keys = [None] if None in days else []
+        if window is not None:
+            start, end = min([window[0], *dated]), max([window[1], *dated])
+            day_keys += [start + timedelta(days=n) for n in range((end - start).days + 1)]
+        if not day_keys:
+            return {'events': 0, 'skipped': skipped, 'days': 0}
+
+        tau = m.tau.copy()
+        avail = np.stack(avail_rows) if avail_rows else None
+        day_seeds = np.random.SeedSequence(seed).spawn(len(day_keys))
+        for day, day_seed in zip(day_keys, day_seeds):
+            tau[candidates] *= (1 - rho)
+            if day in days:
+                ev = np.array(days[day], dtype=float)
+                rows, cols, snaps = (ev[:, k].astype(np.intp) for k in range(3))
+                day_snaps, snaps = np.unique(snaps, return_inverse=True)   # 그날 사건의 스냅샷만 넘김
+                icd_total = np.bincount(rows, weights=ev[:, 3], minlength=tau.shape[0])
+                weights = Q_DEPOSIT * ev[:, 3] / icd_total[rows]
+                deposits = colony_deposits(
+                    tau, m.params[1], candidates, avail[day_snaps], rows, cols, snaps, weights,
+                    self.alpha, self.beta, n_ants, ELITE_WEIGHT, day_seed,
+                )
+                tau[candidates] += deposits[candidates]
+            tau[candidates] = np.clip(tau[candidates], TAU_MIN, TAU_MAX)
+
+        self.pheromone = {
+            (icd, w): float(tau[m.icd_index[icd], m.ward_index[w]])
+            for icd, wards in m.edges.items() for w in wards
+        }
+        self.invalidate()
+        return {'events': sum(len(v) for v in days.values()), 'skipped': skipped, 'days': len(day_keys)}
+
+    def _avail_vector(self, state: dict | None) -> np.ndarray:
+        """state → ScoreMatrix 병동 열 순서의 가용률 벡터 (state가 없으면 모든 병동 1)"""
+        m = self.matrix
+        if state is None:
+            return np.ones(m.tau.shape[1])
+        avail = np.zeros(m.tau.shape[1])
+        for w, s in state.items():
+            j = m.ward_index.get(w)
+            if j is not None and s['total'] > 0:
+                avail[j] = max((s['total'] - s['occupied']) / s['total'], 0)
+        return avail
+
+    def assign(self, icds: list[str], df_live: pd.DataFrame = None, state: dict = None,
+               origins: list[str] = None) -> list:
+        """여러 환자 동시 배정 (병동별 빈 병상 수 제약) — ScoreMatrix.assign 참고"""
+        if state is None and df_live is not None:
+            state = make_state_from_df(df_live)
+        elif state is None:
+            state = {w: {'total': WARD_TOTALS[w], 'occupied': 0} for w in WARD_TOTALS}
 
-        if not ranked:
-            fallback_scores = {}
-            for w in state:
-                score = self.combined_score(icd, w, state)
-                fallback_scores[w] = score
-            ranked = sorted(fallback_scores.items(), key=lambda x: x[1], reverse=True)
-
-        return ranked[:top_k]
\ No newline at end of file
+        return self.matrix.assign(icds, state, origins)
+
+
+def _nest(pairs: dict) -> dict:
+    nested = defaultdict(dict)
+    for (icd, ward), v in pairs.items():
+        nested[icd][ward] = float(v)
+    return dict(nested)
+
+def _unnest(nested: dict) -> dict:
+    return {(icd, ward): float(v) for icd, wards in nested.items() for ward, v in wards.items()}
+
+def save_params(model: HybridScheduler, path):
+    """
+    model1 파라미터를 JSON으로 저장 (키 정렬 + 줄바꿈 → 버전 간 diff 가능).
+    임시 파일에 쓴 뒤 교체하므로 서빙 프로세스가 쓰다 만 파일을 읽지 않는다.
+    """
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(model.to_params(), f, ensure_ascii=False, indent=1, sort_keys=True)
+        f.write("\n")
+    os.replace(tmp_path, path)
+
+def load_params(path) -> HybridScheduler:
+    """경로 또는 파일 객체(model_registry는 읽어 둔 바이트를 BytesIO로 넘김)"""
+    if hasattr(path, "read"):
+        return HybridScheduler.from_params(json.load(path))
+    with open(path, encoding="utf-8") as f:
+        return HybridScheduler.from_params(json.load(f))
@@ -0,0 +1,49 @@
+# recommend/icd_index.py >> 진단/질환 코드 → model1 ICD 그룹 조회 인덱스
+MEMO_MAX = 4096   # 원문 코드 → 그룹 캐시 최대 크기 (넘치면 비움; 임의 입력으로 무한히 커지지 않게)
+
+
+def normalize_code(code) -> str:
+    """공백/대소문자/구분자('.', '-', '_', ' ') 차이 제거: ' i63.9 ' → 'I639'"""
+    return str(code).upper().replace(".", "").replace("-", "").replace("_", "").replace(" ", "")
+
+
+class IcdIndex:
+    """
+    들어온 코드를 model1의 ICD 그룹(EDGES_BY_ICD 키)으로 대응시키는 사전 컴파일 인덱스.
+
+    - aliases : 정확히 일치해야 하는 별칭 (병상 API dissCd "01" → I21 등)
+    - groups  : ICD 그룹 코드. 입력 코드의 가장 긴 그룹 prefix로 대응 (I63.9, I630 → I63)
+    조회는 prefix 길이별 dict 조회 최대 len(code)회라 그룹 수와 무관하고,
+    같은 원문 코드가 반복되면 memo dict 조회 1회로 끝난다.
+    """
+
+    def __init__(self, groups, aliases: dict | None = None):
+        self._prefixes = {normalize_code(g): g for g in groups}
+        self._aliases = {normalize_code(k): v for k, v in (aliases or {}).items()}
+        self._max_len = max(map(len, self._prefixes), default=0)
+        self._memo: dict = {}
+
+    def _lookup(self, code) -> str | None:
+        key = normalize_code(code)
+        group = self._aliases.get(key)
+        if group is not None:
+            return group
+        for n in range(min(len(key), self._max_len), 0, -1):
+            group = self._prefixes.get(key[:n])
+            if group is not None:
+                return group
+        return None
+
+    def resolve(self, code) -> str | None:
+        """ICD 그룹 (대응되는 그룹이 없으면 None)"""
+        try:
+            return self._memo[code]
+        except KeyError:
+            pass
+        except TypeError:   # hash 불가 입력
+            return self._lookup(code)
+        group = self._lookup(code)
+        if len(self._memo) >= MEMO_MAX:
+            self._memo.clear()
+        self._memo[code] = group
+        return group
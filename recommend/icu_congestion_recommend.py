@@ -1,58 +1,53 @@
 # #recommend/icu_congestion.py
 
 from pathlib import Path
-from joblib import load
 from datetime import datetime
 import pandas as pd
 import traceback
-from catboost import Pool
 import numpy as np
 
-from utils.ncp_client import download_file_from_ncp
+from recommend.congestion_ensemble import load_ensemble
+from recommend.oblivious_trees import tree_bundle_fetcher
+from utils.model_registry import model_registry
 
 import logging
 logger = logging.getLogger(__name__)
 
-from utils.db_loader import (
-    get_realtime_data_for_today,
-    get_realtime_data_for_days_ago
-)
-from utils.preprocess import (
-    parse_model23_input,generate_model2_features
-)
+from utils.snapshot_store import snapshot_store
+from utils.ward_snapshot import latest_ward_snapshot, model2_features
 
 ROOT = Path(__file__).parent.parent
 LOCAL_MODEL_PATH = ROOT / "model" / "model2.pkl"
 NCP_MODEL_KEY = "rmrp-models/model2.pkl"
+LOCAL_TREES_PATH = ROOT / "model" / "model2.json"
+NCP_TREES_KEY = "rmrp-models/model2.json"
 
+# 번들 → CongestionEnsemble (멤버 입력 구성 / scaler / threshold는 버전당 1회 결정)
+# 트리 배열 번들(JSON)만 서빙 — 없으면 NCP JSON, 그것도 없으면 pickle을 별도 프로세스에서 변환 (catboost 미사용)
+model_registry.register("model2", LOCAL_TREES_PATH, NCP_TREES_KEY, loader=load_ensemble,
+                        fetch=tree_bundle_fetcher(NCP_TREES_KEY, LOCAL_MODEL_PATH, NCP_MODEL_KEY))
 
-def auto_congestion_recommend(_: dict) -> dict:
-    try:
-        # ─── (1) 모델 로딩 ─────────────────────
-        if not LOCAL_MODEL_PATH.exists():
-            print("모델이 로컬에 없음 → NCP에서 다운로드 중")
-            download_file_from_ncp(NCP_MODEL_KEY, str(LOCAL_MODEL_PATH))
-
-        model_data = load(LOCAL_MODEL_PATH)
+# today / lag1 / lag7 — 스냅샷 저장소(없으면 DB 1회 조회)에서 함께 조회
+LAG_OFFSETS = [0, 1, 7]
 
-        model_list = model_data.get("models")
-        if not model_list or not isinstance(model_list, list):
-            raise ValueError("'models' 키에 유효한 모델 리스트가 없습니다.")
 
-        model = model_list[0]
+def auto_congestion_recommend(_: dict, snapshots: dict[int, list[dict]] | None = None) -> dict:
+    """snapshots: {offset: [json, ...]} (API는 snapshot_store.aget_days로 미리 조회해 전달, 없으면 여기서 조회)"""
+    try:
+        # ─── (1) 모델 조회 (레지스트리에서 1회 로딩된 번들) ─────
+        ensemble = model_registry.get("model2").artifact
 
         # ─── (2) 데이터 수집 ─────────────────────
-        today_jsons = get_realtime_data_for_today()
-        lag1_jsons = get_realtime_data_for_days_ago(1)
-        lag7_jsons = get_realtime_data_for_days_ago(7)
+        if snapshots is None:
+            snapshots = snapshot_store.get_days(LAG_OFFSETS)
+        today_jsons, lag1_jsons, lag7_jsons = snapshots[0], snapshots[1], snapshots[7]
         print(f"today={len(today_jsons)}, lag1={len(lag1_jsons)}, lag7={len(lag7_jsons)}")
 
-        df_today = pd.DataFrame([row for d in today_jsons for row in parse_model23_input(d)])
-        df_lag1 = pd.DataFrame([row for d in lag1_jsons for row in parse_model23_input(d)])
-        df_lag7 = pd.DataFrame([row for d in lag7_jsons for row in parse_model23_input(d)])
-        print(f"DataFrame shapes: today={df_today.shape}, lag1={df_lag1.shape}, lag7={df_lag7.shape}")
+        today = latest_ward_snapshot(today_jsons)
+        lag1 = latest_ward_snapshot(lag1_jsons)
+        lag7 = latest_ward_snapshot(lag7_jsons)
 
-        if df_today.empty and df_lag1.empty and df_lag7.empty:
+        if today is None and lag1 is None and lag7 is None:
             return {
                 "success": False,
                 "result": {
@@ -61,51 +56,52 @@ def auto_congestion_recommend(_: dict) -> dict:
                 }
             }
 
-        if df_today.empty:
-            if not df_lag1.empty:
+        if today is None:
+            if lag1 is not None:
                 logger.warning("today 없음 → lag1으로 대체")
-                df_today = df_lag1.copy()
-            elif not df_lag7.empty:
+                today = lag1
+            elif lag7 is not None:
                 logger.warning("today 없음 → lag7으로 대체")
-                df_today = df_lag7.copy()
+                today = lag7
 
-        if df_lag1.empty:
-            if not df_today.empty:
+        if lag1 is None:
+            if today is not None:
                 logger.warning("lag1 없음 → today로 대체")
-                df_lag1 = df_today.copy()
-            elif not df_lag7.empty:
+                lag1 = today
+            elif lag7 is not None:
                 logger.warning("lag1 없음 → lag7으로 대체")
-                df_lag1 = df_lag7.copy()
+                lag1 = lag7
 
-        if df_lag7.empty:
-            if not df_lag1.empty:
+        if lag7 is None:
+            if lag1 is not None:
                 logger.warning("lag7 없음 → lag1으로 대체")
-                df_lag7 = df_lag1.copy()
-            elif not df_today.empty:
+                lag7 = lag1
+            elif today is not None:
                 logger.warning("lag7 없음 → today로 대체")
-                df_lag7 = df_today.copy()
+                lag7 = today
 
-        # ─── (5) 피처 생성 ──────────────────────
+        # ─── (5) 피처 생성 (병동 슬롯 배열 연산) ──────────
         target_date = datetime.now()
-        X = generate_model2_features(df_today, df_lag1, df_lag7, target_date)
-        print("생성된 피처 (X):\n", X.head())
+        ward_codes, features = model2_features(today, lag1, lag7, target_date)
 
         # ─── (6) 예측 ───────────────────────────
-        pool = Pool(X)
-        pred_value = model.predict(pool)[0]
-        print("예측 결과:", pred_value)
+        # 모든 병동 행 × 앙상블 멤버 전체 → 병동별 평균 확률 + threshold 판정
+        proba, flags = ensemble.predict(ward_codes, features)
+        logger.debug(f"예측 결과: {dict(zip(ward_codes, np.round(proba, 3).tolist()))}")
 
         # ─── (7) 예측값 처리 및 응답 구성 ───────
-        if isinstance(pred_value, (int, float,np.integer, np.floating)):
-            pred = float(pred_value)
-            prediction = int(pred) if pred.is_integer() else round(pred, 3)
-        else:
-            raise ValueError("예측 결과가 숫자형이 아닙니다.")
+        wards = [
+            {"ward_code": code, "probability": round(float(p), 4), "congested": int(f)}
+            for code, p, f in zip(ward_codes, proba, flags)
+        ]
+        prediction = int(flags.max()) if len(flags) else 0   # 혼잡 예상 병동이 하나라도 있으면 1
 
         return {
             "success": True,
             "result": {
-                "prediction": prediction
+                "prediction": prediction,
+                "threshold": ensemble.threshold,
+                "wards": wards
             }
         }
 
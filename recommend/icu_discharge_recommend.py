@@ -180,15 +180,12 @@
 #         import traceback
 #         traceback.print_exc()
 #         raise ValueError(f"자동 예측 오류: {str(e)}")
-from utils.db_loader import (
-    get_realtime_data_for_today,
-    get_realtime_data_for_days_ago,
-)
+from utils.snapshot_store import snapshot_store
 from utils.preprocess import parse_model23_input
 from pathlib import Path
-from joblib import load
 from datetime import datetime
-from catboost import Pool
+from collections import defaultdict
+# from catboost import Pool
 import pandas as pd
 import numpy as np
 import logging
@@ -197,7 +194,8 @@ from dotenv import load_dotenv
 import sys
 
 sys.path.append(str(Path(__file__).resolve().parent.parent))
-from utils.ncp_client import download_file_from_ncp
+from utils.model_registry import model_registry
+from recommend.oblivious_trees import load_tree_bundle, tree_bundle_fetcher
 
 # ─── 환경 설정 ─────────────────
 ROOT = Path(__file__).parent.parent
@@ -205,18 +203,24 @@ load_dotenv(dotenv_path=ROOT / ".env")
 
 LOCAL_MODEL3_PATH = Path(os.getenv("LOCAL_MODEL3_PATH", ROOT / "model" / "model3.pkl"))
 NCP_MODEL3_KEY = os.getenv("NCP_MODEL3_KEY", "rmrp-models/model3.pkl")
+LOCAL_MODEL3_TREES_PATH = Path(os.getenv("LOCAL_MODEL3_TREES_PATH", ROOT / "model" / "model3.json"))
+NCP_MODEL3_TREES_KEY = os.getenv("NCP_MODEL3_TREES_KEY", "rmrp-models/model3.json")
 LOCAL_MODEL3_PATH.parent.mkdir(parents=True, exist_ok=True)
 
+# today / lag1 / lag7 — 스냅샷 저장소(없으면 DB 1회 조회)에서 함께 조회
+LAG_OFFSETS = [0, 1, 7]
+
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
 
 
-def load_discharge_model():
-    if not LOCAL_MODEL3_PATH.exists():
-        print("로컬에 model3 없음 → NCP에서 다운로드 중...")
-        download_file_from_ncp(NCP_MODEL3_KEY, str(LOCAL_MODEL3_PATH))
+# 트리 배열 번들(JSON)만 서빙 — 없으면 NCP JSON, 그것도 없으면 pickle을 별도 프로세스에서 변환 (catboost 미사용)
+model_registry.register("model3", LOCAL_MODEL3_TREES_PATH, NCP_MODEL3_TREES_KEY, loader=load_tree_bundle,
+                        fetch=tree_bundle_fetcher(NCP_MODEL3_TREES_KEY, LOCAL_MODEL3_PATH, NCP_MODEL3_KEY))
 
-    model_data = load(LOCAL_MODEL3_PATH)
+
+def load_discharge_model():
+    model_data = model_registry.get("model3").artifact
     return (
         model_data["cat_model"],
         model_data["scaler"],
@@ -226,21 +230,33 @@ def load_discharge_model():
     )
 
 
-def summarize_admissions_by_time(realtime_jsons: list[dict], ward_code: str) -> dict:
-    morning = afternoon = 0
+MORNING_HOURS = (6, 12)      # [06시, 12시)
+AFTERNOON_HOURS = (12, 18)   # [12시, 18시)
+
+
+def count_ward_snapshots_by_hour(realtime_jsons: list[dict]) -> dict:
+    """
+    하루치 스냅샷의 중환자실 병동 row로 {wardCd: [0~23시 출현 횟수]} 테이블 생성.
+    병동별/시간대별 피처는 모두 이 테이블에서 꺼내 쓴다.
+    (파싱 결과를 재사용하므로 JSON을 다시 순회하지 않음)
+    """
+    hist = defaultdict(lambda: [0] * 24)
     for data in realtime_jsons:
         ts = data.get("_timestamp")
         if not ts:
             continue
-        for ptrm in data.get("ptrmInfo", []):
-            for ptnt in ptrm.get("ptntDtlsCtrlAllLst", []):
-                for w in ptnt.get("wardLst", []):
-                    if w.get("wardCd") == ward_code:
-                        hour = ts.hour
-                        if 6 <= hour < 12:
-                            morning += 1
-                        elif 12 <= hour < 18:
-                            afternoon += 1
+        hour = ts.hour
+        for row in parse_model23_input(data):
+            hist[row["wardCd"]][hour] += 1
+    return dict(hist)
+
+
+def admission_ratios(hour_counts: list[int] | None) -> dict:
+    if hour_counts is None:
+        morning = afternoon = 0
+    else:
+        morning = sum(hour_counts[MORNING_HOURS[0]:MORNING_HOURS[1]])
+        afternoon = sum(hour_counts[AFTERNOON_HOURS[0]:AFTERNOON_HOURS[1]])
     total = morning + afternoon
     return {
         "morning_ratio": morning / total if total else 0.5,
@@ -248,15 +264,20 @@ def summarize_admissions_by_time(realtime_jsons: list[dict], ward_code: str) ->
     }
 
 
-def auto_recommend() -> dict:
+def summarize_admissions_by_time(realtime_jsons: list[dict], ward_code: str) -> dict:
+    return admission_ratios(count_ward_snapshots_by_hour(realtime_jsons).get(ward_code))
+
+
+def auto_recommend(snapshots: dict[int, list[dict]] | None = None) -> dict:
+    """snapshots: {offset: [json, ...]} (API는 snapshot_store.aget_days로 미리 조회해 전달, 없으면 여기서 조회)"""
     try:
         model, scaler, imputer, num_cols, cat_col = load_discharge_model()
         cat_col = [cat_col] if isinstance(cat_col, str) else cat_col
         cat_col = [c for c in cat_col if c not in num_cols]
 
-        today_jsons = get_realtime_data_for_today()
-        lag1_jsons = get_realtime_data_for_days_ago(1)
-        lag7_jsons = get_realtime_data_for_days_ago(7)
+        if snapshots is None:
+            snapshots = snapshot_store.get_days(LAG_OFFSETS)
+        today_jsons, lag1_jsons, lag7_jsons = snapshots[0], snapshots[1], snapshots[7]
 
         df_today = pd.DataFrame([row for d in today_jsons for row in parse_model23_input(d)])
         df_lag1 = pd.DataFrame([row for d in lag1_jsons for row in parse_model23_input(d)])
@@ -295,55 +316,54 @@ def auto_recommend() -> dict:
                 logger.warning("lag7 없음 → today로 대체")
                 df_lag7 = df_today.copy()
 
-        results, total_pred = [], 0
-
-        for ward_code in df_today["wardCd"].unique():
-            ward_rows = df_today[df_today["wardCd"] == ward_code]
-            if ward_rows.empty:
-                continue
-
-            total_beds = ward_rows[["embdCct", "dschCct", "useSckbCnt", "admsApntCct", "chupCct"]].sum(axis=1).iloc[0]
-            occupancy_rate = ward_rows["useSckbCnt"].iloc[0] / total_beds if total_beds else 0
-
-            admissions = ward_rows["admsApntCct"].sum()
-            prev_dis = df_lag1[df_lag1["wardCd"] == ward_code]["dschCct"].sum()
-            prev_week_dis = df_lag7[df_lag7["wardCd"] == ward_code]["dschCct"].sum()
-            dow = datetime.now().weekday()
-            is_weekend = int(dow >= 5)
-            adm_summary = summarize_admissions_by_time(today_jsons, ward_code)
-
-            features = {
-                "admissions": admissions,
-                "prev_dis": prev_dis,
-                "prev_week_dis": prev_week_dis,
-                "dow": dow,
-                "is_weekend": is_weekend,
-                "ward_code": str(ward_code),
-                "occupancy_rate": occupancy_rate,
-                "morning_ratio": adm_summary["morning_ratio"],
-                "afternoon_ratio": adm_summary["afternoon_ratio"]
-            }
-
-            filtered = {k: v for k, v in features.items() if k in num_cols + cat_col}
-            X = pd.DataFrame([filtered])
-            cat_col_filtered = [c for c in cat_col if c in X and (pd.api.types.is_object_dtype(X[c]) or pd.api.types.is_integer_dtype(X[c]))]
-
-            missing_cols = [col for col in num_cols if col not in X.columns]
-            if missing_cols:
-                raise ValueError(f"수치형 컬럼 누락: {missing_cols}")
-
-            X_vals = scaler.transform(imputer.transform(X[num_cols].values))
-            X[num_cols] = X_vals
-            X[cat_col_filtered] = X[cat_col_filtered].astype(str)
-
-            pool = Pool(X, cat_features=cat_col_filtered)
-            pred = float(model.predict(pool)[0])
-            results.append({"ward_code": ward_code, "prediction": pred})
-            total_pred += pred
+        # ─── 병동별 피처 행렬 (groupby 집계 1회) ─────────────
+        count_cols = ["embdCct", "dschCct", "useSckbCnt", "admsApntCct", "chupCct"]
+        grouped = df_today.groupby("wardCd", sort=False)
+        latest = grouped[count_cols].first()          # 병동별 첫 row = 가장 최근 스냅샷
+        ward_codes = latest.index
+
+        total_beds = latest.sum(axis=1)
+        dow = datetime.now().weekday()
+        features = pd.DataFrame({
+            "admissions": grouped["admsApntCct"].sum(),
+            "prev_dis": df_lag1.groupby("wardCd")["dschCct"].sum().reindex(ward_codes, fill_value=0),
+            "prev_week_dis": df_lag7.groupby("wardCd")["dschCct"].sum().reindex(ward_codes, fill_value=0),
+            "dow": dow,
+            "is_weekend": int(dow >= 5),
+            "ward_code": ward_codes.astype(str),
+            "occupancy_rate": (latest["useSckbCnt"] / total_beds.where(total_beds != 0)).fillna(0),
+        }, index=ward_codes)
+
+        hour_hist = count_ward_snapshots_by_hour(today_jsons)
+        adm_summary = [admission_ratios(hour_hist.get(w)) for w in ward_codes]
+        features["morning_ratio"] = [a["morning_ratio"] for a in adm_summary]
+        features["afternoon_ratio"] = [a["afternoon_ratio"] for a in adm_summary]
+
+        X = features[[c for c in features.columns if c in num_cols + cat_col]].reset_index(drop=True)
+        cat_col_filtered = [c for c in cat_col if c in X and (pd.api.types.is_object_dtype(X[c]) or pd.api.types.is_integer_dtype(X[c]))]
+
+        missing_cols = [col for col in num_cols if col not in X.columns]
+        if missing_cols:
+            raise ValueError(f"수치형 컬럼 누락: {missing_cols}")
+
+        # ─── 전체 병동 일괄 변환 + predict 1회 ───────────────
+        X[num_cols] = scaler.transform(imputer.transform(X[num_cols].values))
+        X[cat_col_filtered] = X[cat_col_filtered].astype(str)
+
+        preds = [float(p) for p in model.predict(X)]   # ObliviousTrees: 피처 이름으로 열을 골라 NumPy 평가
+        if not preds:
+            raise ValueError("예측 가능한 병동이 없습니다.")
 
-        avg_pred = total_pred / len(results) if results else None
-
-        return round(avg_pred, 3)
+        return {
+            "success": True,
+            "result": {
+                "prediction": round(sum(preds) / len(preds), 3),
+                "wards": [
+                    {"ward_code": str(w), "prediction": round(p, 3)}
+                    for w, p in zip(ward_codes, preds)
+                ]
+            }
+        }
 
     except Exception as e:
         import traceback
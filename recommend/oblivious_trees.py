@@ -0,0 +1,536 @@
+# recommend/oblivious_trees.py >> CatBoost 모델 → 배열 export + NumPy 평가기 (서빙에서 catboost 불필요)
+import itertools
+import json
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from utils.ward_snapshot import WARD_CODES
+
+logger = logging.getLogger(__name__)
+
+ROOT = Path(__file__).resolve().parent.parent
+
+TREE_BUNDLE_FORMAT = "rmrp-tree-bundle"
+TREE_BUNDLE_SCHEMA_VERSION = 1
+UNKNOWN_CATEGORY = "__unknown__"   # 학습 때 없던 범주 값 자리 (CatBoost는 prior로 처리)
+
+# export 시 범주형 분기 결과를 미리 계산해 둘 값 목록 (피처 이름 → 값)
+DEFAULT_CATEGORIES = {"ward_code": WARD_CODES, "wardCd": WARD_CODES}
+
+# member_raw 트리 블록 크기 (트리 수 × 행 수) — 잎 번호 / 잎 값 중간 배열이 L2 캐시 안에 머무는 정도
+BLOCK_CELLS = 1 << 17
+
+
+class ObliviousTrees:
+    """
+    CatBoost oblivious tree 모델을 평탄한 배열로 펼친 NumPy 평가기 (predict 재현).
+
+    - 조건 열: float 분기 (float32 피처 > border) + 범주형 분기(CTR / one-hot) + 항상 0인 채움 열
+      범주형 분기 결과는 범주 값(+ CTR 조합에 들어간 float 조건 cat_deps)에만 달려 있으므로
+      export 때 알려진 값(+ 미등록 값) × 조합 float 비트별 표(cat_table)로 보관
+    - 트리 t의 잎 번호 = Σ_k 조건[tree_conds[t, k]] << k (깊이가 얕은 트리는 채움 열로 맞춤)
+    - 여러 모델(앙상블 멤버)을 merge하면 트리를 이어 붙여 (같은 float 조건은 공유) 한 번에 평가하고, 멤버별 합계를 따로 낸다
+    예측값 = scale · Σ 잎 값 + bias (멤버별)
+    """
+
+    def __init__(self, feature_names: list[str], float_index, float_nan_max, cat_index, cat_values: list[list[str]],
+                 cond_feature, cond_border, cat_deps, cat_table, tree_conds, leaf_values, member_trees, scale, bias):
+        self.feature_names = list(feature_names)
+        self.float_index = np.asarray(float_index, dtype=np.intp)
+        self.float_nan_max = np.asarray(float_nan_max, dtype=bool)
+        self.cat_index = np.asarray(cat_index, dtype=np.intp)
+        self.cat_values = [list(v) for v in cat_values]
+        self.cond_feature = np.asarray(cond_feature, dtype=np.intp)
+        self.cond_border = np.asarray(cond_border, dtype=np.float32)
+        self.leaf_values = np.asarray(leaf_values, dtype=float)          # (트리, 2^깊이, 출력 차원)
+        self.cat_deps = _matrix(cat_deps, np.intp, 0)     # (범주형 열, 조합 float 조건) — len(cond_feature) = 채움(0)
+        self.cat_table = np.asarray(cat_table, dtype=bool)  # (범주 값 조합, 2^조합 조건 수, 범주형 열)
+        if self.cat_table.ndim != 3:
+            n_rows = max(1, int(np.prod([len(v) + 1 for v in cat_values])))
+            self.cat_table = np.zeros((n_rows, 2 ** self.cat_deps.shape[1], len(self.cat_deps)), dtype=bool)
+        self.tree_conds = _matrix(tree_conds, np.intp, len(self.leaf_values))
+        self.member_trees = np.asarray(member_trees, dtype=np.intp)      # 멤버별 트리 수
+        self.scale = np.asarray(scale, dtype=float)                      # (멤버,)
+        self.bias = np.asarray(bias, dtype=float).reshape(len(self.member_trees), -1)   # (멤버, 출력 차원)
+
+        self.cat_names = [self.feature_names[i] for i in self.cat_index]
+        self.float_names = [self.feature_names[i] for i in self.float_index]
+        self._cat_lookup = [{v: i for i, v in enumerate(values)} for values in self.cat_values]
+        # 범주 값 조합 → cat_table 행 (마지막 피처가 가장 빠르게 변하는 mixed radix, 각 피처 마지막 값 = 미등록)
+        sizes = [len(values) + 1 for values in self.cat_values]
+        self._cat_strides = np.array([int(np.prod(sizes[i + 1:])) for i in range(len(sizes))], dtype=np.intp)
+        self._tree_member = np.repeat(np.arange(len(self.member_trees)), self.member_trees)
+        self._member_first = np.zeros(len(self.leaf_values), dtype=bool)   # 멤버의 첫 트리
+        self._member_first[np.cumsum(self.member_trees)[:-1]] = True
+        # 깊이별 조건 번호 (트리 순서대로 연속 메모리, 분기 없는 트리뿐이면 채움 열 하나) / 잎 번호 dtype (깊이 8 이하면 uint8)
+        pad = len(self.cond_feature) + len(self.cat_deps)
+        self._depth_conds = ([np.ascontiguousarray(conds) for conds in self.tree_conds.T]
+                             or [np.full(len(self.leaf_values), pad, dtype=np.intp)])
+        self._leaf_dtype = np.uint8 if self.tree_conds.shape[1] <= 8 else np.uint16
+        # 트리 t의 잎 k → 평탄화 번호 t · 2^깊이 + k
+        self._leaf_offsets = np.arange(len(self.leaf_values), dtype=np.intp) * self.leaf_values.shape[1]
+        self._flat_leaves = self.leaf_values.reshape(-1, self.leaf_values.shape[2])
+        self._dep_weights = _bit_weights(self.cat_deps.shape[1])
+        self._cat_range = np.arange(len(self.cat_deps))
+
+    @property
+    def tree_count(self) -> int:
+        return len(self.leaf_values)
+
+    # ─── 입력 → 조건 비트 ─────────────────────────
+    def _columns(self, X) -> tuple[np.ndarray, np.ndarray]:
+        """DataFrame(피처 이름) 또는 배열(피처 순서) → (float 피처 × 행 float32 행렬, cat_table 행 번호)"""
+        if isinstance(X, pd.DataFrame):
+            # 열 이름 목록으로 sub-frame을 만드는 것보다 열별 추출이 소량 행에서 훨씬 빠름
+            floats = np.array([X[name].to_numpy(dtype=np.float32) for name in self.float_names],
+                              dtype=np.float32).reshape(len(self.float_names), len(X))
+            cats = [X[name].to_numpy() for name in self.cat_names]
+        else:
+            X = np.asarray(X, dtype=object if len(self.cat_index) else np.float32)
+            X = X.reshape(len(X), -1)
+            floats = X[:, self.float_index].astype(np.float32).T
+            cats = [X[:, i] for i in self.cat_index]
+
+        if self.float_nan_max.any() or np.isnan(floats).any():
+            fill = np.where(self.float_nan_max, np.inf, -np.inf).astype(np.float32)
+            floats = np.where(np.isnan(floats), fill[:, None], floats)
+
+        rows = np.zeros(floats.shape[1], dtype=np.intp)
+        for lookup, stride, column in zip(self._cat_lookup, self._cat_strides, cats):
+            # 서로 다른 값만 문자열화해 찾음 (병동코드는 행 수와 무관하게 수십 개)
+            unknown, found = len(lookup), {}
+            rows += stride * np.fromiter((found[v] if v in found else found.setdefault(v, lookup.get(_cat_str(v), unknown))
+                                          for v in column), np.intp, len(column))
+        return floats, rows
+
+    def member_raw(self, X) -> np.ndarray:
+        """(행, 멤버, 출력 차원) 예측값 (scale · Σ 잎 값 + bias)"""
+        floats, rows = self._columns(X)
+        n, n_float = floats.shape[1], len(self.cond_feature)
+        # 조건 × 행 배치 (조건 한 줄이 연속 메모리라 트리별 조건 gather가 행 복사가 됨), 모든 트리가 공유
+        fbits = np.zeros((n_float + 1, n), dtype=self._leaf_dtype)    # 마지막 줄 = 채움(항상 0)
+        fbits[:n_float] = floats[self.cond_feature] > self.cond_border[:, None]
+        cbits = np.zeros((len(self.cat_deps), n), dtype=self._leaf_dtype)
+        if len(self.cat_deps):
+            deps = np.einsum("ckn,k->cn", fbits[self.cat_deps], self._dep_weights)   # 범주형 열별 조합 float 비트 번호
+            cbits[:] = self.cat_table[rows[None, :], deps, self._cat_range[:, None]]
+        bits = np.concatenate([fbits[:n_float], cbits, fbits[n_float:]])
+
+        # 트리 블록 (블록 × 행이 캐시에 들어가는 크기)마다 잎 번호 → 잎 값 gather → 멤버별 합계
+        sums = np.zeros((len(self.member_trees), n, self.leaf_values.shape[2]))
+        step = max(1, BLOCK_CELLS // max(n, 1))
+        for start in range(0, self.tree_count, step):
+            stop = min(start + step, self.tree_count)
+            leaf = np.take(bits, self._depth_conds[0][start:stop], axis=0)
+            for k, conds in enumerate(self._depth_conds[1:], 1):
+                bit = np.take(bits, conds[start:stop], axis=0)
+                bit <<= k
+                leaf |= bit
+            values = np.take(self._flat_leaves, self._leaf_offsets[start:stop, None] + leaf, axis=0)   # (트리, 행, 출력 차원)
+            first = np.concatenate([[0], np.flatnonzero(self._member_first[start + 1:stop]) + 1])   # 블록 안 멤버 경계
+            sums[self._tree_member[start + first]] += np.add.reduceat(values, first, axis=0)
+        return self.scale[None, :, None] * sums.transpose(1, 0, 2) + self.bias[None]
+
+    def predict(self, X) -> np.ndarray:
+        """CatBoost predict(RawFormulaVal)와 같은 값 — 회귀는 예측값, 이진 분류는 logit (단일 멤버)"""
+        raw = self.member_raw(X)[:, 0]
+        return raw[:, 0] if raw.shape[1] == 1 else raw
+
+    def predict_proba(self, X) -> np.ndarray:
+        """이진 분류(Logloss) 확률 [1 - p, p] (단일 멤버)"""
+        p = _sigmoid(self.member_raw(X)[:, 0, 0])
+        return np.column_stack([1 - p, p])
+
+    def member_probas(self, X) -> np.ndarray:
+        """(멤버, 행) 양성 확률 — merge된 앙상블을 한 번에 평가"""
+        return _sigmoid(self.member_raw(X)[:, :, 0].T)
+
+    # ─── 앙상블 병합 ─────────────────────────────
+    @classmethod
+    def merge(cls, models: list["ObliviousTrees"]) -> "ObliviousTrees":
+        """피처 구성이 같은 모델들의 트리를 이어 붙인 평가기 (멤버별 합계는 따로 계산)"""
+        first = models[0]
+        for m in models[1:]:
+            if (m.feature_names != first.feature_names or m.cat_values != first.cat_values
+                    or not np.array_equal(m.float_index, first.float_index)):
+                raise ValueError("피처 구성이 다른 모델은 병합할 수 없습니다.")
+
+        depth = max(m.tree_conds.shape[1] for m in models)
+        n_deps = max(m.cat_deps.shape[1] for m in models)
+        dim = first.leaf_values.shape[2]
+        # float 조건은 (피처, border)가 같으면 한 줄로 — 같은 데이터로 학습한 멤버는 border 대부분을 공유
+        float_conds: dict[tuple, int] = {}
+        float_maps = [np.array([float_conds.setdefault(key, len(float_conds))
+                                for key in zip(m.cond_feature.tolist(), m.cond_border.tolist())], dtype=np.intp)
+                      for m in models]
+        n_float = len(float_conds)
+        n_cat = sum(len(m.cat_deps) for m in models)
+        pad = n_float + n_cat
+
+        tree_conds, leaf_values, cat_deps, cat_tables = [], [], [], []
+        cat_offset = n_float
+        for m, float_map in zip(models, float_maps):
+            nc = len(m.cat_deps)
+            # 모델 조건 번호(float, 범주형, 채움 순) → 병합본 조건 번호
+            conds = np.concatenate([float_map, np.arange(cat_offset, cat_offset + nc), [pad]])[m.tree_conds]
+            conds = np.pad(conds, ((0, 0), (0, depth - conds.shape[1])), constant_values=pad)
+            values = np.zeros((m.tree_count, 2 ** depth, dim))
+            values[:, :m.leaf_values.shape[1]] = m.leaf_values
+            tree_conds.append(conds)
+            leaf_values.append(values)
+            # 조합 조건 번호도 병합 후 float 열 위치로 (채움 → 병합본의 채움 n_float), 표는 늘어난 비트만큼 0으로
+            deps = np.append(float_map, n_float)[m.cat_deps]
+            cat_deps.append(np.pad(deps, ((0, 0), (0, n_deps - deps.shape[1])), constant_values=n_float))
+            cat_tables.append(np.pad(m.cat_table, ((0, 0), (0, 2 ** n_deps - m.cat_table.shape[1]), (0, 0))))
+            cat_offset += nc
+
+        cond_feature, cond_border = zip(*float_conds) if float_conds else ((), ())
+        return cls(
+            first.feature_names, first.float_index, first.float_nan_max, first.cat_index, first.cat_values,
+            list(cond_feature), list(cond_border),
+            np.vstack(cat_deps), np.concatenate(cat_tables, axis=2), np.vstack(tree_conds), np.vstack(leaf_values),
+            np.concatenate([m.member_trees for m in models]),
+            np.concatenate([m.scale for m in models]), np.vstack([m.bias for m in models]),
+        )
+
+    # ─── 직렬화 ─────────────────────────────────
+    def to_params(self) -> dict:
+        return {
+            "feature_names": self.feature_names,
+            "float_index": self.float_index.tolist(),
+            "float_nan_max": self.float_nan_max.tolist(),
+            "cat_index": self.cat_index.tolist(),
+            "cat_values": self.cat_values,
+            "cond_feature": self.cond_feature.tolist(),
+            "cond_border": [float(b) for b in self.cond_border],
+            "cat_deps": self.cat_deps.tolist(),
+            "cat_table": self.cat_table.astype(int).tolist(),
+            "tree_conds": self.tree_conds.tolist(),
+            "leaf_values": self.leaf_values.tolist(),
+            "member_trees": self.member_trees.tolist(),
+            "scale": self.scale.tolist(),
+            "bias": self.bias.tolist(),
+        }
+
+    @classmethod
+    def from_params(cls, params: dict) -> "ObliviousTrees":
+        return cls(**params)
+
+
+class ArrayScaler:
+    """sklearn StandardScaler.transform과 같은 계산 (mean_ / scale_ 배열만 보관)"""
+
+    def __init__(self, mean, scale):
+        self.mean = np.asarray(mean, dtype=float)
+        self.scale = np.asarray(scale, dtype=float)
+
+    @classmethod
+    def from_sklearn(cls, scaler) -> "ArrayScaler":
+        n = scaler.n_features_in_
+        mean = scaler.mean_ if scaler.with_mean else np.zeros(n)
+        scale = scaler.scale_ if scaler.with_std else np.ones(n)
+        return cls(mean, scale)
+
+    def transform(self, X) -> np.ndarray:
+        X = np.array(X, dtype=float)
+        X -= self.mean
+        X /= self.scale
+        return X
+
+    def to_params(self) -> dict:
+        return {"mean": self.mean.tolist(), "scale": self.scale.tolist()}
+
+
+class ArrayImputer:
+    """sklearn SimpleImputer(missing_values=NaN).transform과 같은 계산 (statistics_ 배열만 보관)"""
+
+    def __init__(self, statistics, keep):
+        self.statistics = np.asarray(statistics, dtype=float)
+        self.keep = np.asarray(keep, dtype=bool)   # 학습 때 전부 결측이라 버려지는 열은 False
+
+    @classmethod
+    def from_sklearn(cls, imputer) -> "ArrayImputer":
+        if not (isinstance(imputer.missing_values, float) and np.isnan(imputer.missing_values)):
+            raise ValueError(f"지원하지 않는 imputer missing_values: {imputer.missing_values}")
+        if getattr(imputer, "add_indicator", False):
+            raise ValueError("add_indicator=True imputer는 지원하지 않습니다.")
+        statistics = np.asarray(imputer.statistics_, dtype=float)
+        keep = ~np.isnan(statistics) | bool(getattr(imputer, "keep_empty_features", False))
+        return cls(np.nan_to_num(statistics), keep)
+
+    def transform(self, X) -> np.ndarray:
+        X = np.array(X, dtype=float)
+        X = np.where(np.isnan(X), self.statistics, X)
+        return X[:, self.keep]
+
+    def to_params(self) -> dict:
+        return {"statistics": self.statistics.tolist(), "keep": self.keep.tolist()}
+
+
+def _matrix(values, dtype, n_rows: int) -> np.ndarray:
+    """2차원 배열 (열이 0개인 경우 JSON의 [] / [[], ...]도 (n_rows, 0)으로)"""
+    arr = np.asarray(values, dtype=dtype)
+    return arr if arr.ndim == 2 else np.zeros((n_rows, 0), dtype=dtype)
+
+
+def _bit_weights(n_bits: int) -> np.ndarray:
+    """조건 비트(uint8) → 번호 가중치 1, 2, 4, ... (8비트 이하면 uint8 그대로 합산)"""
+    return (1 << np.arange(n_bits)).astype(np.uint8 if n_bits <= 8 else np.intp)
+
+
+def _sigmoid(x: np.ndarray) -> np.ndarray:
+    return 1 / (1 + np.exp(-x))
+
+
+def _cat_str(value) -> str:
+    """CatBoost 범주 값 문자열화와 같게 (정수형 float 5.0 → "5")"""
+    if isinstance(value, (float, np.floating)) and float(value).is_integer():
+        return str(int(value))
+    return str(value)
+
+
+# ─── CatBoost → ObliviousTrees (catboost 필요) ─────────────────
+def export_catboost(model, categories: dict | None = None) -> ObliviousTrees:
+    """
+    학습된 CatBoost 모델 → ObliviousTrees.
+    categories: 범주형 피처 이름 → 서빙에서 들어올 값 목록 (DEFAULT_CATEGORIES에 더해짐).
+    목록에 없는 값은 학습 때 못 본 값으로 평가되므로, 학습 데이터 값을 함께 넘기는 것이 안전하다.
+    """
+    from catboost import Pool
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "model.json")
+        model.save_model(path, format="json")
+        with open(path, encoding="utf-8") as f:
+            j = json.load(f)
+
+    info = j["features_info"]
+    floats = sorted(info.get("float_features", []), key=lambda f: f["feature_index"])
+    cats = sorted(info.get("categorical_features", []), key=lambda f: f["feature_index"])
+    feature_names = list(model.feature_names_)
+    float_index = [f["flat_feature_index"] for f in floats]
+    float_nan_max = [f.get("nan_value_treatment") in ("AsTrue", "Max") for f in floats]
+    cat_index = [c["flat_feature_index"] for c in cats]
+    cat_names = [feature_names[i] for i in cat_index]
+    categories = categories or {}
+    cat_values = [list(dict.fromkeys(map(_cat_str, [*DEFAULT_CATEGORIES.get(name, ()), *categories.get(name, ())])))
+                  for name in cat_names]
+
+    # split_index → 이진 피처 (float border 전체, one-hot 값, CTR border 순으로 번호가 매겨짐)
+    binary = [None] * sum(len(f.get("borders") or []) for f in floats)
+    binary += [()] * sum(len(c.get("values") or []) for c in cats)   # one-hot: 범주 값에만 달림
+    for ctr in info.get("ctrs", []):
+        combo = tuple((e["float_feature_index"], float(np.float32(e["border"])))
+                      for e in ctr["elements"] if e.get("combination_element") == "float_feature")
+        binary += [combo] * len(ctr["borders"])
+
+    trees = j["oblivious_trees"]
+    depth = max((len(t.get("splits") or []) for t in trees), default=0)
+    float_conds: dict[tuple, int] = {}
+    cat_splits: list[tuple[int, int, tuple]] = []   # (트리, 깊이, 조합 float 조건 번호)
+    raw_conds = []   # 트리별 [("float", 조건 번호) | ("cat", 분기 번호)]
+    for t, tree in enumerate(trees):
+        conds = []
+        for k, split in enumerate(tree.get("splits") or []):
+            if split["split_type"] == "FloatFeature":
+                key = (split["float_feature_index"], float(np.float32(split["border"])))
+                conds.append(("float", float_conds.setdefault(key, len(float_conds))))
+            else:
+                deps = tuple(sorted({float_conds.setdefault(c, len(float_conds)) for c in binary[split["split_index"]]}))
+                conds.append(("cat", len(cat_splits)))
+                cat_splits.append((t, k, deps))
+        raw_conds.append(conds)
+    cond_feature = [f for f, _ in float_conds]
+    cond_border = [b for _, b in float_conds]
+
+    # 범주형 분기: (범주 값 조합 × 조합 float 비트)마다 CatBoost 잎 번호에서 해당 비트를 읽어 표로 만듦
+    n_rows = int(np.prod([len(v) + 1 for v in cat_values]))
+    n_deps = max((len(d) for _, _, d in cat_splits), default=0)
+    columns: dict[tuple, int] = {}   # (조합 조건, 표) → 범주형 열 번호 (같은 결과의 분기는 한 열로)
+    cat_cond_of_split: list[int] = []
+    cat_deps, cat_tables = [], []
+    if cat_splits:
+        missing = [name for name, values in zip(cat_names, cat_values) if not values]
+        if missing:
+            raise ValueError(f"범주형 분기가 있는 모델은 범주 값 목록이 필요합니다: {missing}")
+        grid = list(itertools.product(*[values + [UNKNOWN_CATEGORY] for values in cat_values]))
+        groups = list(dict.fromkeys(d for _, _, d in cat_splits))
+        probes, offsets = [], {}
+        for deps in groups:
+            offsets[deps] = sum(len(p) for p in probes)
+            probes.append(_probe_frame(feature_names, float_index, cat_names, grid, deps, cond_feature, cond_border))
+        leaf = np.asarray(model.calc_leaf_indexes(Pool(pd.concat(probes, ignore_index=True), cat_features=cat_names)))
+
+        for t, k, deps in cat_splits:
+            start, size = offsets[deps], len(grid) << len(deps)
+            table = np.zeros((n_rows, 2 ** n_deps), dtype=bool)
+            table[:, :1 << len(deps)] = ((leaf[start:start + size, t] >> k) & 1).reshape(n_rows, -1)
+            padded = deps + (len(cond_feature),) * (n_deps - len(deps))
+            key = (padded, table.tobytes())
+            if key not in columns:
+                columns[key] = len(columns)
+                cat_deps.append(padded)
+                cat_tables.append(table)
+            cat_cond_of_split.append(columns[key])
+    cat_table = np.stack(cat_tables, axis=2) if cat_tables else np.zeros((n_rows, 1, 0), dtype=bool)
+
+    n_float, n_cat = len(float_conds), len(cat_deps)
+    pad = n_float + n_cat
+    tree_conds = np.full((len(trees), depth), pad, dtype=np.intp)
+    dim = max(1, len(trees[0]["leaf_values"]) // 2 ** len(trees[0].get("splits") or [])) if trees else 1
+    leaf_values = np.zeros((len(trees), 2 ** depth, dim))
+    for t, (tree, conds) in enumerate(zip(trees, raw_conds)):
+        for k, (kind, idx) in enumerate(conds):
+            tree_conds[t, k] = idx if kind == "float" else n_float + cat_cond_of_split[idx]
+        values = np.asarray(tree["leaf_values"], dtype=float).reshape(-1, dim)
+        leaf_values[t, :len(values)] = values
+
+    scale, bias = j.get("scale_and_bias", [1.0, [0.0] * dim])
+    bias = bias if isinstance(bias, list) and bias else [float(bias or 0.0)] * dim
+    return ObliviousTrees(feature_names, float_index, float_nan_max, cat_index, cat_values,
+                          cond_feature, cond_border, np.reshape(cat_deps, (n_cat, n_deps)), cat_table,
+                          tree_conds, leaf_values, [len(trees)], [scale], [bias])
+
+
+def _probe_frame(feature_names, float_index, cat_names, grid, deps, cond_feature, cond_border) -> pd.DataFrame:
+    """
+    범주 값 조합 × 조합 float 조건 비트(2^len(deps)) 행 (범주 조합이 바깥, 비트 번호가 안쪽).
+    비트마다 해당 피처 값을 "1인 border 중 최대 < x ≤ 0인 border 중 최소"로 골라 재현
+    (같은 피처의 border끼리 모순되는 비트 조합은 도달할 수 없으므로 아무 값이나 둔다).
+    """
+    n_bits = 1 << len(deps)
+    values = np.zeros((n_bits, len(feature_names)), dtype=np.float32)
+    for a in range(n_bits):
+        bounds: dict[int, list] = {}
+        for k, c in enumerate(deps):
+            lo_hi = bounds.setdefault(cond_feature[c], [None, None])
+            if a >> k & 1:
+                lo_hi[0] = cond_border[c] if lo_hi[0] is None else max(lo_hi[0], cond_border[c])
+            else:
+                lo_hi[1] = cond_border[c] if lo_hi[1] is None else min(lo_hi[1], cond_border[c])
+        for f, (lo, hi) in bounds.items():
+            if hi is None:
+                hi = np.nextafter(np.float32(lo), np.float32(np.inf))
+            elif lo is not None and lo >= hi:
+                continue
+            values[a, float_index[f]] = hi
+
+    frame = pd.DataFrame(np.tile(values, (len(grid), 1)), columns=feature_names)
+    for i, name in enumerate(cat_names):
+        frame[name] = np.repeat([g[i] for g in grid], n_bits)
+    return frame
+
+
+def convert_bundle(bundle, categories: dict | None = None):
+    """모델 번들(dict) 안의 CatBoost 모델 / StandardScaler / SimpleImputer를 배열 버전으로 교체"""
+    if hasattr(bundle, "tree_count_"):
+        return export_catboost(bundle, categories)
+    if isinstance(bundle, dict) or hasattr(bundle, "items"):
+        return {k: convert_bundle(v, categories) for k, v in bundle.items()}
+    if isinstance(bundle, (list, tuple)):
+        return [convert_bundle(v, categories) for v in bundle]
+    if hasattr(bundle, "statistics_"):
+        return ArrayImputer.from_sklearn(bundle)
+    if hasattr(bundle, "scale_") and hasattr(bundle, "with_mean"):
+        return ArrayScaler.from_sklearn(bundle)
+    return bundle
+
+
+# ─── 번들 파일 (JSON) ─────────────────────────────
+_TYPES = {"oblivious_trees": ObliviousTrees, "scaler": ArrayScaler, "imputer": ArrayImputer}
+
+
+def _encode(value):
+    for tag, cls in _TYPES.items():
+        if isinstance(value, cls):
+            return {"__type__": tag, **value.to_params()}
+    if isinstance(value, dict) or hasattr(value, "items"):
+        return {k: _encode(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_encode(v) for v in value]
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def _decode(value):
+    if isinstance(value, dict):
+        tag = value.get("__type__")
+        if tag is not None:
+            params = {k: v for k, v in value.items() if k != "__type__"}
+            return _TYPES[tag].from_params(params) if tag == "oblivious_trees" else _TYPES[tag](**params)
+        return {k: _decode(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_decode(v) for v in value]
+    return value
+
+
+def save_tree_bundle(bundle, path):
+    """convert_bundle 결과를 JSON으로 저장 (임시 파일에 쓴 뒤 교체)"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"format": TREE_BUNDLE_FORMAT, "schema_version": TREE_BUNDLE_SCHEMA_VERSION,
+                   "bundle": _encode(bundle)}, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def load_tree_bundle(path):
+    """model_registry 로더: 트리 번들 JSON(경로 또는 파일 객체) → 배열 버전 번들 (catboost 없이 로딩)"""
+    if hasattr(path, "read"):
+        data = json.load(path)
+    else:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    if data.get("format") != TREE_BUNDLE_FORMAT:
+        raise ValueError(f"트리 번들 파일 형식이 아닙니다: {data.get('format')}")
+    if data.get("schema_version") != TREE_BUNDLE_SCHEMA_VERSION:
+        raise ValueError(f"지원하지 않는 트리 번들 버전입니다: {data.get('schema_version')}")
+    return _decode(data["bundle"])
+
+
+def load_pickled_bundle(path):
+    """CatBoost 번들 pickle → 배열 버전 번들 (변환 / 벤치용, catboost 필요 — 서빙 로더로 쓰지 않음)"""
+    from joblib import load
+    return convert_bundle(load(path))
+
+
+def tree_bundle_fetcher(json_key: str, pkl_path, pkl_key: str):
+    """
+    model_registry fetch: 트리 번들 JSON이 로컬에 없을 때 호출.
+    NCP의 JSON을 받고, JSON이 아직 없는 배포(NCP에 pickle만 있음)면 pickle을 받아 별도 프로세스에서 변환.
+    서빙 프로세스는 catboost를 import하거나 pickle을 읽지 않으며, 둘 다 실패하면 RuntimeError.
+    """
+    from utils.ncp_client import download_file_from_ncp
+
+    def fetch(path: Path):
+        try:
+            download_file_from_ncp(json_key, str(path))
+            return
+        except Exception as e:
+            logger.warning(f"[trees] {json_key} 다운로드 실패, pickle 변환 시도: {e}")
+        try:
+            if not Path(pkl_path).exists():
+                download_file_from_ncp(pkl_key, str(pkl_path))
+            subprocess.run([sys.executable, "-m", "recommend.oblivious_trees", str(pkl_path), str(path)],
+                           cwd=ROOT, check=True, capture_output=True, text=True)
+        except subprocess.CalledProcessError as e:
+            raise RuntimeError(f"{pkl_path} → {path} 트리 번들 변환 실패: {e.stderr.strip()}") from e
+        except Exception as e:
+            raise RuntimeError(f"{path} 트리 번들을 준비하지 못했습니다: {e}") from e
+
+    return fetch
+
+
+if __name__ == "__main__":
+    # python -m recommend.oblivious_trees model/model3.pkl model/model3.json
+    from joblib import load
+    src, dst = sys.argv[1], sys.argv[2]
+    save_tree_bundle(convert_bundle(load(src)), dst)
+    print(f"{src} → {dst}")
@@ -1,231 +1,197 @@
 # #top3_transfer_recommned.py
-# from pathlib import Path
-# from joblib import load
-# import pandas as pd
-# from recommend.hybrid_scheduler import HybridScheduler
-# from utils.preprocess import parse_model1_input
-
-# from utils.db_loader import get_latest_realtime_data
-# from recommend.hybrid_scheduler import EDGES_BY_ICD, RAW_PRIORITY_WEIGHTS
-# from utils.ncp_client import download_file_from_ncp 
-
-
-# import os
-# import logging
-# from io import BytesIO
-# from dotenv import load_dotenv
-
-# from utils import ncp_client
-
-# import os
-# from dotenv import load_dotenv
-# load_dotenv(dotenv_path=Path(__file__).resolve().parents[1] / ".env")
-
-
-# CODE_TO_ICD = {
-#     "01": "I21",
-#     "02": "I63",
-#     "03": "I60",
-#     "04": "I71",
-#     "05": "I71",
-# }
-# #─── 모델 로드 ─────────────────────
-# MODEL_PATH = Path(__file__).parent.parent / "model/model1.pkl"
-# model: HybridScheduler = load(MODEL_PATH)
-
-# ROOT = Path(__file__).parent.parent
-# LOCAL_MODEL_PATH = ROOT / "model" / "model1.pkl"
-# NCP_MODEL_KEY = "rmrp-models/model1.pkl"
-
-# # ─── 모델 로딩 함수 ─────────────────────────
-# def load_transfer_model() -> HybridScheduler:
-#     if not LOCAL_MODEL_PATH.exists():
-#         print("모델1 로컬에 없음 → NCP에서 다운로드 중")
-#         download_file_from_ncp(NCP_MODEL_KEY, str(LOCAL_MODEL_PATH))
-
-#     return load(LOCAL_MODEL_PATH)  
-
-
-# logger = logging.getLogger(__name__)
-# logging.basicConfig(level=logging.INFO)
-
-# # # ─── NCP에서 바로 모델을 로드 ────────────────────
-# # def load_model_from_ncp_direct(ncp_key: str):
-# #     logger.info(f"NCP에서 모델 직접 다운로드 중: {ncp_key}")
-# #     byte_data = ncp_client.get_object_bytes(ncp_key)  # 바이트로 가져오는 함수 구현되어 있어야 함
-# #     model_data = load(BytesIO(byte_data))
-# #     return model_data
-
-
-# def auto_transfer_recommend(icd_code: str) -> dict:
-#     """
-#     실시간 병상 정보 기반 자동 병동 추천
-#     - 공병상이 있는 병동 추천
-#     - 공병상 없어도 가중치 기반 추천
-#     - 최후 fallback: 비어 있는 병동이라도 추천
-#     """
-#     try:
-#         # 1. 실시간 병상 데이터 로딩
-#         realtime_json = get_latest_realtime_data()
-#         # 2. 병동 데이터 파싱
-#         bed_info = parse_model1_input(realtime_json)
-
-#         if not bed_info:
-#             return {
-#                 "recommended_wards": [],
-#                 "message": "실시간 병상 데이터가 없습니다."
-#             }
-
-#         df_live = pd.DataFrame(bed_info)
-#         df_live["total_beds"] = (
-#             df_live["embdCct"] +
-#             df_live["dschCct"] +
-#             df_live["useSckbCnt"] +
-#             df_live["admsApntCct"] +
-#             df_live["chupCct"]
-#         )
-
-#         df_live = df_live.groupby("ward", as_index=False).sum(numeric_only=True)
-#         df_live["occupancy"] = df_live["useSckbCnt"] / df_live["total_beds"].replace(0, 1)
-
-#         print("입력된 병동 목록:", df_live["ward"].unique())
-#         print("병상 수 요약:\n", df_live[["ward", "embdCct", "dschCct", "useSckbCnt", "admsApntCct", "chupCct", "total_beds"]])
-
-#         # 3. 모델 기반 추천 시도
-#         model = load_transfer_model()
-#         # model = model_data
-#         ranked = model.recommend(icd=icd_code, df_live=df_live, top_k=3)
-#         print("모델 추천 결과:", ranked)
-#         print(" >> 추천 후보군 (점수 있는 ward 수):", len(ranked))
-#         print(" >> 추천 점수 목록:", ranked)
-
-#         if ranked:
-#          return {
-#             "recommended_wards": [{"ward": w, "score": round(s, 5)} for w, s in ranked],
-#             "icd": icd_code
-#             }
-
-# # fallback
-#         fallback_df = df_live.sort_values("occupancy").head(3)
-#         fallback_result = [
-#              {"ward": row["ward"], "score": 0.0}
-#              for _, row in fallback_df.iterrows()
-#         ]
-
-#         return {
-#                "recommended_wards": fallback_result,
-#                 "icd": icd_code,
-#                 "fallback": True
-#           }
-
-#     except Exception as e:
-#          raise ValueError(f"자동 전실 추천 오류: {e}")
-#top3_transfer_recommned.py
-from pathlib import Path
-from joblib import load
-import pandas as pd
-from recommend.hybrid_scheduler import HybridScheduler
-from utils.preprocess import parse_model1_input
-
-from utils.db_loader import get_latest_realtime_data
-from recommend.hybrid_scheduler import EDGES_BY_ICD, RAW_PRIORITY_WEIGHTS
-from utils.ncp_client import download_file_from_ncp 
-
-
-from utils.preprocess import parse_model1_input, parse_bed_status_counts
-from utils.ncp_client import download_file_from_ncp 
-
-
-import os
 import logging
-from io import BytesIO
-from dotenv import load_dotenv
-
-from utils import ncp_client
-from utils.db_loader import get_latest_realtime_data
+import threading
+from pathlib import Path
 
-#─── 모델 로드 ─────────────────────
-MODEL_PATH = Path(__file__).parent.parent / "model/model1.pkl"
-model: HybridScheduler = load(MODEL_PATH)
+from recommend.hybrid_scheduler import (
+    CODE_TO_ICD, EDGES_BY_ICD, WARD_TOPOLOGY, HybridScheduler, make_state_from_snapshot, load_params
+)
+from recommend.icd_index import IcdIndex
+from utils.model_registry import model_registry
+from utils.preprocess import WARD_ROUTES
+from utils.snapshot_store import snapshot_store
+from utils.ward_snapshot import WardSnapshot
 
+#─── 모델 등록 ─────────────────────
 ROOT = Path(__file__).parent.parent
 LOCAL_MODEL_PATH = ROOT / "model" / "model1.pkl"
 NCP_MODEL_KEY = "rmrp-models/model1.pkl"
+LOCAL_PARAMS_PATH = ROOT / "model" / "model1.json"
+NCP_PARAMS_KEY = "rmrp-models/model1.json"
+
+# 파라미터 JSON을 우선 사용, JSON이 없고 이전 pickle만 있는 배포에서는 pickle을 그대로 로딩
+if LOCAL_PARAMS_PATH.exists() or not LOCAL_MODEL_PATH.exists():
+    model_registry.register("model1", LOCAL_PARAMS_PATH, NCP_PARAMS_KEY, loader=load_params)
+else:
+    model_registry.register("model1", LOCAL_MODEL_PATH, NCP_MODEL_KEY)
 
 # ─── 모델 로딩 함수 ─────────────────────────
 def load_transfer_model() -> HybridScheduler:
-    if not LOCAL_MODEL_PATH.exists():
-        print("모델1 로컬에 없음 → NCP에서 다운로드 중")
-        download_file_from_ncp(NCP_MODEL_KEY, str(LOCAL_MODEL_PATH))
-
-    return load(LOCAL_MODEL_PATH)  
+    """레지스트리가 공유하는 model1 (읽기 전용 — 갱신은 copy()한 객체로)"""
+    return model_registry.get("model1").artifact
 
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
-CODE_TO_ICD = {
-    "01": "I21",
-    "02": "I63",
-    "03": "I60",
-    "04": "I71",
-    "05": "I71",
-}
-# ─── 모델 로드 ─────────────────────
-MODEL_PATH = Path(__file__).parent.parent / "model/model1.pkl"
-model: HybridScheduler = load(MODEL_PATH)
-def auto_transfer_recommend(icd_code: str) -> dict:
-    print(f"입력 ICD 코드: {icd_code}")
 
-    try:
-        realtime_json = get_latest_realtime_data()
-        bed_info = parse_model1_input(realtime_json)
-        print(f"▶ 실시간 병상 데이터 수: {len(bed_info)}")
-
-        if not bed_info:
-            return {
-                "recommended_wards": [],
-                "message": "실시간 병상 데이터가 없습니다."
-            }
-
-        df_live = pd.DataFrame(bed_info)
-        df_live["total_beds"] = (
-            df_live["embdCct"] +
-            df_live["dschCct"] +
-            df_live["useSckbCnt"] +
-            df_live["admsApntCct"] +
-            df_live["chupCct"]
-        )
-        df_live = df_live.groupby("ward", as_index=False).sum(numeric_only=True)
-        df_live["occupancy"] = df_live["useSckbCnt"] / df_live["total_beds"].replace(0, 1)
-        print("▶ 실시간 병동 목록:", df_live["ward"].tolist())
-
-        model = load_transfer_model()
-        ranked = model.recommend(icd=icd_code, df_live=df_live, top_k=3)
-        print("▶ 모델 추천 결과:", ranked)
-
-        if ranked:
-            return {
-                "recommended_wards": [{"ward": w, "score": round(s, 5)} for w, s in ranked],
-                "icd": icd_code
-            }
-
-        # fallback
-        fallback_wards = EDGES_BY_ICD.get(icd_code, [])
-        print("▶ fallback 병동:", fallback_wards)
-        fallback_result = [{"ward": w, "score": 0.0} for w in fallback_wards]
-
-        if fallback_result:
-            return {
-                "recommended_wards": fallback_result,
-                "icd": icd_code,
-                "fallback": True
-            }
+TOP_K = 3
 
+def _transfer_response(icd_code: str, ranked: list) -> dict:
+    """모델 순위 → /transfer/recommend 응답 형태 (순위가 없으면 EDGES_BY_ICD fallback)"""
+    if ranked:
         return {
-            "recommended_wards": [],
-            "message": "모델 및 fallback 모두 실패",
+            "recommended_wards": [{"ward": w, "score": round(s, 5)} for w, s in ranked],
             "icd": icd_code
         }
 
+    # fallback
+    fallback_wards = EDGES_BY_ICD.get(icd_code, [])
+    fallback_result = [{"ward": w, "score": 0.0} for w in fallback_wards]
+
+    if fallback_result:
+        return {
+            "recommended_wards": fallback_result,
+            "icd": icd_code,
+            "fallback": True
+        }
+
+    return {
+        "recommended_wards": [],
+        "message": "모델 및 fallback 모두 실패",
+        "icd": icd_code
+    }
+
+def build_transfer_rows(realtime_json: dict, model: HybridScheduler, icds: list[str],
+                        origin: str | None = None) -> dict[str, dict | Exception]:
+    """스냅샷 1개 × ICD 목록의 추천 응답 (점수 계산 오류는 ICD별 예외로 보관, origin: 출발 병동)"""
+    snap = WardSnapshot.for_model1(realtime_json)
+    if not snap:
+        return {icd: {"recommended_wards": [], "message": "실시간 병상 데이터가 없습니다."} for icd in icds}
+
+    state = make_state_from_snapshot(snap)
+    ranked = model.matrix.rank_all(state, icds, top_k=TOP_K, origin=origin)
+    return {icd: r if isinstance(r, Exception) else _transfer_response(icd, r) for icd, r in ranked.items()}
+
+
+def origin_ward(origin: str | None) -> str | None:
+    """출발 병동 입력(병동명 또는 wardCd) → 배치 그래프의 병동명 (모르는 병동은 None = 기본 거리)"""
+    if origin is None:
+        return None
+    origin = str(origin).strip()
+    route = WARD_ROUTES.get(origin)
+    name = route[0] if route else origin
+    return name if name in WARD_TOPOLOGY.ward_index else None
+
+
+# ─── 스냅샷 × 모델 버전별 추천 테이블 ─────────────────────
+class TransferTable:
+    """
+    EDGES_BY_ICD 전체 ICD의 top-k 추천을 (스냅샷 reg_dtm, model1 버전) 단위로 1회 계산해 보관.
+    새 스냅샷이나 새 모델이 들어온 뒤 첫 요청에서 다시 만들고, 그 외 요청은 dict 조회만 한다.
+    """
+
+    def __init__(self):
+        # (key, {출발 병동: {icd: 응답 | 예외}}, ICD 인덱스) — 통째로 교체
+        # 출발 병동 None(기본 거리) 행은 갱신 때 만들고, 병동별 행은 그 병동 첫 요청 때 추가
+        self._table: tuple = (None, {}, IcdIndex(()))
+        self._lock = threading.Lock()
+
+    def _current(self) -> tuple[dict, HybridScheduler, dict, IcdIndex]:
+        """현재 (스냅샷, 모델, 추천 테이블, ICD 인덱스) — 키가 바뀌었으면 테이블을 다시 만듦"""
+        realtime_json = snapshot_store.latest()
+        loaded = model_registry.get("model1")
+        key = (realtime_json.get("_timestamp"), loaded.version)
+
+        current_key, rows, index = self._table
+        if key != current_key:
+            with self._lock:
+                current_key, rows, index = self._table
+                if key != current_key:
+                    icds = list(dict.fromkeys([*EDGES_BY_ICD, *loaded.artifact.edges]))
+                    rows = {None: build_transfer_rows(realtime_json, loaded.artifact, icds)}
+                    index = IcdIndex(icds, CODE_TO_ICD)
+                    self._table = (key, rows, index)
+                    logger.info(f"[transfer] 추천 테이블 갱신 (snapshot={key[0]}, model1={key[1]})")
+        return realtime_json, loaded.artifact, rows, index
+
+    def _with_origin(self, realtime_json: dict, model: HybridScheduler, rows: dict, origin: str) -> dict:
+        """출발 병동 origin의 행을 추가한 테이블 (그 사이 테이블이 교체됐으면 보관하지 않고 이번 요청에만 사용)"""
+        with self._lock:
+            key, current, index = self._table
+            if current.get(None) is not rows[None]:   # 다른 스냅샷/모델의 테이블로 교체됨
+                current = rows
+            elif origin in current:
+                return current
+            added = {**current, origin: build_transfer_rows(realtime_json, model, list(current[None]), origin)}
+            if current is self._table[1]:
+                self._table = (key, added, index)
+            return added
+
+    def assign_many(self, icd_codes: list[str], origins: list[str | None] | None = None) -> list[tuple | None]:
+        """
+        같은 스냅샷·모델 기준으로 여러 환자를 동시에 배정 (HybridScheduler.assign).
+        입력 코드는 그 모델의 ICD 인덱스로 그룹에 대응 (I63.9, I630, dissCd "02" → I63), 대응 그룹이 없으면 입력 그대로.
+        """
+        realtime_json, model, _, index = self._current()
+        state = make_state_from_snapshot(WardSnapshot.for_model1(realtime_json))
+        icds = [index.resolve(icd) or icd for icd in icd_codes]
+        origins = [origin_ward(o) for o in origins] if origins else None
+        return model.assign(icds, state=state, origins=origins)
+
+    def lookup_many(self, icd_codes: list[str], origins: list[str | None] | None = None) -> list[dict | Exception]:
+        """
+        같은 스냅샷·모델 기준으로 ICD 목록의 추천을 입력 순서대로 반환 (ICD별 오류는 예외 객체).
+        입력 코드는 ICD 인덱스로 그룹에 대응시킨 뒤 조회하고, origins(환자별 출발 병동)가 있으면 그 병동 기준 행을 쓴다.
+        그래도 테이블에 없는 ICD는 중복을 제거해 점수 행렬 1회로 함께 계산 (임의 입력으로 테이블이 커지지 않게 보관은 안 함)
+        """
+        realtime_json, model, rows, index = self._current()
+        icd_codes = [index.resolve(icd) or icd for icd in icd_codes]
+        origins = [origin_ward(o) for o in origins] if origins else [None] * len(icd_codes)
+        for origin in dict.fromkeys(origins):
+            if origin not in rows:
+                rows = self._with_origin(realtime_json, model, rows, origin)
+
+        pairs = list(zip(icd_codes, origins))
+        for origin in dict.fromkeys(origins):
+            missing = [icd for icd, o in dict.fromkeys(pairs) if o == origin and icd not in rows[origin]]
+            if missing:
+                rows = {**rows, origin: {**rows[origin], **build_transfer_rows(realtime_json, model, missing, origin)}}
+        return [rows[o][icd] for icd, o in pairs]
+
+    def lookup(self, icd_code: str, origin: str | None = None) -> dict:
+        row = self.lookup_many([icd_code], [origin])[0]
+        if isinstance(row, Exception):
+            raise row
+        return row
+
+
+transfer_table = TransferTable()
+
+def auto_transfer_recommend(icd_code: str, origin: str | None = None) -> dict:
+    try:
+        return transfer_table.lookup(icd_code, origin)
     except Exception as e:
         raise ValueError(f"자동 전실 추천 오류: {e}")
+
+def auto_transfer_recommend_batch(icd_codes: list[str], origins: list[str | None] | None = None) -> list[dict | ValueError]:
+    """
+    여러 환자의 ICD를 한 스냅샷 기준으로 한 번에 추천 (origins: 환자별 출발 병동, 선택).
+    결과는 입력 순서대로 auto_transfer_recommend와 같은 dict이며, 해당 ICD만 실패한 경우 ValueError 객체.
+    스냅샷/모델 자체를 못 읽으면 ValueError를 발생시킨다.
+    """
+    try:
+        rows = transfer_table.lookup_many(icd_codes, origins)
+    except Exception as e:
+        raise ValueError(f"자동 전실 추천 오류: {e}")
+    return [ValueError(f"자동 전실 추천 오류: {r}") if isinstance(r, Exception) else r for r in rows]
+
+def auto_transfer_assign(icd_codes: list[str], origins: list[str | None] | None = None) -> list[dict | None]:
+    """
+    여러 환자를 병동별 빈 병상 수 안에서 동시에 배정 (HybridScheduler.assign).
+    결과는 입력 순서대로 {"ward", "score"}이며, 빈 병상이 모자라 배정되지 못한 환자는 None.
+    """
+    try:
+        assigned = transfer_table.assign_many(icd_codes, origins)
+    except Exception as e:
+        raise ValueError(f"자동 전실 배정 오류: {e}")
+    return [{"ward": a[0], "score": round(a[1], 5)} if a else None for a in assigned]
@@ -0,0 +1,76 @@
+# recommend/ward_topology.py >> 병동 간 이동 비용 그래프 (건물 · 층 · 엘리베이터)
+import numpy as np
+
+
+class WardTopology:
+    """
+    병동 배치 그래프의 모든 지점 쌍 최단 이동 비용을 한 번 계산(Floyd–Warshall)해 둔 dense 행렬.
+
+    노드 : 병동, (건물, 층) 승강장
+    간선 : 병동 ↔ 그 층 승강장                         비용 0
+           엘리베이터가 서는 인접 층 승강장끼리          층 차이 (+ 탑승 대기 elevator_wait)
+           건물 간 연결 통로 links ((건물, 층), (건물, 층), 비용)
+    비용은 층 수 단위로 합산한 뒤 unit_cost를 곱한다 (elevator_wait가 0이면 정수 합산이라 반올림 오차 없음).
+    조회는 행렬 인덱싱뿐이라 요청마다 경로를 계산하지 않는다.
+    """
+
+    def __init__(self, locations: dict[str, tuple[str, int]], elevators: dict[str, list[int]] | None = None,
+                 links: list[tuple] = (), unit_cost: float = 0.1, elevator_wait: float = 0.0):
+        self.locations = dict(locations)
+        if elevators is None:   # 건물마다 병동이 있는 최저~최고층을 모두 서는 엘리베이터 1대
+            floors: dict[str, list[int]] = {}
+            for building, floor in self.locations.values():
+                floors.setdefault(building, []).append(floor)
+            elevators = {b: list(range(min(fs), max(fs) + 1)) for b, fs in floors.items()}
+
+        hubs = {loc for loc in self.locations.values()}
+        hubs.update((b, f) for b, fs in elevators.items() for f in fs)
+        hubs.update(end for a, b, _ in links for end in (a, b))
+
+        self.wards = tuple(self.locations)
+        self.ward_index = {w: i for i, w in enumerate(self.wards)}
+        self.hubs = tuple(sorted(hubs))
+        self.hub_index = {h: len(self.wards) + i for i, h in enumerate(self.hubs)}
+
+        n = len(self.wards) + len(self.hubs)
+        d = np.full((n, n), np.inf)
+        np.fill_diagonal(d, 0.0)
+
+        def connect(a: int, b: int, cost: float):
+            d[a, b] = d[b, a] = min(d[a, b], cost)
+
+        for w, loc in self.locations.items():
+            connect(self.ward_index[w], self.hub_index[loc], 0.0)
+        for building, fs in elevators.items():
+            fs = sorted(set(fs))
+            for lo, hi in zip(fs, fs[1:]):
+                connect(self.hub_index[(building, lo)], self.hub_index[(building, hi)], (hi - lo) + elevator_wait)
+        for a, b, cost in links:
+            connect(self.hub_index[a], self.hub_index[b], cost)
+
+        # Floyd–Warshall (경유 노드 k마다 행렬 전체를 한 번에 갱신)
+        for k in range(n):
+            np.minimum(d, d[:, k, None] + d[None, k, :], out=d)
+        self.costs = d * unit_cost   # (병동 + 승강장) 전체 쌍
+
+        idx = list(self.ward_index.values())
+        self.matrix = self.costs[np.ix_(idx, idx)]   # 병동 × 병동
+
+    def _node(self, origin) -> int | None:
+        """병동명 또는 (건물, 층) → 노드 인덱스"""
+        i = self.ward_index.get(origin) if isinstance(origin, str) else None
+        return i if i is not None else self.hub_index.get(origin)
+
+    def cost(self, origin, ward: str, default: float = 0.0) -> float:
+        i, j = self._node(origin), self.ward_index.get(ward)
+        if i is None or j is None or not np.isfinite(self.costs[i, j]):
+            return default
+        return float(self.costs[i, j])
+
+    def costs_from(self, origin) -> dict[str, float]:
+        """origin(병동명 또는 (건물, 층))에서 각 병동까지 이동 비용 (도달 불가 병동 제외)"""
+        i = self._node(origin)
+        if i is None:
+            raise KeyError(origin)
+        row = self.costs[i, :len(self.wards)]
+        return {w: float(row[j]) for w, j in self.ward_index.items() if np.isfinite(row[j])}
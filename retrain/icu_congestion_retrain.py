@@ -20,11 +20,14 @@ load_dotenv(dotenv_path=ROOT / ".env")
 from utils.db_loader import get_api_logs_raw
 from utils.preprocess import parse_model23_input, preprocess
 from utils.ncp_client import upload_file_to_ncp
+from recommend.oblivious_trees import convert_bundle, save_tree_bundle
 
 
 # ─── 경로 설정 ───────────────────────────────
 LOCAL_MODEL_PATH = Path(os.getenv("LOCAL_MODEL2_PATH", "./model/model2.pkl"))
 NCP_MODEL_KEY = os.getenv("NCP_MODEL2_KEY", "rmrp-models/model2.pkl")
+LOCAL_TREES_PATH = Path(os.getenv("LOCAL_MODEL2_TREES_PATH", "./model/model2.json"))
+NCP_TREES_KEY = os.getenv("NCP_MODEL2_TREES_KEY", "rmrp-models/model2.json")
 NCP_MODEL_ARCHIVE_DIR = os.getenv("NCP_MODEL2_ARCHIVE_DIR", "archive/model2/")
 ARCHIVE_MODEL_DIR = Path(os.getenv("ARCHIVE_MODEL_DIR", "./data/archive/models"))
 
@@ -55,20 +58,25 @@ def load_parsed_records(days: int = 1) -> pd.DataFrame:
     return pd.DataFrame(records)
 
 # ─── 모델 저장 및 NCP 업로드 ─────────────────────────
-def save_model_and_upload(model_dict: dict):
-    # 1. 로컬 저장
-    joblib.dump(model_dict, LOCAL_MODEL_PATH)
+def save_model_and_upload(model_dict: dict, categories: dict | None = None):
+    # 1. 로컬 저장: 서빙용 트리 배열 번들(JSON)을 먼저 — 서빙 프로세스는 catboost 없이 이 파일로 추론
+    save_tree_bundle(convert_bundle(model_dict, categories), LOCAL_TREES_PATH)
+    # 원본 pickle (아카이브 / 재변환용): 임시 파일에 쓴 뒤 교체
+    tmp_path = LOCAL_MODEL_PATH.with_suffix(".pkl.tmp")
+    joblib.dump(model_dict, tmp_path)
+    os.replace(tmp_path, LOCAL_MODEL_PATH)
 
     # 2. 버전 아카이브 저장
     ts = datetime.now(timezone.utc).strftime("%Y%m%d%H%M%S")
     archive_name = f"icu_congestion_{ts}.pkl"
     archive_path = ARCHIVE_MODEL_DIR / archive_name
     shutil.copy(LOCAL_MODEL_PATH, archive_path)
-    logger.info(f"[저장] 로컬 모델 → {LOCAL_MODEL_PATH}")
+    logger.info(f"[저장] 로컬 모델 → {LOCAL_MODEL_PATH} (+ {LOCAL_TREES_PATH})")
     logger.info(f"[저장] 아카이브 → {archive_path}")
 
     # 3. NCP 업로드
     try:
+        upload_file_to_ncp(str(LOCAL_TREES_PATH), NCP_TREES_KEY)
         upload_file_to_ncp(str(LOCAL_MODEL_PATH), NCP_MODEL_KEY)
         upload_file_to_ncp(str(LOCAL_MODEL_PATH), f"{NCP_MODEL_ARCHIVE_DIR}{archive_name}")
         logger.info(f"[NCP] 업로드 완료 → {NCP_MODEL_ARCHIVE_DIR}{archive_name}")
@@ -137,7 +145,7 @@ def model2_retrain():
     model.fit(X, y)
 
     # ── 모델 저장 및 업로드 ─────────────────────────────
-    save_model_and_upload({"models": [model]})
+    save_model_and_upload({"models": [model]}, {"ward_code": X["ward_code"].astype(str).unique()})
 
 # ─── 스크립트 실행 시 ───────────────────────
 if __name__ == "__main__":
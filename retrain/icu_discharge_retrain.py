@@ -21,6 +21,7 @@ from utils.preprocess import (
 )
 
 from utils.ncp_client import upload_file_to_ncp
+from recommend.oblivious_trees import convert_bundle, save_tree_bundle
 
 
 # ─── 환경 설정 ─────────────────
@@ -30,6 +31,8 @@ load_dotenv(dotenv_path=ROOT / ".env")
 ARCHIVE_MODEL_DIR = Path(os.getenv("ARCHIVE_MODEL_DIR", "./data/archive/models"))
 LOCAL_MODEL_PATH = Path(os.getenv("LOCAL_MODEL3_PATH", "./model/model3.pkl"))
 NCP_MODEL_KEY = os.getenv("NCP_MODEL3_KEY", "rmrp-models/model3.pkl")
+LOCAL_TREES_PATH = Path(os.getenv("LOCAL_MODEL3_TREES_PATH", "./model/model3.json"))
+NCP_TREES_KEY = os.getenv("NCP_MODEL3_TREES_KEY", "rmrp-models/model3.json")
 
 LOCAL_MODEL_PATH.parent.mkdir(exist_ok=True, parents=True)
 ARCHIVE_MODEL_DIR.mkdir(parents=True, exist_ok=True)
@@ -38,19 +41,25 @@ logger = logging.getLogger("ICU_DISCHARGE_RETRAIN")
 logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
 
 # ─── 모델 저장 + NCP 업로드 ─────────────────────
-def save_model_and_upload(model_dict: dict):
-    joblib.dump(model_dict, LOCAL_MODEL_PATH)
+def save_model_and_upload(model_dict: dict, categories: dict | None = None):
+    # 로컬 저장: 서빙용 트리 배열 번들(JSON)을 먼저 — 서빙 프로세스는 catboost 없이 이 파일로 추론
+    save_tree_bundle(convert_bundle(model_dict, categories), LOCAL_TREES_PATH)
+    # 원본 pickle (아카이브 / 재변환용): 임시 파일에 쓴 뒤 교체
+    tmp_path = LOCAL_MODEL_PATH.with_suffix(".pkl.tmp")
+    joblib.dump(model_dict, tmp_path)
+    os.replace(tmp_path, LOCAL_MODEL_PATH)
 
     ts = datetime.now(timezone.utc).strftime("%Y%m%d%H%M%S")
     archive_path = ARCHIVE_MODEL_DIR / f"icu_discharge_{ts}.pkl"
     shutil.copy(LOCAL_MODEL_PATH, archive_path)
 
-    logger.info(f"[저장] 로컬 모델 → {LOCAL_MODEL_PATH}")
+    logger.info(f"[저장] 로컬 모델 → {LOCAL_MODEL_PATH} (+ {LOCAL_TREES_PATH})")
     logger.info(f"[저장] 아카이브 → {archive_path}")
 
     try:
+        upload_file_to_ncp(str(LOCAL_TREES_PATH), NCP_TREES_KEY)
         upload_file_to_ncp(str(LOCAL_MODEL_PATH), NCP_MODEL_KEY)
-        logger.info(f"[NCP] 업로드 완료 → {NCP_MODEL_KEY}")
+        logger.info(f"[NCP] 업로드 완료 → {NCP_MODEL_KEY}, {NCP_TREES_KEY}")
     except Exception as e:
         logger.error(f"[NCP] 업로드 실패 → {e}")
 
@@ -104,7 +113,7 @@ def model3_retrain():
     )
     model.fit(X, y)
 
-    save_model_and_upload({"models": [model]})
+    save_model_and_upload({"models": [model]}, {"ward_code": X["ward_code"].astype(str).unique()})
 
 # ─── 실행 ─────────────────────────────
 if __name__ == "__main__":
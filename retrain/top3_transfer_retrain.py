@@ -92,3 +92,119 @@
 # if __name__ == "__main__":
 #     dummy_api_records = [{"dissCd": f"{i:02d}"} for i in range(1, 6)]
 #     model1_retrain(dummy_api_records)
+
+# retrain/top3_transfer_retrain.py
+import os
+import sys
+import joblib
+import shutil
+import logging
+import argparse
+from pathlib import Path
+from datetime import datetime, timedelta, timezone
+from dotenv import load_dotenv
+
+# ─── 경로 및 환경설정 ─────────────────────────────
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+load_dotenv(dotenv_path=ROOT / ".env")
+
+from utils.db_loader import get_realtime_data_for_date, get_latest_realtime_data_for_days_ago
+from utils.infer_feedback_from_api import infer_feedback_from_logs
+from utils.ncp_client import upload_file_to_ncp
+from recommend.hybrid_scheduler import HybridScheduler, load_params, save_params
+
+# ─── 경로 설정 ───────────────────────────────
+LOCAL_MODEL_PATH = Path(os.getenv("LOCAL_MODEL1_PATH", "./model/model1.json"))
+LEGACY_MODEL_PATH = Path(os.getenv("LOCAL_MODEL1_PKL_PATH", "./model/model1.pkl"))   # 이전 pickle 아티팩트
+NCP_MODEL_KEY = os.getenv("NCP_MODEL1_KEY", "rmrp-models/model1.json")
+NCP_MODEL_ARCHIVE_DIR = os.getenv("NCP_MODEL1_ARCHIVE_DIR", "archive/model1/")
+ARCHIVE_MODEL_DIR = Path(os.getenv("ARCHIVE_MODEL_DIR", "./data/archive/models"))
+
+# ─── 경로 생성 ───────────────────────────────
+LOCAL_MODEL_PATH.parent.mkdir(parents=True, exist_ok=True)
+ARCHIVE_MODEL_DIR.mkdir(parents=True, exist_ok=True)
+
+logger = logging.getLogger("TRANSFER_RETRAIN")
+logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+
+# ─── 모델 로딩 또는 초기화 ─────────────────────────
+def load_or_init_scheduler(rebuild: bool = False) -> HybridScheduler:
+    if LOCAL_MODEL_PATH.exists() and not rebuild:
+        logger.info("[모델1] 기존 파라미터 로딩")
+        return load_params(LOCAL_MODEL_PATH)
+    if LEGACY_MODEL_PATH.exists() and not rebuild:
+        logger.info("[모델1] 파라미터 파일이 없어 이전 pickle 모델에서 이어서 학습")
+        return joblib.load(LEGACY_MODEL_PATH)
+    logger.info("[모델1] 새 HybridScheduler 생성 (pheromone 초기값부터 학습)")
+    return HybridScheduler()
+
+# ─── 병상 로그 → 전실 피드백 ─────────────────────────
+def feedback_window(days: int = 1) -> tuple:
+    """재학습 구간 (days일 전, 어제) — 피드백이 없는 날도 pheromone 증발에 포함"""
+    today = datetime.now().date()
+    return today - timedelta(days=days), today - timedelta(days=1)
+
+
+def load_feedbacks(days: int = 1) -> list[dict]:
+    """어제부터 days일 전까지의 스냅샷을 하루씩 시간순으로 읽어 새 입원예약 피드백 생성 (재학습용 replica 풀)"""
+    today = datetime.now().date()
+
+    def records():
+        for n in range(days, 0, -1):
+            yield from reversed(get_realtime_data_for_date(today - timedelta(days=n), role="replica"))
+
+    try:
+        prev_record = get_latest_realtime_data_for_days_ago(days + 1, role="replica")
+    except ValueError:
+        prev_record = None
+    return infer_feedback_from_logs(records(), prev_record=prev_record)
+
+# ─── 모델 저장 및 NCP 업로드 ─────────────────────────
+def save_model_and_upload(scheduler: HybridScheduler):
+    # 1. 로컬 저장: 파라미터 JSON (save_params가 임시 파일에 쓴 뒤 교체)
+    save_params(scheduler, LOCAL_MODEL_PATH)
+
+    # 2. 버전 아카이브 저장
+    ts = datetime.now(timezone.utc).strftime("%Y%m%d%H%M%S")
+    archive_name = f"top3_transfer_{ts}.json"
+    archive_path = ARCHIVE_MODEL_DIR / archive_name
+    shutil.copy(LOCAL_MODEL_PATH, archive_path)
+    logger.info(f"[저장] 로컬 모델 → {LOCAL_MODEL_PATH}")
+    logger.info(f"[저장] 아카이브 → {archive_path}")
+
+    # 3. NCP 업로드
+    try:
+        upload_file_to_ncp(str(LOCAL_MODEL_PATH), NCP_MODEL_KEY)
+        upload_file_to_ncp(str(LOCAL_MODEL_PATH), f"{NCP_MODEL_ARCHIVE_DIR}{archive_name}")
+        logger.info(f"[NCP] 업로드 완료 → {NCP_MODEL_ARCHIVE_DIR}{archive_name}")
+    except Exception as e:
+        logger.error(f"[NCP] 업로드 실패 → {e}")
+
+# ─── 메인 재학습 함수 ───────────────────────
+def model1_retrain(days: int = 1, rebuild: bool = False):
+    """
+    매일 00:00: 어제 하루치 피드백으로 기존 pheromone을 이어서 갱신 (days=1).
+    rebuild=True: 초기 pheromone에서 시작해 days일 이력 전체로 다시 학습.
+    """
+    logger.info(f"Top3 Transfer 모델 pheromone 학습 시작 (days={days}, rebuild={rebuild})")
+    # 불러온 모델은 그대로 두고 복사본을 갱신 (서빙 쪽처럼 공유되는 객체일 수 있음 — 새 객체만 저장)
+    scheduler = load_or_init_scheduler(rebuild).copy()
+
+    feedbacks = load_feedbacks(days)
+    if not feedbacks:
+        logger.warning("관측된 전실(입원예약) 피드백이 없습니다. 증발만 반영합니다.")
+
+    stats = scheduler.update_feedback(feedbacks, window=feedback_window(days))
+    logger.info(f"pheromone 갱신 완료: {stats}")
+
+    save_model_and_upload(scheduler)
+    return {"status": "updated", **stats}
+
+# ─── 스크립트 실행 시 ───────────────────────
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--days", type=int, default=1)
+    parser.add_argument("--rebuild", action="store_true")
+    args = parser.parse_args()
+    model1_retrain(days=args.days, rebuild=args.rebuild)
@@ -0,0 +1,122 @@
+# bench_aco_feedback.py
+# HybridScheduler.update_feedback (ACO pheromone 학습) 확인 + 속도
+#   - ICD별로 "실제로 주로 가는 병동"을 정해 둔 합성 전실 이력으로 학습 → 그 병동의 pheromone이 가장 커지는지 확인
+#   - 사건이 없는 날도 증발하는지 (감쇠가 사건 빈도가 아닌 경과 일수에 비례)
+#   - copy()한 스케줄러를 갱신해도 원본(레지스트리가 공유하는 모델)은 그대로인지
+#   - 이력 기간(일)별 학습 시간
+#   - infer_feedback_from_logs가 같은 예약을 한 번만 세는지 확인
+# Run  `python test/bench_aco_feedback.py`
+import sys
+import time
+import random
+from pathlib import Path
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from recommend.hybrid_scheduler import EDGES_BY_ICD, PHER_INIT, RHO, TAU_MIN, WARD_TOTALS, HybridScheduler
+from utils.infer_feedback_from_api import infer_feedback_from_logs
+
+EVENTS_PER_DAY = 300
+SNAPSHOTS_PER_DAY = 144
+HISTORY_DAYS = [30, 90, 180]
+
+
+def make_feedbacks(days: int, preferred: dict, seed: int = 0) -> list[dict]:
+    rng = random.Random(seed)
+    start = datetime(2025, 1, 1)
+    feedbacks = []
+    for d in range(days):
+        states = []
+        for _ in range(SNAPSHOTS_PER_DAY):
+            state = {}
+            for w, total in WARD_TOTALS.items():
+                total = total or 20
+                state[w] = {"total": total, "occupied": rng.randint(0, total)}
+            states.append(state)
+        for _ in range(EVENTS_PER_DAY):
+            icd = rng.choice(list(EDGES_BY_ICD))
+            ward = preferred[icd] if rng.random() < 0.6 else rng.choice(EDGES_BY_ICD[icd])
+            feedbacks.append({
+                "icd": icd, "ward": ward, "count": 1,
+                "ts": start + timedelta(days=d, minutes=rng.randint(0, 1439)),
+                "state": rng.choice(states),
+            })
+    return feedbacks
+
+
+def check_learning() -> None:
+    rng = random.Random(7)
+    preferred = {icd: rng.choice(wards[1:]) for icd, wards in EDGES_BY_ICD.items()}
+    model = HybridScheduler()
+    stats = model.update_feedback(make_feedbacks(60, preferred), seed=0)
+    for icd, wards in EDGES_BY_ICD.items():
+        learned = max(wards, key=lambda w: model.pheromone[(icd, w)])
+        assert learned == preferred[icd], (icd, learned, preferred[icd])
+    print(f"learning  : preferred ward has the highest pheromone for all ICDs {stats}")
+
+
+def check_evaporation() -> None:
+    # 사건 없는 10일 구간 → 모든 pheromone이 (1 - RHO)^10 배 (TAU_MIN 하한)
+    model = HybridScheduler()
+    stats = model.update_feedback([], window=(date(2025, 1, 1), date(2025, 1, 10)))
+    expected = max(PHER_INIT * (1 - RHO) ** 10, TAU_MIN)
+    assert stats["days"] == 10 and all(abs(v - expected) < 1e-12 for v in model.pheromone.values()), stats
+
+    # 같은 사건 2건: 1일 / 9일 간격 → 그 사이 빈 날만큼 더 증발
+    icd, ward = "I21", EDGES_BY_ICD["I21"][0]
+    gaps = {}
+    for gap in [1, 9]:
+        model = HybridScheduler()
+        events = [{"icd": icd, "ward": ward, "count": 1, "ts": datetime(2025, 1, 1) + timedelta(days=d)}
+                  for d in [0, gap]]
+        model.update_feedback(events, seed=0)
+        gaps[gap] = model.pheromone[(icd, EDGES_BY_ICD[icd][1])]
+    assert abs(gaps[9] / gaps[1] - (1 - RHO) ** 8) < 1e-12, gaps
+    print(f"evaporate : days without events decay too ({stats})")
+
+
+def check_copy() -> None:
+    shared = HybridScheduler()
+    before = shared.to_params()
+    shared.matrix   # 서빙에서 만들어진 행렬 캐시까지 있는 상태
+    updated = shared.copy()
+    assert updated.to_params() == before
+    updated.update_feedback(make_feedbacks(3, {icd: wards[0] for icd, wards in EDGES_BY_ICD.items()}), seed=0)
+    assert shared.to_params() == before and updated.to_params() != before
+    assert shared.recommend("I21", top_k=3) == HybridScheduler().recommend("I21", top_k=3)
+    print("copy      : update_feedback on a copy leaves the shared model untouched")
+
+
+def check_infer() -> None:
+    def record(ts, n_reserved):
+        items = [{"ptrmUseDvsnCd": "A"}] * n_reserved + [{"ptrmUseDvsnCd": "N"}] * 5
+        return {
+            "_timestamp": ts,
+            "ptrmInfo": [{"ptntDtlsCtrlAllLst": [{
+                "dissCd": "01",
+                "wardLst": [{"wardCd": "106250", "trasItemLst": items}],
+            }]}],
+        }
+
+    t0 = datetime(2025, 1, 1)
+    records = [record(t0 + timedelta(minutes=10 * i), n) for i, n in enumerate([1, 1, 2, 2, 0, 1])]
+    feedbacks = infer_feedback_from_logs(records[1:], prev_record=records[0])
+    assert [f["count"] for f in feedbacks] == [1, 1], feedbacks
+    assert {(f["icd"], f["ward"]) for f in feedbacks} == {("I21", "내과ICU")}, feedbacks
+    print("infer     : persistent reservations counted once")
+
+
+if __name__ == "__main__":
+    check_infer()
+    check_evaporation()
+    check_learning()
+    check_copy()
+
+    preferred = {icd: wards[0] for icd, wards in EDGES_BY_ICD.items()}
+    print(f"{'days':>6} {'events':>8} {'time(s)':>8}")
+    for days in HISTORY_DAYS:
+        feedbacks = make_feedbacks(days, preferred)
+        t0 = time.perf_counter()
+        HybridScheduler().update_feedback(feedbacks, seed=0)
+        print(f"{days:>6} {len(feedbacks):>8} {time.perf_counter() - t0:>8.2f}")
@@ -0,0 +1,95 @@
+# bench_bed_status_counts.py
+# parse_bed_status_counts 동등성 확인 + 속도 비교
+#   - legacy : 병상(trasItemLst) 하나씩 if/elif 분기 (기존 구현)
+#   - counter: 상태 코드 → 정수 클래스 집계 (utils.preprocess.parse_bed_status_counts)
+#
+# 병상 수 수천 개 규모의 합성 병동으로 두 구현의 결과(키 순서 포함)가 같은지 먼저 확인한 뒤 시간을 잰다.
+# Run  `python test/bench_bed_status_counts.py`
+import sys
+import time
+import random
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from utils.preprocess import parse_bed_status_counts
+
+# 정상 코드 + 집계 대상이 아닌 코드/누락/None 도 섞음
+CODES = ["Y", "P", "A", "N", "W", "C", "X", "", None]
+BED_SIZES = [0, 1, 30, 300, 5000, 20000]
+CASES_PER_SIZE = 50
+REPEAT = 20
+
+
+def legacy_parse_bed_status_counts(ward: dict) -> dict:
+    status_counts = {
+        "embdCct": 0,
+        "dschCct": 0,
+        "admsApntCct": 0,
+        "useSckbCnt": 0,
+        "chupCct": 0,
+    }
+    for item in ward.get("trasItemLst", []):
+        code = item.get("ptrmUseDvsnCd")
+        if code == "Y":
+            status_counts["embdCct"] += 1
+        elif code == "P":
+            status_counts["dschCct"] += 1
+        elif code == "A":
+            status_counts["admsApntCct"] += 1
+        elif code in ("N", "W"):
+            status_counts["useSckbCnt"] += 1
+        elif code == "C":
+            status_counts["chupCct"] += 1
+
+    return {
+        "wardCd": ward.get("wardCd"),
+        "wardNm": ward.get("wardNm"),
+        **status_counts
+    }
+
+
+def make_ward(rng: random.Random, beds: int) -> dict:
+    weights = [rng.random() for _ in CODES]
+    items = []
+    for code in rng.choices(CODES, weights=weights, k=beds):
+        if code is None and rng.random() < 0.5:
+            items.append({})                       # ptrmUseDvsnCd 키 자체가 없음
+        else:
+            items.append({"ptrmUseDvsnCd": code, "ptntNo": rng.randint(1, 10**6)})
+    return {"wardCd": str(rng.randint(100000, 999999)), "wardNm": "ICU", "trasItemLst": items}
+
+
+def check_equivalence(seed: int = 0) -> int:
+    rng = random.Random(seed)
+    n = 0
+    for beds in BED_SIZES:
+        for _ in range(CASES_PER_SIZE):
+            ward = make_ward(rng, beds)
+            old, new = legacy_parse_bed_status_counts(ward), parse_bed_status_counts(ward)
+            assert old == new and list(old) == list(new), (beds, old, new)
+            n += 1
+    # trasItemLst 누락
+    assert legacy_parse_bed_status_counts({"wardCd": "1"}) == parse_bed_status_counts({"wardCd": "1"})
+    return n + 1
+
+
+def timeit(fn, ward) -> float:
+    best = float("inf")
+    for _ in range(REPEAT):
+        t0 = time.perf_counter()
+        fn(ward)
+        best = min(best, time.perf_counter() - t0)
+    return best * 1e6
+
+
+if __name__ == "__main__":
+    print(f"equivalence: {check_equivalence()} wards OK")
+
+    rng = random.Random(1)
+    print(f"{'beds':>6} {'legacy(us)':>11} {'counter(us)':>12}")
+    for beds in BED_SIZES[2:]:
+        ward = make_ward(rng, beds)
+        t_old = timeit(legacy_parse_bed_status_counts, ward)
+        t_new = timeit(parse_bed_status_counts, ward)
+        print(f"{beds:>6} {t_old:>11.1f} {t_new:>12.1f}")
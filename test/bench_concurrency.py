@@ -0,0 +1,175 @@
+# bench_concurrency.py
+# 동시 요청 처리량: 동기 추천 함수를 async 엔드포인트에서 바로 호출(기존) vs async 조회 + scoring_executor(현재)
+#   - 스냅샷 저장소가 비어 있어(poller 준비 전) 요청마다 병상 로그 DB 조회가 일어나는 조건
+#     DB는 쿼리당 DB_LATENCY초가 걸리는 지연 모델로 대체 (동기: time.sleep / async: asyncio.sleep)
+#   - /congestion/recommend · /discharge/recommend를 번갈아 보내는 클라이언트 수별 처리량 / 지연시간
+#   - 같은 시간 동안 이벤트 루프 지연 (health-check 주기 호출이 예정보다 늦어진 최대 시간)
+#   - 두 경로의 응답 본문이 같은지 확인
+# Run  `python test/bench_concurrency.py`
+import sys
+import json
+import time
+import random
+import asyncio
+import logging
+import tempfile
+import contextlib
+import io
+from pathlib import Path
+from datetime import datetime, timedelta
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+logging.disable(logging.WARNING)
+
+import numpy as np
+from fastapi import Request
+
+import main
+import utils.snapshot_store as store_module
+from recommend.icu_congestion_recommend import auto_congestion_recommend
+from recommend.icu_discharge_recommend import auto_recommend
+from recommend.congestion_ensemble import load_ensemble
+from recommend.oblivious_trees import convert_bundle, save_tree_bundle
+from utils.model_registry import model_registry
+from utils.scoring_executor import scoring_executor
+from utils.ward_snapshot import WARD_CODES
+
+DB_LATENCY = 0.05
+CLIENTS = [1, 4, 16]
+REQUESTS_PER_CLIENT = 8
+SNAPSHOTS_PER_DAY = 48
+PROBE_INTERVAL = 0.01
+REQUEST = Request({"type": "http", "method": "POST", "headers": []})   # If-None-Match 없는 요청
+
+
+# ─── 합성 병상 스냅샷 ─────────────────────────
+def snapshot(ts: datetime, rng: random.Random) -> dict:
+    wards = [{"wardCd": code, "wardNm": f"병동{code}",
+              "trasItemLst": [{"ptrmUseDvsnCd": rng.choice("YPANW")} for _ in range(rng.randint(5, 30))],
+              "embdCct": rng.randint(0, 9), "dschCct": rng.randint(0, 9), "useSckbCnt": rng.randint(0, 30),
+              "admsApntCct": rng.randint(0, 5), "chupCct": rng.randint(0, 3)} for code in WARD_CODES]
+    return {"ptrmInfo": [{"ptrmDvsnCd": "X", "ptntDtlsCtrlAllLst": [{"dissCd": "01", "wardLst": wards}]}],
+            "_timestamp": ts}
+
+
+def history(offsets: list[int]) -> dict[int, list[dict]]:
+    rng = random.Random(0)
+    today = datetime.combine(datetime.now().date(), datetime.min.time())
+    return {n: [snapshot(today - timedelta(days=n) + timedelta(days=1) * (SNAPSHOTS_PER_DAY - 1 - i) / SNAPSHOTS_PER_DAY, rng)
+                for i in range(SNAPSHOTS_PER_DAY)] for n in offsets}
+
+
+# ─── DB 지연 모델 ─────────────────────────────
+def install_db(days: dict[int, list[dict]]):
+    def rows(offsets):
+        return {n: [dict(r) for r in days.get(n, [])] for n in offsets}
+
+    def sync_days(offsets, base_date=None):
+        time.sleep(DB_LATENCY)
+        return rows(offsets)
+
+    async def async_days(offsets, base_date=None):
+        await asyncio.sleep(DB_LATENCY)
+        return rows(offsets)
+
+    store_module.get_realtime_data_for_days = sync_days
+    store_module.aget_realtime_data_for_days = async_days
+    main.snapshot_store._seed = lambda **kw: None   # 저장소를 채우지 않음 → 매 요청이 DB 조회
+
+
+def install_model2(tmp: Path):
+    """model2가 배포되지 않은 환경이라 작은 합성 앙상블(scaler + CatBoost 3개)을 학습해 등록"""
+    from catboost import CatBoostClassifier
+    from sklearn.preprocessing import StandardScaler
+    from bench_congestion_ensemble import make_features
+
+    X, y = make_features(1000, np.random.default_rng(0))
+    scaler = StandardScaler().fit(X)
+    models = [CatBoostClassifier(iterations=200, depth=6, verbose=False, random_seed=s, allow_writing_files=False)
+              .fit(scaler.transform(X), y) for s in range(3)]
+    save_tree_bundle(convert_bundle({"scaler": scaler, "models": models}), tmp / "model2.json")
+    model_registry.register("model2", tmp / "model2.json", None, loader=load_ensemble)
+
+
+# ─── 엔드포인트 ──────────────────────────────
+async def legacy_congestion():
+    return auto_congestion_recommend({})
+
+
+async def legacy_discharge():
+    return auto_recommend()
+
+
+async def current_congestion():
+    return json.loads((await main.recommend_congestion(REQUEST)).body)
+
+
+async def current_discharge():
+    return json.loads((await main.recommend_discharge(REQUEST)).body)
+
+
+async def run(endpoints, clients: int) -> dict:
+    latencies, lags = [], []
+    stop = asyncio.Event()
+
+    async def probe():
+        while not stop.is_set():
+            t0 = time.perf_counter()
+            await asyncio.sleep(PROBE_INTERVAL)
+            await main.healthCheck()
+            lags.append(time.perf_counter() - t0 - PROBE_INTERVAL)
+
+    async def client(i: int):
+        for r in range(REQUESTS_PER_CLIENT):
+            t0 = time.perf_counter()
+            await endpoints[(i + r) % len(endpoints)]()
+            latencies.append(time.perf_counter() - t0)
+
+    prober = asyncio.create_task(probe())
+    await asyncio.sleep(0)
+    t0 = time.perf_counter()
+    await asyncio.gather(*(client(i) for i in range(clients)))
+    wall = time.perf_counter() - t0
+    stop.set()
+    await prober
+    return {"rps": len(latencies) / wall, "p50": np.percentile(latencies, 50) * 1e3,
+            "p95": np.percentile(latencies, 95) * 1e3, "lag": max(lags, default=0.0) * 1e3}
+
+
+def as_json(content: dict) -> dict:
+    return json.loads(json.dumps(content))
+
+
+async def check():
+    old = [await legacy_congestion(), await legacy_discharge()]
+    new = [await current_congestion(), await current_discharge()]
+    for o, n in zip(old, new):
+        assert o["success"] and n["success"], (o, n)
+        assert as_json(o["result"]) == as_json(n["result"]), (o, n)
+    print(f"check     : legacy / current responses identical ({len(new[0]['result']['wards'])} wards)")
+
+
+async def bench():
+    await check()
+    print(f"\nDB latency {DB_LATENCY * 1e3:.0f} ms, scoring workers {scoring_executor.workers}, "
+          f"{REQUESTS_PER_CLIENT} requests per client")
+    print(f"{'clients':>7} {'path':<8} {'req/s':>7} {'p50(ms)':>8} {'p95(ms)':>8} {'loop lag(ms)':>13}")
+    for clients in CLIENTS:
+        for name, endpoints in [("legacy", [legacy_congestion, legacy_discharge]),
+                                ("current", [current_congestion, current_discharge])]:
+            r = await run(endpoints, clients)
+            print(f"{clients:>7} {name:<8} {r['rps']:>7.1f} {r['p50']:>8.1f} {r['p95']:>8.1f} {r['lag']:>13.1f}")
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as tmp:
+        sys.path.insert(0, str(Path(__file__).resolve().parent))
+        install_model2(Path(tmp))
+        install_db(history([0, 1, 7]))
+        model_registry.preload()
+        key = main.flight_key
+        main.flight_key = lambda *a: key(*a) + (object(),)   # single-flight 끔 — 요청마다 조회 + 계산 (bench_single_flight 참고)
+        with contextlib.redirect_stdout(io.StringIO()) as out:
+            asyncio.run(bench())
+        print("\n".join(line for line in out.getvalue().splitlines()
+                        if not line.startswith("today=")))
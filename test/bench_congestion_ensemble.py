@@ -0,0 +1,113 @@
+# bench_congestion_ensemble.py
+# model2 앙상블 일괄 추론(CongestionEnsemble) 확인 + 속도
+#   - model_first_train/model2.py와 같은 구성(scaler + CatBoost 20개 + threshold_logic)의 합성 번들과
+#     재학습 형식 번들({"models": [model]}, 피처 이름 + cat feature)을 만들어
+#     병동별 확률 = CatBoost 멤버별 predict_proba 평균인지 확인 (앙상블은 병합된 ObliviousTrees로 NumPy 평가)
+#   - 병동 행 수별 지연시간: 기존 단일 모델 경로(models[0].predict(...)[0]) / 멤버 순차 / CongestionEnsemble
+#     서빙 병동 수에서는 CongestionEnsemble이 멤버 순차보다 빨라야 함 (느려지는 행 수가 있으면 교차점 출력)
+# Run  `python test/bench_congestion_ensemble.py`
+import sys
+import time
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numpy as np
+import pandas as pd
+from catboost import CatBoostClassifier, Pool
+from sklearn.preprocessing import StandardScaler
+
+from recommend.congestion_ensemble import load_ensemble
+from recommend.oblivious_trees import convert_bundle, save_tree_bundle
+from utils.ward_snapshot import MODEL2_FEATURES, WARD_CODES
+
+CB_PARAMS = {"loss_function": "Logloss", "iterations": 600, "depth": 6, "learning_rate": 0.05,
+             "l2_leaf_reg": 3, "auto_class_weights": "Balanced", "verbose": False, "allow_writing_files": False}
+N_MEMBERS = 20
+TRAIN_ROWS = 2000
+WARD_ROWS = [6, 60, 600]
+REPEAT = 20
+ROUNDS = 5
+
+
+def make_features(n: int, rng: np.random.Generator) -> tuple[np.ndarray, np.ndarray]:
+    total = rng.integers(8, 40, n)
+    use = rng.integers(0, total + 1)
+    lag1, lag7 = np.clip(use + rng.integers(-3, 4, n), 0, total), np.clip(use + rng.integers(-6, 7, n), 0, total)
+    X = np.column_stack([total - use, use / total, use - lag1, lag1 / total, lag7 / total, rng.integers(0, 2, n)])
+    y = ((use + rng.integers(-2, 3, n)) / total > 0.9).astype(int)
+    return X.astype(float), y
+
+
+def first_train_bundle(X: np.ndarray, y: np.ndarray) -> dict:
+    scaler = StandardScaler().fit(X)
+    models = [CatBoostClassifier(**CB_PARAMS, random_seed=s).fit(scaler.transform(X), y) for s in range(N_MEMBERS)]
+    return {"scaler": scaler, "models": models, "threshold_logic": {"r_min": 0.60, "p_min": 0.40, "default_thr": 0.5}}
+
+
+def retrain_bundle(X: np.ndarray, y: np.ndarray, codes: list[str]) -> dict:
+    df = pd.DataFrame(X, columns=list(MODEL2_FEATURES))
+    df.insert(0, "ward_code", codes)
+    model = CatBoostClassifier(depth=6, iterations=400, learning_rate=0.07, cat_features=[0], verbose=False,
+                               random_state=42, allow_writing_files=False).fit(df, y)
+    return {"models": [model]}
+
+
+def timeit(fn) -> float:
+    fn()
+    best = float("inf")
+    for _ in range(ROUNDS):   # 공유 머신 잡음을 줄이려고 ROUNDS번 중 최솟값
+        t0 = time.perf_counter()
+        for _ in range(REPEAT // ROUNDS):
+            fn()
+        best = min(best, (time.perf_counter() - t0) / (REPEAT // ROUNDS))
+    return best * 1e3
+
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    X_train, y_train = make_features(TRAIN_ROWS, rng)
+    codes_train = [WARD_CODES[i % 6] for i in range(TRAIN_ROWS)]
+
+    t0 = time.perf_counter()
+    bundle = first_train_bundle(X_train, y_train)
+    print(f"train     : {N_MEMBERS} members in {time.perf_counter() - t0:.1f}s")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        save_tree_bundle(convert_bundle(bundle), Path(tmp) / "model2.json")
+        ensemble = load_ensemble(Path(tmp) / "model2.json")
+        retrained = retrain_bundle(X_train, y_train, codes_train)
+        save_tree_bundle(convert_bundle(retrained), Path(tmp) / "model2_retrain.json")
+        single = load_ensemble(Path(tmp) / "model2_retrain.json")
+
+    X, _ = make_features(max(WARD_ROWS), rng)
+    codes = [WARD_CODES[i % 6] for i in range(len(X))]
+
+    X_s = bundle["scaler"].transform(X)
+    expected = np.mean([m.predict_proba(X_s)[:, 1] for m in bundle["models"]], axis=0)
+    proba, flags = ensemble.predict(codes, X)
+    assert np.allclose(proba, expected, rtol=0, atol=1e-12)
+    assert (flags == (expected >= 0.5)).all()
+    print(f"ensemble  : {len(X)} wards == mean of {N_MEMBERS} member probabilities")
+
+    df = pd.DataFrame(X, columns=list(MODEL2_FEATURES))
+    df.insert(0, "ward_code", codes)
+    expected = retrained["models"][0].predict_proba(Pool(df, cat_features=[0]))[:, 1]
+    assert np.allclose(single.predict(codes, X)[0], expected, rtol=0, atol=1e-12)
+    print(f"retrain   : named features + cat feature OK")
+
+    print(f"{'wards':>6} {'single(ms)':>11} {'sequential(ms)':>15} {'ensemble(ms)':>13}")
+    slower = []
+    for n in WARD_ROWS:
+        Xn, cn = X[:n], codes[:n]
+        t_single = timeit(lambda: bundle["models"][0].predict(Pool(bundle["scaler"].transform(Xn)))[0])
+        t_seq = timeit(lambda: np.mean([m.predict_proba(Pool(bundle["scaler"].transform(Xn)))[:, 1]
+                                        for m in bundle["models"]], axis=0))
+        t_ens = timeit(lambda: ensemble.predict(cn, Xn))
+        print(f"{n:>6} {t_single:>11.2f} {t_seq:>15.2f} {t_ens:>13.2f}")
+        if t_ens >= t_seq:
+            slower.append(n)
+    assert not [n for n in slower if n <= len(WARD_CODES)], f"서빙 병동 수에서 앙상블이 느림: {slower}"
+    print(f"crossover : sequential faster from {min(slower)} wards" if slower else
+          f"crossover : none up to {max(WARD_ROWS)} wards")
@@ -0,0 +1,120 @@
+# bench_db_loader.py
+# 병상 로그 조회 비용이 tb_api_log 크기에 따라 어떻게 변하는지 측정
+#   - legacy : 전체 로그를 가져와 Python에서 날짜 필터 (기존 get_realtime_data_for_today)
+#   - range  : reg_dtm 범위 조건으로 DB에서 필터 (get_realtime_data_for_today)
+#
+# MySQL 대신 in-memory SQLite에 동일한 스키마(rmrp_portal.tb_api_log)를 만들어 실행한다.
+# Run  `python test/bench_db_loader.py`
+import sys
+import json
+import time
+import sqlite3
+from pathlib import Path
+from datetime import datetime, timedelta
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.pool import StaticPool
+
+import utils.db_loader as db_loader
+from utils.db_pool import db_pool
+
+SNAPSHOTS_PER_DAY = 144          # 10분 간격 수집
+HISTORY_DAYS = [7, 30, 90, 180]  # 누적 로그 기간
+REPEAT = 5
+
+# 병동 15개 × 병상 30개 규모의 ctnt 페이로드
+CTNT = json.dumps({
+    "ptrmInfo": [{
+        "ptntDtlsCtrlAllLst": [{
+            "wardLst": [
+                {"wardCd": str(106000 + i), "trasItemLst": [{"ptrmUseDvsnCd": "N"}] * 30}
+                for i in range(15)
+            ]
+        }]
+    }]
+})
+
+
+def make_engine():
+    eng = create_engine(
+        "sqlite://",
+        connect_args={"detect_types": sqlite3.PARSE_DECLTYPES, "check_same_thread": False},
+        poolclass=StaticPool,
+    )
+
+    @event.listens_for(eng, "connect")
+    def _attach(dbapi_conn, _):
+        dbapi_conn.execute("ATTACH DATABASE ':memory:' AS rmrp_portal")
+
+    with eng.begin() as conn:
+        conn.execute(text("""
+            CREATE TABLE rmrp_portal.tb_api_log (
+                req_res TEXT, com_src_cd TEXT, req_url TEXT, ctnt TEXT, reg_dtm TIMESTAMP
+            )
+        """))
+        conn.execute(text("CREATE INDEX rmrp_portal.ix_api_log_reg_dtm ON tb_api_log (reg_dtm)"))
+    return eng
+
+
+def fill(eng, days: int):
+    now = datetime.now().replace(second=0, microsecond=0)
+    step = timedelta(days=1) / SNAPSHOTS_PER_DAY
+    rows = [
+        {"ts": (now - step * i).isoformat(sep=" ")}
+        for i in range(days * SNAPSHOTS_PER_DAY)
+    ]
+    with eng.begin() as conn:
+        conn.execute(text("DELETE FROM rmrp_portal.tb_api_log"))
+        conn.execute(text("""
+            INSERT INTO rmrp_portal.tb_api_log (req_res, com_src_cd, req_url, ctnt, reg_dtm)
+            VALUES ('REQ', 'CMC03', '/api/mdcl-rm-rcpt', :ctnt, :ts)
+        """), [{**r, "ctnt": CTNT} for r in rows])
+
+
+def legacy_for_today(eng) -> list[dict]:
+    today = datetime.now().date()
+    query = text("""
+        SELECT ctnt, reg_dtm
+          FROM rmrp_portal.tb_api_log
+         WHERE req_res = 'REQ'
+           AND com_src_cd = 'CMC03'
+           AND req_url LIKE '%mdcl-rm-rcpt%'
+         ORDER BY reg_dtm DESC
+    """)
+    with eng.connect() as conn:
+        rows = conn.execute(query).fetchall()
+    results = []
+    for row in rows:
+        if row[1].date() != today:
+            continue
+        parsed = json.loads(row[0])
+        parsed["_timestamp"] = row[1]
+        results.append(parsed)
+    return results
+
+
+def timeit(fn) -> float:
+    best = float("inf")
+    for _ in range(REPEAT):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000
+
+
+if __name__ == "__main__":
+    eng = make_engine()
+    db_pool.use(eng)
+
+    print(f"{'days':>6} {'rows':>8} {'legacy(ms)':>12} {'range(ms)':>10}")
+    for days in HISTORY_DAYS:
+        fill(eng, days)
+        n_legacy = len(legacy_for_today(eng))
+        n_range = len(db_loader.get_realtime_data_for_today())
+        assert n_legacy == n_range, (n_legacy, n_range)
+
+        t_legacy = timeit(lambda: legacy_for_today(eng))
+        t_range = timeit(db_loader.get_realtime_data_for_today)
+        print(f"{days:>6} {days * SNAPSHOTS_PER_DAY:>8} {t_legacy:>12.1f} {t_range:>10.1f}")
@@ -0,0 +1,202 @@
+# bench_db_outage.py
+# DB 장애 중 요청 지연시간: 쿼리 timeout + circuit breaker + 이전 이력(stale) 응답
+#   - 자정이 지나 저장소에 오늘 이력이 없는 상태(요청마다 DB 조회 필요)에서 DB가 멈춤
+#     (연결이 OUTAGE_HANG초 동안 응답 없다가 실패)
+#   - 구간별 /congestion/recommend · /discharge/recommend 지연시간 p50 / p99 / max, 성공 수, stale 표시 수, DB 시도 수
+#       healthy      : 정상
+#       no-guard     : timeout / breaker 없음 → 요청마다 DB가 실패할 때까지 대기
+#       outage       : timeout + breaker + poller 1건 재시도
+#       recovered    : DB 복구 → poller 시험 호출 성공 후 stale 해제
+# MySQL 대신 bench_db_loader의 in-memory SQLite 스키마를 감싼 동기 / async 엔진 사용
+# Run  `python test/bench_db_outage.py`
+import sys
+import io
+import json
+import time
+import asyncio
+import tempfile
+import threading
+import contextlib
+from pathlib import Path
+from datetime import timedelta
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from bench_concurrency import REQUEST, history, install_model2   # noqa: E402  (루트 경로 · 로깅 설정 포함)
+from bench_db_loader import make_engine
+
+import numpy as np
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+import main
+import utils.db_loader as db_loader
+from utils.db_loader import log_breaker
+from utils.db_pool import db_pool
+from utils.model_registry import model_registry
+from utils.response_cache import response_cache
+from utils.snapshot_store import snapshot_store
+
+DB_LATENCY = 0.02
+OUTAGE_HANG = 3.0
+QUERY_TIMEOUT = 0.5
+BREAKER_RESET = 2.0
+CLIENTS = 8
+WAVES = 10
+WAVE_GAP = 0.2
+
+
+# ─── 멈출 수 있는 DB ───────────────────────────
+class FlakyDB:
+    """SQLite 엔진을 감싼 동기 / async 엔진 — down이면 연결이 hang초 동안 멈춘 뒤 OperationalError"""
+
+    def __init__(self, eng):
+        self.eng = eng
+        self.down = False
+        self.attempts = 0
+        self._lock = threading.Lock()   # StaticPool 연결 1개를 스레드 간 공유
+
+    def _fail(self):
+        return OperationalError("connect", {}, Exception("(2013) Lost connection to MySQL server"))
+
+    def fetch(self, query, params):
+        with self._lock, self.eng.connect() as conn:
+            return conn.execute(query, params or {}).fetchall()
+
+    # 동기 엔진 (poller)
+    @contextlib.contextmanager
+    def connect(self):
+        self.attempts += 1
+        if self.down:
+            time.sleep(OUTAGE_HANG)
+            raise self._fail()
+        time.sleep(DB_LATENCY)
+        with self._lock, self.eng.connect() as conn:
+            yield conn
+
+    # async 엔진 (요청 경로)
+    def async_engine(self):
+        db = self
+
+        class Result:
+            def __init__(self, rows):
+                self.rows = rows
+
+            def fetchone(self):
+                return self.rows[0] if self.rows else None
+
+            def fetchall(self):
+                return self.rows
+
+        class Conn:
+            async def __aenter__(self):
+                db.attempts += 1
+                if db.down:
+                    await asyncio.sleep(OUTAGE_HANG)
+                    raise db._fail()
+                await asyncio.sleep(DB_LATENCY)
+                return self
+
+            async def __aexit__(self, *exc):
+                return False
+
+            async def execute(self, query, params=None):
+                return Result(await asyncio.to_thread(db.fetch, query, params))
+
+        class Engine:
+            def connect(self):
+                return Conn()
+
+        return Engine()
+
+
+def fill(eng):
+    rows = [{"ctnt": json.dumps({k: v for k, v in snap.items() if k != "_timestamp"}),
+             "ts": snap["_timestamp"].isoformat(sep=" ")}
+            for snaps in history([0, 1, 7]).values() for snap in snaps]
+    with eng.begin() as conn:
+        conn.execute(text("""
+            INSERT INTO rmrp_portal.tb_api_log (req_res, com_src_cd, req_url, ctnt, reg_dtm)
+            VALUES ('REQ', 'CMC03', '/api/mdcl-rm-rcpt', :ctnt, :ts)
+        """), rows)
+
+
+def roll_over():
+    """자정이 지난 것처럼 보관 이력을 하루 앞으로 당김 → 오늘 / 7일 전 이력이 없어 요청마다 DB 조회 필요"""
+    with snapshot_store._lock:
+        snapshot_store._days = {d - timedelta(days=1): rows for d, rows in snapshot_store._days.items()}
+    response_cache.clear()
+
+
+# ─── 측정 ─────────────────────────────────────
+async def phase(name: str, db: FlakyDB):
+    endpoints = [main.recommend_congestion, main.recommend_discharge]
+    latencies, ok, stale = [], 0, 0
+    attempts, trips = db.attempts, log_breaker.trips
+
+    async def call(i):
+        nonlocal ok, stale
+        t0 = time.perf_counter()
+        response = await endpoints[i % 2](REQUEST)
+        latencies.append(time.perf_counter() - t0)
+        ok += json.loads(response.body)["success"]
+        stale += response.headers["x-snapshot-stale"] == "true"
+
+    for _ in range(WAVES):
+        await asyncio.gather(*(call(i) for i in range(CLIENTS)))
+        await asyncio.sleep(WAVE_GAP)
+    ms = np.array(latencies) * 1e3
+    print(f"{name:<10} {len(ms):>5} {ok:>4} {stale:>6} {np.percentile(ms, 50):>8.1f} {np.percentile(ms, 99):>8.1f} "
+          f"{ms.max():>8.1f} {db.attempts - attempts:>5} {log_breaker.trips - trips:>6}")
+
+
+async def bench(db: FlakyDB):
+    snapshot_store.refresh()
+    print(f"DB hang {OUTAGE_HANG:.1f} s, query timeout {QUERY_TIMEOUT:.1f} s, breaker reset {BREAKER_RESET:.1f} s, "
+          f"{CLIENTS} clients × {WAVES} waves")
+    print(f"{'phase':<10} {'reqs':>5} {'ok':>4} {'stale':>6} {'p50(ms)':>8} {'p99(ms)':>8} {'max(ms)':>8} "
+          f"{'db':>5} {'trips':>6}")
+
+    roll_over()
+    await phase("healthy", db)
+
+    # timeout / breaker 없이 (poller도 멈춤)
+    roll_over()
+    db.down = True
+    db_loader.LOG_QUERY_TIMEOUT_SEC, threshold = None, log_breaker.failure_threshold
+    log_breaker.failure_threshold = 10 ** 9
+    await phase("no-guard", db)
+    db_loader.LOG_QUERY_TIMEOUT_SEC, log_breaker.failure_threshold = QUERY_TIMEOUT, threshold
+    log_breaker.record_success()
+
+    roll_over()
+    poller = asyncio.create_task(snapshot_store.run(interval=0.3, timeout=1.0))
+    await phase("outage", db)
+
+    db.down = False
+    t0 = time.perf_counter()
+    while not log_breaker.closed or snapshot_store.stale:
+        await asyncio.sleep(0.05)
+    print(f"{'':<10} DB back → breaker closed, store refreshed after {time.perf_counter() - t0:.1f} s")
+    await phase("recovered", db)
+    poller.cancel()
+    print(f"\nbreaker   : {log_breaker.stats()}")
+    print(f"pool      : {db_pool.stats()}")
+
+
+if __name__ == "__main__":
+    eng = make_engine()
+    fill(eng)
+    db = FlakyDB(eng)
+    db_pool.use(db)
+    db_pool.use(db.async_engine(), role="async")
+    db_loader.LOG_QUERY_TIMEOUT_SEC = QUERY_TIMEOUT
+    log_breaker.reset_timeout = BREAKER_RESET
+
+    with tempfile.TemporaryDirectory() as tmp:
+        install_model2(Path(tmp))
+        model_registry.preload()
+        with contextlib.redirect_stdout(io.StringIO()) as out:
+            asyncio.run(bench(db))
+        print("\n".join(line for line in out.getvalue().splitlines()
+                        if not line.startswith("today=")))
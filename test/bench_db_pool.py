@@ -0,0 +1,129 @@
+# bench_db_pool.py
+# utils/db_pool 연결 풀 레이어 확인
+#   - import만 해서는 엔진(풀)을 만들지 않음 (스케줄러 / uvicorn worker가 import 시점에 풀을 만들지 않는지)
+#   - primary / replica 엔진 설정: 접속 host, connect / read / write timeout, pool size / overflow / recycle / pre-ping
+#   - 같은 프로세스의 스레드는 엔진 1개를 공유, fork된 자식은 새 엔진
+#   - 풀 크기별 checkout 대기 시간 (스레드 THREADS개가 연결을 HOLD_SEC씩 점유)
+# MySQL 대신 파일 SQLite + QueuePool로 대기 시간을 측정한다.
+# Run  `python test/bench_db_pool.py`
+import os
+import sys
+import json
+import time
+import tempfile
+import threading
+import subprocess
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.pool import QueuePool
+
+from utils.db_pool import DBPool
+
+THREADS = 8
+QUERIES = 10
+HOLD_SEC = 0.02
+POOL_SIZES = [2, 4, 8]
+
+PROBE = """
+import json
+from sqlalchemy import event
+import utils.db_loader
+from utils.db_pool import db_pool
+out = {"engines_after_import": len(db_pool._engines)}
+
+class Captured(Exception):
+    pass
+
+for role in ["primary", "replica"]:
+    eng = db_pool.engine(role)
+
+    @event.listens_for(eng, "do_connect")
+    def capture(dialect, rec, cargs, cparams, role=role):
+        out[role] = {k: cparams.get(k) for k in ["host", "connect_timeout", "read_timeout", "write_timeout"]}
+        raise Captured()   # 실제로 연결하지 않음
+
+    try:
+        eng.connect()
+    except Exception:
+        pass
+    pool = eng.pool
+    out[role].update(size=pool.size(), overflow=pool._max_overflow, recycle=pool._recycle, pre_ping=pool._pre_ping)
+print(json.dumps(out))
+"""
+
+
+def probe_config() -> dict:
+    env = {**os.environ, "DB_URL": "db-primary", "DB_PORT": "3306", "DB_REPLICA_URL": "db-replica",
+           "DB_USER": "u", "DB_PW": "p", "DB_POOL_SIZE": "4", "DB_READ_TIMEOUT_SEC": "15"}
+    out = subprocess.run([sys.executable, "-c", PROBE], cwd=ROOT, env=env, capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def sqlite_engine(path: Path, size: int):
+    return create_engine(f"sqlite:///{path}", poolclass=QueuePool, pool_size=size, max_overflow=0,
+                         pool_timeout=30, pool_pre_ping=True, connect_args={"check_same_thread": False})
+
+
+def contention(path: Path, size: int) -> dict:
+    pool = DBPool()
+    pool.use(sqlite_engine(path, size))
+
+    def worker():
+        for _ in range(QUERIES):
+            with pool.connect() as conn:
+                conn.execute(text("SELECT 1")).fetchall()
+                time.sleep(HOLD_SEC)
+
+    threads = [threading.Thread(target=worker) for _ in range(THREADS)]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return {"elapsed": time.perf_counter() - t0, **pool.stats()["primary"]}
+
+
+if __name__ == "__main__":
+    # ── 지연 생성 / 설정 ───────────────────────
+    cfg = probe_config()
+    assert cfg["engines_after_import"] == 0
+    print(f"import    : utils.db_loader → engines created {cfg['engines_after_import']}")
+    for role in ["primary", "replica"]:
+        print(f"{role:<9} : {cfg[role]}")
+    assert cfg["primary"]["host"] == "db-primary" and cfg["replica"]["host"] == "db-replica"
+    assert cfg["primary"]["read_timeout"] == 15 and cfg["primary"]["size"] == 4 and cfg["primary"]["pre_ping"]
+
+    # ── 공유 / fork ────────────────────────────
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "pool.db"
+        pool = DBPool()
+        pool._create = lambda role: sqlite_engine(path, 2)
+        seen = set()
+        threads = [threading.Thread(target=lambda: seen.add(id(pool.engine()))) for _ in range(THREADS)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert len(seen) == 1
+        parent = id(pool.engine())
+        r, w = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.write(w, str(id(pool.engine())).encode())
+            os._exit(0)
+        os.waitpid(pid, 0)
+        child = int(os.read(r, 64))
+        assert child != parent and id(pool.engine()) == parent
+        print(f"share     : {THREADS} threads → 1 engine, forked child → new engine")
+
+        # ── checkout 대기 ─────────────────────
+        print(f"\n{THREADS} threads × {QUERIES} queries, connection held {HOLD_SEC * 1e3:.0f} ms")
+        print(f"{'pool':>5} {'checkouts':>10} {'connects':>9} {'wait avg(ms)':>13} {'wait max(ms)':>13} {'total(ms)':>10}")
+        for size in POOL_SIZES:
+            s = contention(path, size)
+            print(f"{size:>5} {s['checkouts']:>10} {s['connects']:>9} {s['wait_ms_avg']:>13.2f} "
+                  f"{s['wait_ms_max']:>13.2f} {s['elapsed'] * 1e3:>10.1f}")
@@ -0,0 +1,84 @@
+# bench_hybrid_scheduler.py
+# HybridScheduler 점수 계산 동등성 확인 + 속도 비교
+#   - recommend : ICD 1개, 후보 병동마다 combined_score 호출 (단일 환자 경로)
+#   - rank_all  : ScoreMatrix 배열 연산 (전체 ICD 추천 테이블 경로) — 후보 마스킹 / 정렬까지 배열 1회
+#
+# 무작위 병상 state / pheromone / 파라미터에 없는 ICD·병동 / 동점 / 출발 병동(origin) 케이스에서 순위와 점수가 같은지 확인한 뒤 시간을 잰다.
+# model/model1.pkl이 있으면 학습된 스케줄러로도 확인한다.
+# Run  `python test/bench_hybrid_scheduler.py`
+import sys
+import timeit
+import random
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from joblib import load
+
+from recommend.hybrid_scheduler import EDGES_BY_ICD, WARD_TOTALS, WARD_FLOORS, HybridScheduler
+
+MODEL1_PATH = Path(__file__).resolve().parent.parent / "model" / "model1.pkl"
+ICDS = list(EDGES_BY_ICD) + ["I99", "C34"]
+WARDS = sorted(set(WARD_TOTALS) | set(WARD_FLOORS)) + ["99병동"]
+CASES = 2000
+REPEAT = 2000
+ROUNDS = 5
+
+
+def make_state(rng: random.Random) -> dict:
+    wards = rng.sample(WARDS, rng.randint(0, len(WARDS)))
+    state = {}
+    for w in sorted(wards):
+        total = rng.choice([0, 1, 4, 13, 30, 45]) if rng.random() < 0.1 else rng.randint(1, 45)
+        occupied = total if rng.random() < 0.2 else rng.randint(0, total + 2)
+        state[w] = {"total": total, "occupied": occupied}
+    return state
+
+
+def run_or_error(fn):
+    try:
+        return fn()
+    except ZeroDivisionError as e:
+        return ("ZeroDivisionError", str(e))
+
+
+def check_equivalence(model: HybridScheduler, seed: int = 0) -> int:
+    rng = random.Random(seed)
+    n = 0
+    for _ in range(CASES):
+        state = make_state(rng)
+        top_k = rng.choice([1, 3, 100])
+        origin = rng.choice([None, None] + WARDS)
+        batch = model.matrix.rank_all(state, ICDS, top_k, origin)
+        for icd in ICDS:
+            scalar = run_or_error(lambda: model.recommend(icd=icd, state=state, top_k=top_k, origin=origin))
+            row = batch[icd]
+            row = ("ZeroDivisionError", str(row)) if isinstance(row, Exception) else row
+            assert scalar == row, (icd, origin, state, scalar, row)
+            n += 1
+    return n
+
+
+if __name__ == "__main__":
+    base = HybridScheduler()
+    print(f"default    : {check_equivalence(base)} cases OK")
+
+    perturbed = HybridScheduler()
+    rng = random.Random(1)
+    perturbed.pheromone = {k: rng.uniform(0.1, 3.0) for k in perturbed.pheromone}
+    perturbed.pheromone[("I21", "99병동")] = 2.0
+    perturbed.invalidate()
+    print(f"pheromone  : {check_equivalence(perturbed, seed=1)} cases OK")
+
+    if MODEL1_PATH.exists():
+        print(f"model1.pkl : {check_equivalence(load(MODEL1_PATH), seed=2)} cases OK")
+
+    state = {w: {"total": WARD_TOTALS.get(w) or 20, "occupied": 10} for w in sorted(WARDS)}
+    for label, fn in [
+        ("recommend", lambda: base.recommend(icd="I21", state=state, top_k=3)),
+        ("recommend x all ICD", lambda: [base.recommend(icd=icd, state=state, top_k=3) for icd in EDGES_BY_ICD]),
+        ("rank_all x all ICD", lambda: base.matrix.rank_all(state, list(EDGES_BY_ICD), 3)),
+    ]:
+        # 공유 머신 잡음을 줄이려고 ROUNDS번 중 최솟값
+        best = min(timeit.repeat(fn, number=REPEAT // ROUNDS, repeat=ROUNDS)) / (REPEAT // ROUNDS)
+        print(f"{label:>19}: {best * 1e6:8.1f} us")
@@ -0,0 +1,91 @@
+# bench_icd_index.py
+# IcdIndex (진단/질환 코드 → model1 ICD 그룹) 확인 + 고빈도 요청 조회 속도
+#   - I63.9 / i630 / dissCd "03" 같은 입력이 기대 그룹으로 대응되는지 확인
+#   - 소수 코드가 대부분을 차지하는(Zipf) 요청 스트림에서 조회 시간
+#     (그룹 목록 선형 startswith 검색 / memo 없는 prefix 조회 / IcdIndex(memo) / 크기별 lru_cache 적중률 — 작업 집합 크기 확인용)
+# Run  `python test/bench_icd_index.py`
+import sys
+import time
+import random
+from functools import lru_cache
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from recommend.hybrid_scheduler import CODE_TO_ICD, EDGES_BY_ICD
+from recommend.icd_index import IcdIndex, normalize_code
+
+N_REQUESTS = 500_000
+ZIPF_S = 1.1
+CACHE_SIZES = [16, 128, 1024]
+
+
+def scan_resolve(code: str, groups: list[str]) -> str | None:
+    """기준 구현: 별칭 dict + 그룹 목록 전체 startswith 검색 (긴 그룹 우선)"""
+    key = normalize_code(code)
+    if key in CODE_TO_ICD:
+        return CODE_TO_ICD[key]
+    for g in groups:
+        if key.startswith(g):
+            return g
+    return None
+
+
+def make_codes(rng: random.Random) -> list[str]:
+    """실제 요청에 섞여 올 만한 코드 변형 (그룹, 세부코드, 소문자/점 표기, dissCd, 미등록 코드)"""
+    codes = []
+    for g in EDGES_BY_ICD:
+        codes += [g, g.lower(), f"{g}.{rng.randint(0, 9)}", f"{g}{rng.randint(0, 9)}{rng.randint(0, 9)}"]
+    codes += list(CODE_TO_ICD)
+    codes += [f"Z{rng.randint(0, 99):02d}.{rng.randint(0, 9)}" for _ in range(len(codes) // 4)]
+    rng.shuffle(codes)
+    return codes
+
+
+def zipf_stream(codes: list[str], rng: random.Random) -> list[str]:
+    weights = [1 / (rank + 1) ** ZIPF_S for rank in range(len(codes))]
+    return rng.choices(codes, weights=weights, k=N_REQUESTS)
+
+
+def bench(fn, stream: list[str]) -> float:
+    t0 = time.perf_counter()
+    for code in stream:
+        fn(code)
+    return (time.perf_counter() - t0) / len(stream) * 1e9
+
+
+def check(index: IcdIndex, groups: list[str], codes: list[str]) -> None:
+    expected = {"I63.9": "I63", "i630": "I63", " I21 ": "I21", "02": "I63", "I6": None, "Z99.1": None}
+    for code, group in expected.items():
+        assert index.resolve(code) == group, (code, index.resolve(code), group)
+    for code in codes:
+        assert index.resolve(code) == scan_resolve(code, groups), code
+    print(f"resolve   : {len(codes)} code variants == linear scan")
+
+
+def run(title: str, groups: list[str], codes: list[str], rng: random.Random) -> None:
+    index = IcdIndex(groups, CODE_TO_ICD)
+    ordered = sorted(groups, key=len, reverse=True)
+    stream = zipf_stream(codes, rng)
+    print(f"\n{title}: {len(groups)} groups, {len(codes)} distinct codes, {N_REQUESTS} requests (zipf s={ZIPF_S})")
+    print(f"{'method':<22} {'ns/lookup':>10} {'hit rate':>9}")
+    print(f"{'linear scan':<22} {bench(lambda c: scan_resolve(c, ordered), stream):>10.0f} {'-':>9}")
+    print(f"{'prefix (no memo)':<22} {bench(index._lookup, stream):>10.0f} {'-':>9}")
+    print(f"{'IcdIndex (memo)':<22} {bench(index.resolve, stream):>10.0f} {'-':>9}   memo={len(index._memo)}")
+    for size in CACHE_SIZES:
+        cached = lru_cache(maxsize=size)(index._lookup)
+        ns = bench(cached, stream)
+        info = cached.cache_info()
+        print(f"{f'prefix+lru({size})':<22} {ns:>10.0f} {info.hits / (info.hits + info.misses):>9.1%}")
+
+
+if __name__ == "__main__":
+    rng = random.Random(0)
+    codes = make_codes(rng)
+    check(IcdIndex(EDGES_BY_ICD, CODE_TO_ICD), sorted(EDGES_BY_ICD, key=len, reverse=True), codes)
+
+    run("model1 ICD", list(EDGES_BY_ICD), codes, rng)
+
+    # 그룹 수가 늘어도 prefix 조회 비용은 그대로인지: ICD-10 3자리 전체(A00~Z99)를 그룹으로
+    all_groups = [f"{chr(c)}{n:02d}" for c in range(ord("A"), ord("Z") + 1) for n in range(100)]
+    run("ICD-10 3-char", all_groups, codes, rng)
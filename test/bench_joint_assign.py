@@ -0,0 +1,82 @@
+# bench_joint_assign.py
+# HybridScheduler.assign (빈 병상 수 제약 동시 배정) 최적성 확인 + 규모별 속도
+#   - 작은 무작위 케이스는 모든 배정을 완전 탐색한 최적값(① 배정 인원 ② 점수 합)과 비교
+#   - 환자 수백 명 × 전체 병동 규모에서 배정 시간 측정
+# Run  `python test/bench_joint_assign.py`
+import sys
+import time
+import random
+import itertools
+from collections import Counter
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from recommend.hybrid_scheduler import EDGES_BY_ICD, WARD_TOTALS, WARD_FLOORS, HybridScheduler
+
+ICDS = list(EDGES_BY_ICD) + ["I99"]
+WARDS = sorted(set(WARD_TOTALS) | set(WARD_FLOORS))
+CASES = 300
+PATIENT_SIZES = [10, 100, 300, 500]
+
+
+def make_state(rng: random.Random, max_free: int) -> dict:
+    state = {}
+    for w in sorted(rng.sample(WARDS, rng.randint(1, len(WARDS)))):
+        total = rng.randint(1, 45)
+        free = rng.randint(0, min(max_free, total))
+        state[w] = {"total": total, "occupied": total - free}
+    return state
+
+
+def objective(model: HybridScheduler, icds: list[str], state: dict, assigned: list) -> tuple[int, float]:
+    wards = [a[0] for a in assigned if a is not None]
+    for w, n in Counter(wards).items():
+        assert n <= state[w]["total"] - state[w]["occupied"], (w, n)
+    return len(wards), sum(model.combined_score(icd, a[0], state) for icd, a in zip(icds, assigned) if a is not None)
+
+
+def brute_force(model: HybridScheduler, icds: list[str], state: dict) -> tuple[int, float]:
+    options = []
+    for icd in icds:
+        candidates = [w for w in model.edges.get(icd, []) if w in state] or list(state)
+        options.append([None] + [w for w in candidates if state[w]["total"] > state[w]["occupied"]])
+    best = (0, 0.0)
+    for combo in itertools.product(*options):
+        used = Counter(w for w in combo if w is not None)
+        if any(n > state[w]["total"] - state[w]["occupied"] for w, n in used.items()):
+            continue
+        value = (sum(used.values()),
+                 sum(model.combined_score(icd, w, state) for icd, w in zip(icds, combo) if w is not None))
+        if value[0] > best[0] or (value[0] == best[0] and value[1] > best[1] + 1e-12):
+            best = value
+    return best
+
+
+def check_optimal(model: HybridScheduler, seed: int = 0) -> int:
+    rng = random.Random(seed)
+    for _ in range(CASES):
+        state = make_state(rng, max_free=2)
+        icds = [rng.choice(ICDS) for _ in range(rng.randint(1, 5))]
+        got = objective(model, icds, state, model.assign(icds, state=state))
+        best = brute_force(model, icds, state)
+        assert got[0] == best[0] and abs(got[1] - best[1]) < 1e-9, (icds, state, got, best)
+    return CASES
+
+
+if __name__ == "__main__":
+    model = HybridScheduler()
+    print(f"optimal: {check_optimal(model)} cases OK")
+
+    rng = random.Random(1)
+    state = {w: {"total": WARD_TOTALS.get(w) or 20, "occupied": 0} for w in WARDS}
+    for w in state:
+        state[w]["occupied"] = rng.randint(0, state[w]["total"])
+    print(f"free beds: {sum(s['total'] - s['occupied'] for s in state.values())}")
+    print(f"{'patients':>9} {'assigned':>9} {'ms':>8}")
+    for n in PATIENT_SIZES:
+        icds = [rng.choice(ICDS) for _ in range(n)]
+        t0 = time.perf_counter()
+        assigned = model.assign(icds, state=state)
+        ms = (time.perf_counter() - t0) * 1000
+        print(f"{n:>9} {sum(a is not None for a in assigned):>9} {ms:>8.1f}")
@@ -0,0 +1,39 @@
+# bench_model1_params.py
+# model1 아티팩트 비교: pickle(model1.pkl) vs 파라미터 JSON(model1.json)
+#   - 두 아티팩트로 만든 스케줄러의 추천 결과가 같은지 확인
+#   - 로딩 시간 (파일 읽기 + 역직렬화)
+# Run  `python test/bench_model1_params.py`
+import sys
+import time
+import random
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from joblib import load
+
+from recommend.hybrid_scheduler import EDGES_BY_ICD, WARD_TOTALS, load_params
+
+MODEL_DIR = Path(__file__).resolve().parent.parent / "model"
+REPEAT = 2000
+
+
+def timeit(fn) -> float:
+    t0 = time.perf_counter()
+    for _ in range(REPEAT):
+        fn()
+    return (time.perf_counter() - t0) / REPEAT * 1e6
+
+
+if __name__ == "__main__":
+    pkl, params = load(MODEL_DIR / "model1.pkl"), load_params(MODEL_DIR / "model1.json")
+
+    rng = random.Random(0)
+    for _ in range(500):
+        state = {w: {"total": t or 20, "occupied": rng.randint(0, t or 20)} for w, t in WARD_TOTALS.items()}
+        for icd in list(EDGES_BY_ICD) + ["I99"]:
+            assert pkl.recommend(icd, state=state, top_k=3) == params.recommend(icd, state=state, top_k=3)
+    print("recommend : pickle == params")
+
+    print(f"pickle load : {timeit(lambda: load(MODEL_DIR / 'model1.pkl')):8.1f} us")
+    print(f"params load : {timeit(lambda: load_params(MODEL_DIR / 'model1.json')):8.1f} us")
@@ -0,0 +1,138 @@
+# bench_oblivious_trees.py
+# ObliviousTrees (CatBoost → 배열 export + NumPy 평가) 확인 + 속도
+#   - model/model3.pkl: JSON 번들 왕복 후 CatBoost predict와 같은 값인지 (NaN / 미등록 병동코드 포함)
+#   - 재학습 형식 분류 모델(ward_code CTR × float 조합 분기 포함) predict_proba 일치
+#   - 앙상블 merge 결과 = 멤버별 확률
+#   - 행 수별 지연시간: Pool + CatBoost predict / ObliviousTrees.predict
+#     서빙 행 수(병동 수 이하)에서는 NumPy가 빨라야 함 — 단일 모델은 수백 행부터 CatBoost가 빠름 (교차점 출력)
+#   - import 시간 (catboost / recommend.oblivious_trees), 모델 로딩 시간 (pickle / JSON 번들)
+# Run  `python test/bench_oblivious_trees.py`
+import sys
+import time
+import tempfile
+import subprocess
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import numpy as np
+import pandas as pd
+from catboost import CatBoostClassifier, Pool
+from joblib import load
+
+from recommend.oblivious_trees import (ObliviousTrees, convert_bundle, export_catboost, load_pickled_bundle,
+                                       load_tree_bundle, save_tree_bundle)
+from utils.ward_snapshot import WARD_CODES
+
+MODEL3_PATH = ROOT / "model" / "model3.pkl"
+ROWS = [1, len(WARD_CODES), 100, 300, 1000]
+REPEAT = 50
+ROUNDS = 5
+CHECK_ROWS = 5000
+
+
+def timeit(fn, repeat: int = REPEAT) -> float:
+    fn()
+    best = float("inf")
+    for _ in range(ROUNDS):   # 공유 머신 잡음을 줄이려고 ROUNDS번 중 최솟값
+        t0 = time.perf_counter()
+        for _ in range(repeat // ROUNDS or 1):
+            fn()
+        best = min(best, (time.perf_counter() - t0) / (repeat // ROUNDS or 1))
+    return best * 1e3
+
+
+def model3_frame(bundle: dict, n: int, rng: np.random.Generator) -> pd.DataFrame:
+    """서빙과 같은 전처리(imputer → scaler)를 거친 model3 입력 + 미등록 병동 / NaN 일부"""
+    raw = np.column_stack([rng.integers(0, 12, n), rng.random(n), rng.integers(0, 8, n), rng.integers(0, 30, n),
+                           rng.random(n), rng.random(n), rng.integers(0, 7, n), rng.integers(0, 2, n)]).astype(float)
+    raw[rng.random(raw.shape) < 0.02] = np.nan
+    X = pd.DataFrame(bundle["scaler"].transform(bundle["num_imputer"].transform(raw)), columns=bundle["num_cols"])
+    X["ward_code"] = rng.choice([*WARD_CODES, "999999"], n)
+    X.iloc[rng.random(n) < 0.01, 0] = np.nan
+    return X
+
+
+def combo_model(rng: np.random.Generator) -> tuple[CatBoostClassifier, pd.DataFrame]:
+    """재학습 스크립트와 같은 설정 (ward_code cat feature) — CTR이 float 분기와 조합됨"""
+    n = 3000
+    X = pd.DataFrame({"ward_code": rng.choice(WARD_CODES[:8], n), "total": rng.integers(8, 40, n).astype(float),
+                      "rate": rng.random(n), "lag": rng.random(n)})
+    y = ((X["rate"] + 0.1 * (X["ward_code"] == WARD_CODES[2]) * (X["total"] > 20) + rng.normal(0, 0.1, n)) > 0.8)
+    model = CatBoostClassifier(depth=6, iterations=300, learning_rate=0.07, cat_features=[0], verbose=False,
+                               random_state=42, allow_writing_files=False).fit(X, y.astype(int))
+    return model, X
+
+
+def import_time(module: str) -> float:
+    code = f"import time; t0 = time.perf_counter(); import {module}; print(time.perf_counter() - t0)"
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    return float(out.stdout.strip()) * 1e3
+
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+
+    # ── model3 (회귀, ward_code CTR) ──────────────
+    bundle = load(MODEL3_PATH)
+    with tempfile.TemporaryDirectory() as tmp:
+        save_tree_bundle(convert_bundle(bundle), Path(tmp) / "model3.json")
+        trees_bundle = load_tree_bundle(Path(tmp) / "model3.json")
+    trees = trees_bundle["cat_model"]
+    X = model3_frame(bundle, CHECK_ROWS, rng)
+    expected = bundle["cat_model"].predict(Pool(X, cat_features=["ward_code"]))
+    diff = np.abs(trees.predict(X) - expected).max()
+    assert diff < 1e-9, diff
+    raw = np.column_stack([rng.random(100), rng.random(100)] + [rng.random(100)] * 6)
+    raw[::7, 1] = np.nan
+    assert np.array_equal(trees_bundle["num_imputer"].transform(raw), bundle["num_imputer"].transform(raw))
+    assert np.allclose(trees_bundle["scaler"].transform(raw[:, :8]), bundle["scaler"].transform(raw[:, :8]),
+                       rtol=0, atol=1e-12, equal_nan=True)
+    print(f"model3    : {CHECK_ROWS} rows == CatBoost predict (max diff {diff:.1e}), imputer / scaler OK")
+
+    # ── CTR × float 조합 분기 (재학습 형식) ─────────
+    model, X_train = combo_model(rng)
+    combo = export_catboost(model)
+    X_new = X_train.sample(CHECK_ROWS, replace=True, random_state=1).reset_index(drop=True)
+    X_new[["total", "rate", "lag"]] = np.column_stack([rng.integers(0, 50, CHECK_ROWS), rng.random(CHECK_ROWS),
+                                                      rng.random(CHECK_ROWS)])
+    X_new.loc[::13, "ward_code"] = "999999"
+    expected = model.predict_proba(Pool(X_new, cat_features=[0]))[:, 1]
+    diff = np.abs(combo.predict_proba(X_new)[:, 1] - expected).max()
+    assert diff < 1e-9, diff
+    print(f"ctr combo : {combo.cat_deps.shape[0]} cat columns × {2 ** combo.cat_deps.shape[1]} float-bit patterns, "
+          f"max diff {diff:.1e}")
+
+    # ── 앙상블 merge ─────────────────────────────
+    members = [export_catboost(CatBoostClassifier(depth=d, iterations=100, cat_features=[0], verbose=False,
+                                                  random_state=s, allow_writing_files=False).fit(X_train, X_train["rate"] > 0.5))
+               for s, d in enumerate([4, 6, 5])]
+    merged = ObliviousTrees.merge(members)
+    assert np.allclose(merged.member_probas(X_new), [m.predict_proba(X_new)[:, 1] for m in members], rtol=0, atol=1e-12)
+    print(f"merge     : {len(members)} members (depth 4/6/5) == member predict_proba")
+
+    # ── 속도 ───────────────────────────────────
+    cat_model = bundle["cat_model"]
+    X = model3_frame(bundle, max(ROWS), rng)
+    print(f"\n{'rows':>6} {'catboost(ms)':>13} {'numpy(ms)':>10}")
+    slower = []
+    for n in ROWS:
+        Xn = X.iloc[:n]
+        t_cb = timeit(lambda: cat_model.predict(Pool(Xn, cat_features=["ward_code"])))
+        t_np = timeit(lambda: trees.predict(Xn))
+        print(f"{n:>6} {t_cb:>13.3f} {t_np:>10.3f}")
+        if t_np >= t_cb:
+            slower.append(n)
+    assert not [n for n in slower if n <= len(WARD_CODES)], f"서빙 행 수에서 NumPy가 느림: {slower}"
+    print(f"crossover : CatBoost faster from {min(slower)} rows" if slower else "crossover : none up to "
+          f"{max(ROWS)} rows")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path = Path(tmp) / "model3.json"
+        save_tree_bundle(convert_bundle(bundle), json_path)
+        t_pkl = timeit(lambda: load_pickled_bundle(MODEL3_PATH), 5)
+        t_json = timeit(lambda: load_tree_bundle(json_path), 5)
+    print(f"\nimport    : catboost {import_time('catboost'):.0f} ms / recommend.oblivious_trees "
+          f"{import_time('recommend.oblivious_trees'):.0f} ms")
+    print(f"load      : pickle(+convert) {t_pkl:.1f} ms / JSON bundle {t_json:.1f} ms")
@@ -0,0 +1,158 @@
+# bench_response_cache.py
+# 스냅샷 버전 기준 응답 캐시 + ETag
+#   - 폴링 클라이언트(If-None-Match에 직전 ETag)가 세 엔드포인트를 반복 호출: 200 / 304 수, 첫 요청(miss) / 200 hit / 304 지연시간
+#   - 캐시된 본문 == 캐시 없이 계산한 본문
+#   - 새 스냅샷(reg_dtm) → 다시 계산, 결과가 같으면 ETag가 같아 304 유지
+#   - 계산 도중 스냅샷이 바뀌면 그 결과는 이전 key로 캐시하지 않음
+#   - stale(이전 이력으로 계산) 여부는 응답별: 동시에 끝난 다른 응답의 표시 · 캐시에 영향 없음
+#   - LRU 제거 순서 / bytes 집계, /cache/stats
+# 병상 로그 DB · model2는 bench_concurrency와 같은 지연 모델 / 합성 앙상블 사용
+# Run  `python test/bench_response_cache.py`
+import sys
+import io
+import json
+import time
+import asyncio
+import tempfile
+import contextlib
+from pathlib import Path
+from datetime import timedelta
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from bench_concurrency import history, install_db, install_model2   # noqa: E402  (루트 경로 · 로깅 설정 포함)
+
+import numpy as np
+from fastapi import Request
+
+import main
+import utils.snapshot_store as store_module
+from utils.model_registry import model_registry
+from utils.response_cache import ResponseCache, render, response_cache
+
+CLIENTS = 20
+ROUNDS = 10
+
+
+def request(etag: str | None = None) -> Request:
+    headers = [(b"if-none-match", etag.encode())] if etag else []
+    return Request({"type": "http", "method": "POST", "headers": headers})
+
+
+ENDPOINTS = {
+    "transfer": lambda req: main.recommend_transfer(main.ICDRequest(icd="I63"), req),
+    "congestion": main.recommend_congestion,
+    "discharge": main.recommend_discharge,
+}
+
+
+def set_snapshot(row: dict):
+    main.snapshot_store._latest = store_module._with_parsed(dict(row))
+
+
+def check_lru():
+    cache = ResponseCache(max_entries=2)
+    a, b, c = (render({"success": True, "v": v}) for v in "abc")
+    cache.put("a", a), cache.put("b", b)
+    assert cache.get("a") is a            # a 최근 사용 → b가 제거 대상
+    cache.put("c", c)
+    assert cache.get("b") is None and cache.get("a") is a and cache.get("c") is c
+    assert cache.bytes == len(a.body) + len(c.body) and cache.evictions == 1
+    print("lru       : eviction order / bytes OK")
+
+
+async def poll(name: str, latencies: dict, codes: dict):
+    etag = None
+    for _ in range(ROUNDS):
+        t0 = time.perf_counter()
+        response = await ENDPOINTS[name](request(etag))
+        elapsed = time.perf_counter() - t0
+        kind = "304" if response.status_code == 304 else ("miss" if etag is None and not codes else "200")
+        latencies.setdefault(kind, []).append(elapsed)
+        codes[response.status_code] = codes.get(response.status_code, 0) + 1
+        etag = response.headers["etag"]
+
+
+async def bench():
+    check_lru()
+    days = history([0, 1, 7])
+    set_snapshot(days[0][0])
+
+    # 캐시 없이 계산한 본문과 비교
+    fresh = {}
+    for name, endpoint in ENDPOINTS.items():
+        response_cache.clear()
+        fresh[name] = (await endpoint(request())).body
+        assert json.loads(fresh[name])["success"], fresh[name]
+    response_cache.clear()
+
+    print(f"\n{CLIENTS} polling clients × {ROUNDS} rounds per endpoint")
+    print(f"{'endpoint':<11} {'200':>5} {'304':>5} {'miss(ms)':>9} {'hit 200(ms)':>12} {'304(ms)':>8}")
+    for name, endpoint in ENDPOINTS.items():
+        latencies, codes = {}, {}
+        await poll(name, latencies, codes)   # 첫 요청 (miss)
+        await asyncio.gather(*(poll(name, latencies, codes) for _ in range(CLIENTS - 1)))
+        body = (await endpoint(request())).body
+        assert body == fresh[name], name
+        ms = {k: np.median(v) * 1e3 for k, v in latencies.items()}
+        print(f"{name:<11} {codes.get(200, 0):>5} {codes.get(304, 0):>5} {ms['miss']:>9.2f} "
+              f"{ms['200']:>12.3f} {ms['304']:>8.3f}")
+
+    # 새 스냅샷: key가 바뀌어 다시 계산, 같은 결과면 ETag도 같음
+    before = await main.recommend_congestion(request())
+    misses = response_cache.misses
+    row = dict(days[0][0])
+    row["_timestamp"] = row["_timestamp"] + timedelta(minutes=1)
+    set_snapshot(row)
+    after = await main.recommend_congestion(request(before.headers["etag"]))
+    assert response_cache.misses == misses + 1 and after.status_code == 304
+    print("\nsnapshot  : new reg_dtm → recomputed once, unchanged body keeps ETag (304)")
+
+    # 계산 중 poller가 스냅샷을 바꿈 → 응답은 주되 이전 버전 key로는 보관하지 않음
+    async def moving_compute():
+        moved = dict(row)
+        moved["_timestamp"] = moved["_timestamp"] + timedelta(minutes=1)
+        set_snapshot(moved)
+        return {"success": True, "result": "moved"}, False
+
+    async def steady_compute():
+        return {"success": True, "result": "steady"}, False
+
+    key = main.flight_key("race")
+    assert (await main.cached_json(request(), key, moving_compute)).status_code == 200
+    assert response_cache.get(key) is None
+    key = main.flight_key("race")
+    await main.cached_json(request(), key, steady_compute)
+    assert response_cache.get(key) is not None
+    print("race      : snapshot changed mid-compute → not cached under the old key")
+
+    # stale은 응답마다: 이전 이력으로 계산한 응답만 stale 표시 + 캐시 제외, 그 사이에 끝난 다른 응답은 영향 없음
+    async def stale_compute():
+        await asyncio.sleep(0.02)
+        return {"success": True, "result": "stale"}, True
+
+    async def fresh_compute():
+        await asyncio.sleep(0.01)
+        return {"success": True, "result": "fresh"}, False
+
+    stale_key, fresh_key = main.flight_key("stale"), main.flight_key("fresh")
+    stale, fresh = await asyncio.gather(main.cached_json(request(), stale_key, stale_compute),
+                                        main.cached_json(request(), fresh_key, fresh_compute))
+    assert stale.headers["x-snapshot-stale"] == "true" and response_cache.get(stale_key) is None
+    assert fresh.headers["x-snapshot-stale"] == ("true" if main.snapshot_store.stale else "false")
+    assert response_cache.get(fresh_key) is not None
+    print("stale     : per-response flag, stale result not cached, concurrent fresh result cached")
+
+    stats = await main.cache_stats()
+    print(f"stats     : {json.dumps(stats['response_cache'])}")
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as tmp:
+        install_model2(Path(tmp))
+        install_db(history([0, 1, 7]))
+        model_registry.preload()
+        with contextlib.redirect_stdout(io.StringIO()) as out:
+            asyncio.run(bench())
+        print("\n".join(line for line in out.getvalue().splitlines()
+                        if not line.startswith("today=")))
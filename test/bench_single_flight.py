@@ -0,0 +1,111 @@
+# bench_single_flight.py
+# 대시보드 새로고침 burst: 클라이언트 N개가 /congestion/recommend · /discharge/recommend를 동시에 호출
+#   - single-flight 끔(요청마다 고유 key) / 켬 — DB 조회 수, 추론 실행 수, burst 전체 시간
+#   - 합류한 요청이 leader와 같은 응답을 받는지, 예외도 함께 전달되는지, 한 요청이 취소돼도 나머지는 결과를 받는지
+# 병상 로그 DB · model2는 bench_concurrency와 같은 지연 모델 / 합성 앙상블 사용
+# Run  `python test/bench_single_flight.py`
+import sys
+import io
+import json
+import time
+import asyncio
+import tempfile
+import contextlib
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from bench_concurrency import REQUEST, history, install_db, install_model2   # noqa: E402  (루트 경로 · 로깅 설정 포함)
+
+import main
+import utils.snapshot_store as store_module
+from utils.model_registry import model_registry
+from utils.scoring_executor import scoring_executor
+from utils.single_flight import SingleFlight
+
+CLIENTS = [8, 32, 64]
+
+
+def count_calls():
+    """DB 조회 / 추론 실행 횟수를 세는 래퍼 설치"""
+    counts = {"db": 0, "scoring": 0}
+    fetch, run = store_module.aget_realtime_data_for_days, scoring_executor.run
+
+    async def counted_fetch(*args, **kwargs):
+        counts["db"] += 1
+        return await fetch(*args, **kwargs)
+
+    async def counted_run(*args, **kwargs):
+        counts["scoring"] += 1
+        return await run(*args, **kwargs)
+
+    store_module.aget_realtime_data_for_days = counted_fetch
+    scoring_executor.run = counted_run
+    return counts
+
+
+async def burst(clients: int) -> tuple[float, list[dict]]:
+    endpoints = [main.recommend_congestion, main.recommend_discharge]
+    t0 = time.perf_counter()
+    responses = await asyncio.gather(*(endpoints[i % 2](REQUEST) for i in range(clients)))
+    return (time.perf_counter() - t0) * 1e3, [json.loads(r.body) for r in responses]
+
+
+async def check_semantics():
+    flight = SingleFlight()
+    calls = 0
+
+    async def slow(value):
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        if isinstance(value, Exception):
+            raise value
+        return value
+
+    results = await asyncio.gather(*(flight.do("a", lambda: slow({"v": 1})) for _ in range(10)))
+    assert calls == 1 and all(r is results[0] for r in results)
+
+    errors = await asyncio.gather(*(flight.do("b", lambda: slow(ValueError("x"))) for _ in range(5)),
+                                  return_exceptions=True)
+    assert calls == 2 and all(isinstance(e, ValueError) for e in errors)
+
+    first = asyncio.create_task(flight.do("c", lambda: slow("c")))
+    await asyncio.sleep(0)
+    rest = [asyncio.create_task(flight.do("c", lambda: slow("c"))) for _ in range(3)]
+    await asyncio.sleep(0.01)
+    first.cancel()
+    with contextlib.suppress(asyncio.CancelledError):
+        await first
+    assert await asyncio.gather(*rest) == ["c"] * 3 and calls == 3
+    assert flight.in_flight == 0 and flight.stats()["followers"] == 9 + 4 + 3
+    print("check     : shared result / shared exception / leader cancel OK")
+
+
+async def bench():
+    await check_semantics()
+    counts = count_calls()
+    key = main.flight_key
+    print(f"\n{'clients':>7} {'single-flight':<14} {'db':>4} {'scoring':>8} {'burst(ms)':>10}")
+    for clients in CLIENTS:
+        bodies = {}
+        for name, flight_key in [("off", lambda *a: key(*a) + (object(),)), ("on", key)]:
+            main.flight_key = flight_key
+            counts.update(db=0, scoring=0)
+            elapsed, responses = await burst(clients)
+            assert all(r["success"] for r in responses), responses[0]
+            bodies[name] = responses
+            print(f"{clients:>7} {name:<14} {counts['db']:>4} {counts['scoring']:>8} {elapsed:>10.1f}")
+        assert bodies["off"] == bodies["on"]
+    main.flight_key = key
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as tmp:
+        install_model2(Path(tmp))
+        install_db(history([0, 1, 7]))
+        model_registry.preload()
+        with contextlib.redirect_stdout(io.StringIO()) as out:
+            asyncio.run(bench())
+        print("\n".join(line for line in out.getvalue().splitlines()
+                        if not line.startswith("today=")))
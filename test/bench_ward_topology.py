@@ -0,0 +1,106 @@
+# bench_ward_topology.py
+# WardTopology (병동 배치 그래프, Floyd–Warshall 전체 쌍 이동 비용) 확인 + 속도
+#   - 1층 기준 비용 = 기존 WARD_DISTANCES(abs(층 - 1) * 0.1)와 같은지
+#   - 건물/통로를 늘린 합성 배치에서 행렬 값 = 요청마다 Dijkstra로 구한 값인지
+#   - 행렬 생성 시간, 조회(행렬 인덱싱) vs 요청마다 Dijkstra
+# Run  `python test/bench_ward_topology.py`
+import sys
+import time
+import heapq
+import random
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from recommend.hybrid_scheduler import BASE_FLOOR, MAIN_BUILDING, WARD_DISTANCES, WARD_FLOORS, WARD_TOPOLOGY
+from recommend.ward_topology import WardTopology
+
+N_BUILDINGS = 4
+FLOORS = 12
+WARDS_PER_FLOOR = 4
+LOOKUPS = 20_000
+
+
+def make_layout(rng: random.Random) -> tuple[dict, dict, list]:
+    """건물 N_BUILDINGS개 × FLOORS층, 층마다 병동 WARDS_PER_FLOOR개, 인접 건물끼리 1~2개 층에 통로"""
+    locations = {
+        f"B{b}-{f}F-{k}": (f"B{b}", f)
+        for b in range(N_BUILDINGS) for f in range(1, FLOORS + 1) for k in range(WARDS_PER_FLOOR)
+    }
+    elevators = {f"B{b}": sorted(rng.sample(range(1, FLOORS + 1), FLOORS - 2) + [1, FLOORS]) for b in range(N_BUILDINGS)}
+    links = [((f"B{b}", f), (f"B{b + 1}", f), rng.choice([1, 2, 3]))
+             for b in range(N_BUILDINGS - 1) for f in rng.sample(range(1, FLOORS + 1), rng.randint(1, 2))]
+    # 엘리베이터가 서지 않는 층의 병동은 계단으로 인접 층에 연결
+    for b, stops in elevators.items():
+        for f in range(1, FLOORS + 1):
+            if f not in stops:
+                links.append(((b, f), (b, f - 1 if f > 1 else f + 1), 2))
+    return locations, elevators, links
+
+
+def make_graph(topology: WardTopology, elevators: dict, links: list) -> dict:
+    """WardTopology와 같은 간선 정의의 인접 리스트"""
+    graph: dict = {}
+
+    def add(a, b, c):
+        graph.setdefault(a, []).append((b, c))
+        graph.setdefault(b, []).append((a, c))
+
+    for w, loc in topology.locations.items():
+        add(w, loc, 0)
+    for b, fs in elevators.items():
+        fs = sorted(set(fs))
+        for lo, hi in zip(fs, fs[1:]):
+            add((b, lo), (b, hi), hi - lo)
+    for a, b, c in links:
+        add(a, b, c)
+    return graph
+
+
+def dijkstra(graph: dict, origin: str, target: str, unit: float) -> float:
+    """요청마다 최단 경로 계산 (비교 기준)"""
+    dist, heap, seen = {origin: 0}, [(0, 0, origin)], set()
+    counter = 1
+    while heap:
+        d, _, node = heapq.heappop(heap)
+        if node == target:
+            return d * unit
+        if node in seen:
+            continue
+        seen.add(node)
+        for nxt, c in graph[node]:
+            if d + c < dist.get(nxt, float("inf")):
+                dist[nxt] = d + c
+                heapq.heappush(heap, (d + c, counter, nxt))
+                counter += 1
+    return float("inf")
+
+
+if __name__ == "__main__":
+    old = {w: abs(f - BASE_FLOOR) * 0.1 for w, f in WARD_FLOORS.items()}
+    assert WARD_TOPOLOGY.costs_from((MAIN_BUILDING, BASE_FLOOR)) == old == WARD_DISTANCES
+    print(f"default   : 1st-floor costs == abs(floor - {BASE_FLOOR}) * 0.1 for {len(old)} wards")
+
+    rng = random.Random(0)
+    locations, elevators, links = make_layout(rng)
+    t0 = time.perf_counter()
+    topology = WardTopology(locations, elevators, links)
+    build_ms = (time.perf_counter() - t0) * 1e3
+
+    graph = make_graph(topology, elevators, links)
+    wards = list(locations)
+    pairs = [(rng.choice(wards), rng.choice(wards)) for _ in range(LOOKUPS)]
+    for o, w in pairs[:500]:
+        assert abs(topology.cost(o, w) - dijkstra(graph, o, w, 0.1)) < 1e-12, (o, w)
+    print(f"synthetic : {len(wards)} wards / {len(topology.hubs)} hubs, matrix == dijkstra on 500 pairs")
+    print(f"build     : {build_ms:8.1f} ms (Floyd–Warshall, {topology.costs.shape[0]} nodes)")
+
+    t0 = time.perf_counter()
+    for o, w in pairs:
+        topology.cost(o, w)
+    lookup_us = (time.perf_counter() - t0) / LOOKUPS * 1e6
+    t0 = time.perf_counter()
+    for o, w in pairs[:2000]:
+        dijkstra(graph, o, w, 0.1)
+    dijkstra_us = (time.perf_counter() - t0) / 2000 * 1e6
+    print(f"lookup    : {lookup_us:8.2f} us   per-request dijkstra : {dijkstra_us:8.1f} us")
@@ -0,0 +1,117 @@
+# utils/circuit_breaker.py >> DB 장애 시 요청이 매번 timeout까지 기다리지 않도록 하는 circuit breaker
+import asyncio
+import functools
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitOpenError(RuntimeError):
+    """breaker가 열려 있어 호출하지 않고 바로 실패"""
+
+
+class CircuitBreaker:
+    """
+    연속 실패가 failure_threshold번 쌓이면 열림(open) → reset_timeout초 동안 호출 없이 바로 CircuitOpenError.
+
+    - reset_timeout이 지나면 반열림(half-open): 호출 1건만 시험으로 통과시키고 나머지는 계속 거절
+      (보통 snapshot poller의 주기 갱신이 이 시험 호출이 됨)
+    - 시험 호출이 성공하면 닫힘(closed), 실패하면 다시 열림
+    - exclude 예외(예: 데이터 없음 ValueError)는 DB가 응답한 것이므로 성공으로 취급
+    - poller 스레드와 이벤트 루프에서 함께 쓰므로 상태 변경은 lock 안에서
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 3, reset_timeout: float = 30.0,
+                 exclude: tuple[type[BaseException], ...] = ()):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.exclude = exclude
+        self._lock = threading.Lock()
+        self.state = "closed"
+        self.failures = 0          # 연속 실패 수
+        self._opened_at = 0.0
+        self._trial = False        # half-open 시험 호출 진행 중
+        self.trips = 0             # 열린 횟수
+        self.rejected = 0          # 열려 있어서 거절한 호출 수
+
+    # ─── 상태 ─────────────────────────────────
+    @property
+    def closed(self) -> bool:
+        return self.state == "closed"
+
+    def _admit(self):
+        with self._lock:
+            if self.state == "closed":
+                return
+            if not self._trial and (self.state == "half_open"
+                                    or time.monotonic() - self._opened_at >= self.reset_timeout):
+                self.state, self._trial = "half_open", True
+                return
+            self.rejected += 1
+        raise CircuitOpenError(f"{self.name} circuit open (연속 실패 {self.failures}회)")
+
+    def record_success(self):
+        with self._lock:
+            if self.state != "closed":
+                logger.info(f"[breaker] {self.name} 복구 → closed")
+            self.state, self.failures, self._trial = "closed", 0, False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial = False
+            if self.state == "half_open" or (self.state == "closed" and self.failures >= self.failure_threshold):
+                self.state, self._opened_at = "open", time.monotonic()
+                self.trips += 1
+                logger.warning(f"[breaker] {self.name} open (연속 실패 {self.failures}회, "
+                               f"{self.reset_timeout:.0f}초 후 재시도)")
+
+    def _record(self, error: BaseException | None):
+        if error is None or isinstance(error, self.exclude):
+            self.record_success()
+        else:
+            self.record_failure()
+
+    # ─── 호출 ─────────────────────────────────
+    def call(self, fn, *args, **kwargs):
+        self._admit()
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            self._record(e)
+            raise
+        self._record(None)
+        return result
+
+    async def acall(self, fn, *args, **kwargs):
+        self._admit()
+        try:
+            result = await fn(*args, **kwargs)
+        except asyncio.CancelledError:
+            with self._lock:
+                self._trial = False   # 요청 취소는 DB 상태와 무관 → 다음 호출이 다시 시험
+            raise
+        except BaseException as e:
+            self._record(e)
+            raise
+        self._record(None)
+        return result
+
+    def guard(self, fn):
+        """동기 / async 함수 데코레이터"""
+        if asyncio.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                return await self.acall(fn, *args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            return self.call(fn, *args, **kwargs)
+        return wrapper
+
+    def stats(self) -> dict:
+        return {"state": self.state, "failures": self.failures, "trips": self.trips, "rejected": self.rejected}
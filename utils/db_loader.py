@@ -1,122 +1,210 @@
 #utils/db_loader.py >> 병상 API
 import os, json
+import asyncio
 from dotenv import load_dotenv
-from sqlalchemy import create_engine, text, URL
+from sqlalchemy import text
 from datetime import datetime, timedelta
 from datetime import date, timedelta, time
 from sqlalchemy import cast
 import pandas as pd
 from utils.preprocess import parse_model1_input
+from utils.circuit_breaker import CircuitBreaker
+from utils.db_pool import db_pool
 load_dotenv()
-# .env에서 DATABASE_URL 직접 불러오기
-from sqlalchemy import create_engine
-from dotenv import load_dotenv
-from pathlib import Path
-import os
-
-# 환경변수 로드
-ROOT = Path(__file__).resolve().parent.parent
-load_dotenv(dotenv_path=ROOT / ".env")
-
-DB_URL  = os.getenv("DB_URL")
-DB_PORT = os.getenv("DB_PORT")
-DB_USER = os.getenv("DB_USER")
-DB_PW   = os.getenv("DB_PW")
-
-URL_OBJ = URL.create(
-    drivername="mysql+pymysql",
-    username=DB_USER,
-    password=DB_PW,
-    host=DB_URL,
-    port=DB_PORT,
+
+# ─── 연결 풀 ──────────────────────────────────
+# 접속 정보 · 풀 설정 · 연결 / read timeout은 utils/db_pool.py (역할별 엔진을 첫 조회 시 생성해 프로세스 안에서 공유)
+#   primary : API / poller 조회, replica : 재학습용 대량 조회, async : API 요청 경로
+
+def __getattr__(name):
+    # 예전 `from utils.db_loader import engine` 호환 — 접근 시점에 primary 엔진 생성
+    if name == "engine":
+        return db_pool.engine()
+    raise AttributeError(name)
+
+# ─── 타임아웃 / circuit breaker ─────────────────
+# DB가 멈췄을 때 조회가 무한정 기다리지 않도록 제한 (동기 조회는 db_pool의 pymysql read timeout)
+LOG_QUERY_TIMEOUT_SEC  = float(os.getenv("LOG_QUERY_TIMEOUT_SEC", "5"))    # async 병상 로그 조회 1회 (연결 포함)
+
+# 병상 로그(tb_api_log) 조회 breaker: 연속 실패 시 요청 경로는 DB를 건너뛰고 저장소의 마지막 스냅샷을 사용
+log_breaker = CircuitBreaker(
+    "tb_api_log",
+    failure_threshold=int(os.getenv("DB_BREAKER_FAILURES", "3")),
+    reset_timeout=float(os.getenv("DB_BREAKER_RESET_SEC", "30")),
+    exclude=(ValueError,),   # 데이터 없음 / 파싱 실패는 DB 장애가 아님
 )
-engine  = create_engine(URL_OBJ, future=True)
 
+
+LATEST_QUERY = text("""
+    SELECT ctnt, reg_dtm
+      FROM rmrp_portal.tb_api_log
+     WHERE req_res = 'REQ'
+       AND com_src_cd = 'CMC03'
+       AND req_url LIKE '%mdcl-rm-rcpt%'
+     ORDER BY reg_dtm DESC
+     LIMIT 1
+""")
+
+def _decode_latest(row) -> dict:
+    if not row or not row[0]:
+        raise ValueError("DB에 유효한 ctnt 데이터가 없습니다.")
+    try:
+        data = json.loads(row[0])
+        data["_timestamp"] = row[1]  # reg_dtm 기반 시간 추가
+        return data
+    except json.JSONDecodeError as e:
+        raise ValueError(f"JSON 파싱 실패: {e}")
+
+async def _afetch(query, params: dict | None = None, one: bool = False):
+    """async 엔진으로 조회 — 연결 + 실행 전체를 LOG_QUERY_TIMEOUT_SEC로 제한 (초과 시 TimeoutError)"""
+    async def fetch():
+        async with db_pool.aconnect() as conn:
+            result = await conn.execute(query, params or {})
+            return result.fetchone() if one else result.fetchall()
+    return await asyncio.wait_for(fetch(), LOG_QUERY_TIMEOUT_SEC)
+
+@log_breaker.guard
 def get_latest_realtime_data() -> dict:
+    with db_pool.connect() as conn:
+        row = conn.execute(LATEST_QUERY).fetchone()
+    return _decode_latest(row)
+
+@log_breaker.guard
+async def aget_latest_realtime_data() -> dict:
+    """get_latest_realtime_data의 async 버전 (이벤트 루프를 막지 않음)"""
+    row = await _afetch(LATEST_QUERY, one=True)
+    return _decode_latest(row)
+
+# ─── reg_dtm 범위 조회 ──────────────────────────
+def _decode_rows(rows) -> list[dict]:
+    """(ctnt, reg_dtm) row 목록 → `_timestamp`가 붙은 JSON 목록 (파싱 실패 row는 건너뜀)"""
+    results = []
+    for row in rows:
+        try:
+            parsed_json = json.loads(row[0])
+            parsed_json["_timestamp"] = row[1]
+            results.append(parsed_json)
+        except Exception:
+            continue
+    return results
+
+def _day_bounds(target_date: date) -> tuple[datetime, datetime]:
+    """target_date 하루를 [00:00, 다음날 00:00) 반열린 구간으로 반환"""
+    start_dt = datetime.combine(target_date, time.min)
+    return start_dt, start_dt + timedelta(days=1)
+
+def get_realtime_data_between(start_dt: datetime, end_dt: datetime, role: str = "primary") -> list[dict]:
+    """
+    reg_dtm이 [start_dt, end_dt) 구간에 속하는 병상 요청 JSON 목록 (reg_dtm DESC).
+    reg_dtm 컬럼에 함수를 씌우지 않으므로 reg_dtm 인덱스 range scan이 가능하고,
+    조회 비용이 tb_api_log 전체 크기가 아니라 구간 내 row 수에만 비례한다.
+    role="replica"면 재학습용 풀(읽기 replica)에서 조회.
+    """
     query = text("""
         SELECT ctnt, reg_dtm
           FROM rmrp_portal.tb_api_log
          WHERE req_res = 'REQ'
            AND com_src_cd = 'CMC03'
            AND req_url LIKE '%mdcl-rm-rcpt%'
+           AND ctnt IS NOT NULL
+           AND reg_dtm >= :start_dt
+           AND reg_dtm <  :end_dt
          ORDER BY reg_dtm DESC
-         LIMIT 1
     """)
 
-    with engine.connect() as conn:
-        row = conn.execute(query).fetchone()
-        if not row or not row[0]:
-            raise ValueError("DB에 유효한 ctnt 데이터가 없습니다.")
-        try:
-            data = json.loads(row[0])
-            data["_timestamp"] = row[1]  # reg_dtm 기반 시간 추가
-            return data
-        except json.JSONDecodeError as e:
-            raise ValueError(f"JSON 파싱 실패: {e}")
+    with db_pool.connect(role) as conn:
+        rows = conn.execute(query, {"start_dt": start_dt, "end_dt": end_dt}).fetchall()
 
-def get_realtime_data_for_today() -> list[dict]:
-    today = datetime.now().date()
+    return _decode_rows(rows)
 
+@log_breaker.guard
+def get_realtime_data_since(after_ts: datetime) -> list[dict]:
+    """after_ts 이후(초과)에 새로 적재된 병상 요청 JSON 목록 (reg_dtm DESC) — poller 증분 조회용"""
     query = text("""
         SELECT ctnt, reg_dtm
           FROM rmrp_portal.tb_api_log
          WHERE req_res = 'REQ'
            AND com_src_cd = 'CMC03'
            AND req_url LIKE '%mdcl-rm-rcpt%'
+           AND ctnt IS NOT NULL
+           AND reg_dtm > :after_ts
          ORDER BY reg_dtm DESC
     """)
 
-    results = []
+    with db_pool.connect() as conn:
+        rows = conn.execute(query, {"after_ts": after_ts}).fetchall()
 
-    with engine.connect() as conn:
-        rows = conn.execute(query).fetchall()
+    return _decode_rows(rows)
 
-    for row in rows:
-        try:
-            reg_dtm = row[1]
-            if reg_dtm.date() != today:
-                continue
-
-            parsed_json = json.loads(row[0])
-            parsed_json["_timestamp"] = reg_dtm
-            results.append(parsed_json)
-        except Exception:
-            continue
-
-    return results
-
-def get_realtime_data_for_days_ago(n: int) -> list[dict]:
-    target_date = (datetime.now() - timedelta(days=n)).date()
+def _days_query(offsets: list[int], base_date: date):
+    """get_realtime_data_for_days 쿼리 (offset 날짜마다 reg_dtm 범위 조건을 OR로 묶음)"""
+    params, ranges = {}, []
+    for i, n in enumerate(offsets):
+        params[f"s{i}"], params[f"e{i}"] = _day_bounds(base_date - timedelta(days=n))
+        ranges.append(f"(reg_dtm >= :s{i} AND reg_dtm < :e{i})")
 
-    query = text("""
+    query = text(f"""
         SELECT ctnt, reg_dtm
           FROM rmrp_portal.tb_api_log
          WHERE req_res = 'REQ'
            AND com_src_cd = 'CMC03'
            AND req_url LIKE '%mdcl-rm-rcpt%'
+           AND ctnt IS NOT NULL
+           AND ({" OR ".join(ranges)})
          ORDER BY reg_dtm DESC
     """)
+    return query, params
+
+def _group_by_offset(rows, offsets: list[int], base_date: date) -> dict[int, list[dict]]:
+    result: dict[int, list[dict]] = {n: [] for n in offsets}
+    for parsed_json in _decode_rows(rows):
+        n = (base_date - parsed_json["_timestamp"].date()).days
+        if n in result:
+            result[n].append(parsed_json)
+    return result
 
-    result = []
+@log_breaker.guard
+def get_realtime_data_for_days(offsets: list[int], base_date: date | None = None) -> dict[int, list[dict]]:
+    """
+    base_date 기준 n일 전(offset) 날짜들의 병상 요청 JSON을 한 번의 쿼리로 조회.
+    반환: {offset: [json, ...]} (각 목록은 reg_dtm DESC, 데이터가 없는 offset은 빈 목록)
 
-    with engine.connect() as conn:
-        rows = conn.execute(query).fetchall()
+    각 날짜를 reg_dtm 범위 조건의 OR로 묶으므로 lag 개수가 늘어도 round-trip은 1회다.
+    """
+    if base_date is None:
+        base_date = datetime.now().date()
 
-    for row in rows:
-        try:
-            reg_dtm = row[1]
-            if reg_dtm.date() != target_date:
-                continue
+    offsets = sorted(set(offsets))
+    if not offsets:
+        return {}
 
-            parsed_json = json.loads(row[0])
-            parsed_json["_timestamp"] = reg_dtm
-            result.append(parsed_json)
-        except Exception:
-            continue
+    query, params = _days_query(offsets, base_date)
+    with db_pool.connect() as conn:
+        rows = conn.execute(query, params).fetchall()
+    return _group_by_offset(rows, offsets, base_date)
 
-    return result
+@log_breaker.guard
+async def aget_realtime_data_for_days(offsets: list[int], base_date: date | None = None) -> dict[int, list[dict]]:
+    """get_realtime_data_for_days의 async 버전 (이벤트 루프를 막지 않음)"""
+    if base_date is None:
+        base_date = datetime.now().date()
+
+    offsets = sorted(set(offsets))
+    if not offsets:
+        return {}
+
+    query, params = _days_query(offsets, base_date)
+    rows = await _afetch(query, params)
+    return _group_by_offset(rows, offsets, base_date)
+
+def get_realtime_data_for_today() -> list[dict]:
+    return get_realtime_data_for_date(datetime.now().date())
 
-def get_latest_realtime_data_for_days_ago(n: int, base_ts: datetime | None = None) -> dict:
+def get_realtime_data_for_days_ago(n: int) -> list[dict]:
+    target_date = (datetime.now() - timedelta(days=n)).date()
+    return get_realtime_data_for_date(target_date)
+
+def get_latest_realtime_data_for_days_ago(n: int, base_ts: datetime | None = None, role: str = "primary") -> dict:
     """
     가장 최근 시각(base_ts)을 기준으로 n일 전 데이터를 가져온다.
     base_ts가 없으면 datetime.now()를 사용(이전 동작과 호환).
@@ -140,7 +228,7 @@ def get_latest_realtime_data_for_days_ago(n: int, base_ts: datetime | None = Non
         LIMIT 1
     """)
 
-    with engine.connect() as conn:
+    with db_pool.connect(role) as conn:
         row = conn.execute(query, {"start_dt": start_dt, "end_dt": end_dt}).fetchone()
    # print(f"[DEBUG] DB 연결 정보: {engine.url}")
 
@@ -159,36 +247,12 @@ def get_latest_realtime_data_for_days_ago(n: int, base_ts: datetime | None = Non
 
 
         
-def get_realtime_data_for_date(target_date: date) -> list[dict]:
+def get_realtime_data_for_date(target_date: date, role: str = "primary") -> list[dict]:
     """
-    특정 날짜의 reg_dtm이 해당 날짜로 시작하는 병상 요청 JSON 데이터 추출.
+    특정 날짜(reg_dtm 기준)의 병상 요청 JSON 데이터 추출.
     `_timestamp` 필드를 reg_dtm 기준으로 추가하여 반환.
     """
-    query = text("""
-        SELECT ctnt, reg_dtm
-          FROM rmrp_portal.tb_api_log
-         WHERE req_res = 'REQ'
-           AND com_src_cd = 'CMC03'
-           AND req_url LIKE '%mdcl-rm-rcpt%'
-           AND DATE(reg_dtm) = :target_date
-         ORDER BY reg_dtm DESC
-    """)
-    results = []
-
-    with engine.connect() as conn:
-        rows = conn.execute(query, {"target_date": target_date}).fetchall()
-
-    for row in rows:
-        try:
-            raw_ctnt = row[0]
-            reg_dtm = row[1]
-            parsed_json = json.loads(raw_ctnt)
-            parsed_json["_timestamp"] = reg_dtm  # reg_dtm 기준
-            results.append(parsed_json)
-        except Exception:
-            continue
-
-    return results
+    return get_realtime_data_between(*_day_bounds(target_date), role=role)
 
 
 def safe_get_realtime_data_for_today():
@@ -226,7 +290,7 @@ def get_api_logs_raw(days: int) -> pd.DataFrame:
            AND req_url LIKE '%mdcl-rm-rcpt%'
            AND reg_dtm >= NOW() - INTERVAL :d DAY
     """)
-    with engine.connect() as conn:
+    with db_pool.connect("replica") as conn:
         return pd.read_sql(query, conn, params={"d": days})
     
 def preprocess(df: pd.DataFrame) -> pd.DataFrame:
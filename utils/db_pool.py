@@ -0,0 +1,195 @@
+# utils/db_pool.py >> 프로세스당 1번 지연 생성해 공유하는 SQLAlchemy 연결 풀
+import logging
+import os
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from pathlib import Path
+
+from dotenv import load_dotenv
+from sqlalchemy import URL, create_engine, event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+ROOT = Path(__file__).resolve().parent.parent
+load_dotenv(dotenv_path=ROOT / ".env")
+
+DB_URL  = os.getenv("DB_URL")
+DB_PORT = os.getenv("DB_PORT")
+DB_USER = os.getenv("DB_USER")
+DB_PW   = os.getenv("DB_PW")
+# 재학습용 무거운 조회를 보낼 읽기 전용 replica (없으면 같은 DB에 별도 풀)
+DB_REPLICA_URL  = os.getenv("DB_REPLICA_URL")
+DB_REPLICA_PORT = os.getenv("DB_REPLICA_PORT", DB_PORT)
+
+# ─── 풀 설정 ─────────────────────────────────
+POOL_SIZE          = int(os.getenv("DB_POOL_SIZE", "5"))
+MAX_OVERFLOW       = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+POOL_RECYCLE_SEC   = int(os.getenv("DB_POOL_RECYCLE_SEC", "1800"))   # MySQL wait_timeout보다 짧게
+POOL_PRE_PING      = os.getenv("DB_POOL_PRE_PING", "1").lower() not in ("0", "false", "no")
+DB_CONNECT_TIMEOUT_SEC = float(os.getenv("DB_CONNECT_TIMEOUT_SEC", "3"))          # TCP 연결 / 풀 대기
+DB_READ_TIMEOUT_SEC    = float(os.getenv("DB_READ_TIMEOUT_SEC", "30"))            # pymysql 소켓 read
+DB_WRITE_TIMEOUT_SEC   = float(os.getenv("DB_WRITE_TIMEOUT_SEC", "30"))           # pymysql 소켓 write
+DB_REPLICA_READ_TIMEOUT_SEC = float(os.getenv("DB_REPLICA_READ_TIMEOUT_SEC", "600"))  # 재학습 조회는 길 수 있음
+
+URL_OBJ = URL.create(
+    drivername="mysql+pymysql",
+    username=DB_USER,
+    password=DB_PW,
+    host=DB_URL,
+    port=DB_PORT,
+)
+REPLICA_URL_OBJ = URL_OBJ.set(host=DB_REPLICA_URL, port=DB_REPLICA_PORT) if DB_REPLICA_URL else URL_OBJ
+# 같은 접속 정보로 드라이버만 바꾼 URL — async 엔진은 첫 사용 시 생성되므로 동기 경로는 aiomysql 없이 import 가능
+ASYNC_URL_OBJ = URL_OBJ.set(drivername="mysql+aiomysql")
+
+
+class PoolStats:
+    """역할(primary / replica / async)별 checkout 수와 대기 시간"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0     # 풀에서 연결을 꺼낸 횟수
+        self.connects = 0      # 새 DBAPI 연결 생성 수
+        self.invalidated = 0   # pre-ping 실패 등으로 버린 연결 수
+        self.wait_total = 0.0  # connect() 진입까지 걸린 시간 합 (풀 대기 + 새 연결 / ping 포함)
+        self.wait_max = 0.0
+        self.waits = 0
+
+    def record_wait(self, sec: float):
+        with self._lock:
+            self.waits += 1
+            self.wait_total += sec
+            self.wait_max = max(self.wait_max, sec)
+
+    def count(self, field: str):
+        with self._lock:
+            setattr(self, field, getattr(self, field) + 1)
+
+    def as_dict(self) -> dict:
+        return {
+            "checkouts": self.checkouts,
+            "connects": self.connects,
+            "invalidated": self.invalidated,
+            "wait_ms_avg": round(self.wait_total / self.waits * 1e3, 3) if self.waits else None,
+            "wait_ms_max": round(self.wait_max * 1e3, 3),
+        }
+
+
+class DBPool:
+    """
+    엔진(연결 풀)을 역할별로 첫 사용 시 만들어 프로세스 안에서 공유.
+
+    - primary : API / poller 조회 (짧은 read timeout)
+    - replica : 재학습용 대량 조회 (DB_REPLICA_URL, 긴 read timeout)
+    - async   : API 요청 경로 async 조회 (aiomysql)
+    import 시점에는 연결을 만들지 않으므로, 엔진을 쓰지 않는 프로세스는 풀을 갖지 않는다.
+    fork된 자식 프로세스(스케줄러의 재학습 작업)에서는 부모의 연결을 버리고 새 풀을 만든다.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._engines: dict[str, object] = {}
+        self._stats: dict[str, PoolStats] = {}
+        self._pid = os.getpid()
+
+    # ─── 엔진 ─────────────────────────────────
+    def _check_pid(self):
+        if os.getpid() == self._pid:
+            return
+        with self._lock:
+            if os.getpid() == self._pid:
+                return
+            for eng in self._engines.values():
+                if isinstance(eng, Engine):
+                    eng.dispose(close=False)   # 부모와 공유 중인 소켓은 닫지 않고 참조만 버림
+            self._engines, self._stats, self._pid = {}, {}, os.getpid()
+
+    def _create(self, role: str):
+        options = dict(pool_size=POOL_SIZE, max_overflow=MAX_OVERFLOW, pool_recycle=POOL_RECYCLE_SEC,
+                       pool_pre_ping=POOL_PRE_PING, pool_timeout=DB_CONNECT_TIMEOUT_SEC)
+        if role == "async":
+            from sqlalchemy.ext.asyncio import create_async_engine
+            eng = create_async_engine(ASYNC_URL_OBJ, connect_args={"connect_timeout": DB_CONNECT_TIMEOUT_SEC},
+                                      **options)
+        else:
+            url, read_timeout = ((REPLICA_URL_OBJ, DB_REPLICA_READ_TIMEOUT_SEC) if role == "replica"
+                                 else (URL_OBJ, DB_READ_TIMEOUT_SEC))
+            eng = create_engine(url, connect_args={"connect_timeout": DB_CONNECT_TIMEOUT_SEC,
+                                                   "read_timeout": read_timeout,
+                                                   "write_timeout": DB_WRITE_TIMEOUT_SEC}, **options)
+        logger.info(f"[db] {role} 풀 생성 (size={POOL_SIZE}, overflow={MAX_OVERFLOW}, pid={os.getpid()})")
+        return eng
+
+    def _get(self, role: str):
+        self._check_pid()
+        eng = self._engines.get(role)
+        if eng is None:
+            with self._lock:
+                eng = self._engines.get(role)
+                if eng is None:
+                    eng = self._create(role)
+                    self._instrument(role, eng)
+                    self._engines[role] = eng
+        return eng
+
+    def engine(self, role: str = "primary"):
+        return self._get(role)
+
+    def async_engine(self):
+        return self._get("async")
+
+    def use(self, engine=None, role: str = "primary"):
+        """역할의 엔진을 직접 지정 (벤치 / 테스트에서 SQLite 등으로 교체)"""
+        with self._lock:
+            self._engines[role] = engine
+            self._instrument(role, engine)
+
+    def _instrument(self, role: str, eng):
+        stats = self._stats[role] = PoolStats()
+        target = getattr(eng, "sync_engine", eng)
+        if isinstance(target, Engine):
+            event.listen(target, "checkout", lambda *a: stats.count("checkouts"))
+            event.listen(target, "connect", lambda *a: stats.count("connects"))
+            event.listen(target, "invalidate", lambda *a: stats.count("invalidated"))
+
+    # ─── 연결 ─────────────────────────────────
+    @contextmanager
+    def connect(self, role: str = "primary"):
+        eng = self._get(role)
+        t0 = time.perf_counter()
+        with eng.connect() as conn:
+            self._stats[role].record_wait(time.perf_counter() - t0)
+            yield conn
+
+    @asynccontextmanager
+    async def aconnect(self):
+        eng = self._get("async")
+        t0 = time.perf_counter()
+        async with eng.connect() as conn:
+            self._stats["async"].record_wait(time.perf_counter() - t0)
+            yield conn
+
+    # ─── 상태 / 종료 ───────────────────────────
+    def stats(self) -> dict:
+        result = {}
+        for role, eng in list(self._engines.items()):
+            pool = getattr(getattr(eng, "sync_engine", eng), "pool", None)
+            result[role] = {**self._stats[role].as_dict(),
+                            "pool": pool.status() if pool is not None else None,
+                            "checked_out": pool.checkedout() if hasattr(pool, "checkedout") else None}
+        return result
+
+    async def adispose(self):
+        for role, eng in list(self._engines.items()):
+            dispose = getattr(eng, "dispose", None)
+            if dispose is None:
+                continue
+            result = dispose()
+            if hasattr(result, "__await__"):
+                await result
+        self._engines.clear()
+
+
+db_pool = DBPool()
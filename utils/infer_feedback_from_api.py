@@ -0,0 +1,68 @@
+# utils/infer_feedback_from_api.py >> 병상 API 로그 → model1 전실 피드백
+from collections import defaultdict
+from typing import Iterable
+
+from recommend.hybrid_scheduler import CODE_TO_ICD, make_state_from_snapshot
+from utils.preprocess import WARD_ROUTES, parse_bed_status_counts
+from utils.ward_snapshot import WardSnapshot
+
+
+def reservation_counts(realtime_data: dict) -> dict[tuple[str, str], int]:
+    """
+    스냅샷 1개의 (ICD, 병동명)별 입원예약 병상 수.
+    환자 항목의 dissCd를 CODE_TO_ICD로 ICD에 대응시키고, 그 환자 항목 wardLst의 입원예약 수를 더함
+    (중환자실은 병상 상태 'A' 개수, 일반 병동은 admsApntCct)
+    """
+    counts = defaultdict(int)
+    for ptrm in realtime_data.get("ptrmInfo", []):
+        for ptnt in ptrm.get("ptntDtlsCtrlAllLst", []):
+            icd = CODE_TO_ICD.get(str(ptnt.get("dissCd")))
+            if icd is None:
+                continue
+            for ward in ptnt.get("wardLst", []):
+                route = WARD_ROUTES.get(str(ward.get("wardCd")))
+                if route is None or route[0] is None:
+                    continue
+                ward_name, is_icu = route
+                n = parse_bed_status_counts(ward)["admsApntCct"] if is_icu else int(ward.get("admsApntCct") or 0)
+                if n > 0:
+                    counts[(icd, ward_name)] += n
+    return dict(counts)
+
+
+def _feedbacks(realtime_data: dict, counts: dict, prev_counts: dict | None) -> list[dict]:
+    prev_counts = prev_counts or {}
+    new = {k: n - prev_counts.get(k, 0) for k, n in counts.items() if n > prev_counts.get(k, 0)}
+    if not new:
+        return []
+
+    # eta 계산용: 사건 시점 병상 state (같은 스냅샷의 피드백은 state 객체를 공유)
+    state = make_state_from_snapshot(WardSnapshot.for_model1(realtime_data))
+    ts = realtime_data.get("_timestamp")
+    return [
+        {"icd": icd, "ward": ward, "count": n, "ts": ts, "state": state}
+        for (icd, ward), n in new.items()
+    ]
+
+
+def infer_feedback_from_api(realtime_data: dict, prev_counts: dict | None = None) -> list[dict]:
+    """
+    스냅샷 1개 → HybridScheduler.update_feedback 입력 목록.
+    prev_counts(직전 스냅샷의 reservation_counts)를 주면 그 사이 새로 생긴 예약만 피드백으로 만든다.
+    """
+    return _feedbacks(realtime_data, reservation_counts(realtime_data), prev_counts)
+
+
+def infer_feedback_from_logs(records: Iterable[dict], prev_record: dict | None = None) -> list[dict]:
+    """
+    시간순(reg_dtm ASC) 스냅샷 → 새로 생긴 입원예약만 모은 피드백.
+    같은 예약이 여러 스냅샷에 계속 보여도 한 번만 세도록 직전 스냅샷 대비 증가분만 사용하며,
+    prev_record(구간 직전 스냅샷)를 주면 구간 시작 시점에 이미 있던 예약도 제외한다.
+    """
+    feedbacks = []
+    prev_counts = reservation_counts(prev_record) if prev_record else None
+    for record in records:
+        counts = reservation_counts(record)
+        feedbacks.extend(_feedbacks(record, counts, prev_counts))
+        prev_counts = counts
+    return feedbacks
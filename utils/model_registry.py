@@ -0,0 +1,169 @@
+# utils/model_registry.py >> 프로세스 전역 모델 레지스트리
+import asyncio
+import hashlib
+import logging
+import os
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from io import BytesIO
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, BinaryIO, Callable
+
+from joblib import load
+
+from utils.ncp_client import download_file_from_ncp
+
+logger = logging.getLogger(__name__)
+
+WATCH_INTERVAL_SEC = float(os.getenv("MODEL_WATCH_SEC", "60"))
+
+
+@dataclass(frozen=True)
+class LoadedModel:
+    """
+    레지스트리가 내어주는 모델 참조 (교체는 새 인스턴스로만 이뤄짐).
+    artifact는 요청 · 스레드 간에 공유되므로 읽기 전용 — 고쳐야 하면 복사본을 만들어 씀 (예: HybridScheduler.copy())
+    """
+    name: str
+    version: str          # 아티팩트 내용 해시 (sha256 앞 12자리)
+    artifact: Any
+    path: Path
+    mtime_ns: int
+    size: int
+    loaded_at: datetime
+
+
+@dataclass(frozen=True)
+class ModelSpec:
+    name: str
+    local_path: Path
+    ncp_key: str | None = None
+    loader: Callable[[BinaryIO], Any] = load    # 파일 내용(BytesIO) → 아티팩트
+    fetch: Callable[[Path], None] | None = None   # 로컬에 없을 때 파일을 받아오는 함수 (기본: ncp_key 다운로드)
+
+
+def _freeze(artifact: Any) -> Any:
+    """
+    dict 번들은 읽기 전용 뷰로 감싸서 공유 중 키 교체/삭제를 막음.
+    안쪽의 모델 객체 / list / dict는 감싸지 않으므로 (pandas 열 목록 등으로 그대로 쓰임) 호출자가 고치지 않아야 함.
+    """
+    if isinstance(artifact, dict):
+        return MappingProxyType(dict(artifact))
+    return artifact
+
+
+class ModelRegistry:
+    """
+    모델 아티팩트를 프로세스당 한 번만 로딩해서 공유하는 레지스트리.
+    요청 경로에서는 get()이 이미 로딩된 LoadedModel을 dict 조회로 반환한다.
+    반환된 artifact는 모든 요청이 같은 객체를 쓰므로 읽기 전용으로 다룬다 (재학습 등은 새 객체를 만들어 파일로 교체).
+    """
+
+    def __init__(self):
+        self._specs: dict[str, ModelSpec] = {}
+        self._models: dict[str, LoadedModel] = {}
+        self._failed: dict[str, tuple[int, int]] = {}   # 로딩에 실패한 파일의 (mtime, size)
+        self._lock = threading.Lock()
+
+    def register(self, name: str, local_path: Path, ncp_key: str | None = None,
+                 loader: Callable[[BinaryIO], Any] = load, fetch: Callable[[Path], None] | None = None):
+        self._specs[name] = ModelSpec(name, Path(local_path), ncp_key, loader, fetch)
+
+    def _load(self, spec: ModelSpec) -> LoadedModel:
+        if not spec.local_path.exists():
+            if spec.fetch is not None:
+                logger.info(f"[registry] {spec.name} 로컬에 없음 → 가져오는 중")
+                spec.fetch(spec.local_path)
+            elif not spec.ncp_key:
+                raise FileNotFoundError(f"{spec.name} 모델 파일이 없습니다: {spec.local_path}")
+            else:
+                logger.info(f"[registry] {spec.name} 로컬에 없음 → NCP에서 다운로드 중")
+                download_file_from_ncp(spec.ncp_key, str(spec.local_path))
+
+        # 한 번 읽은 바이트로 해시와 로딩을 함께 → 그 사이 파일이 교체돼도 version과 아티팩트가 일치
+        with open(spec.local_path, "rb") as f:
+            stat = os.fstat(f.fileno())
+            raw = f.read()
+        model = LoadedModel(
+            name=spec.name,
+            version=hashlib.sha256(raw).hexdigest()[:12],
+            artifact=_freeze(spec.loader(BytesIO(raw))),
+            path=spec.local_path,
+            mtime_ns=stat.st_mtime_ns,
+            size=stat.st_size,
+            loaded_at=datetime.now(),
+        )
+        logger.info(f"[registry] {spec.name} 로딩 완료 (version={model.version})")
+        return model
+
+    def get(self, name: str) -> LoadedModel:
+        model = self._models.get(name)
+        if model is not None:
+            return model
+
+        with self._lock:
+            model = self._models.get(name)
+            if model is None:
+                if name not in self._specs:
+                    raise KeyError(f"등록되지 않은 모델입니다: {name}")
+                model = self._load(self._specs[name])
+                self._models[name] = model
+        return model
+
+    def reload_if_changed(self, name: str) -> bool:
+        """
+        모델 파일의 (mtime, size)가 바뀌었으면 새 아티팩트를 로딩한 뒤 한 번에 교체.
+        로딩은 호출한 스레드(watcher)에서 끝까지 마친 뒤 dict 항목만 바꾸므로,
+        요청 쪽은 기존 LoadedModel을 계속 쓰다가 다음 get()부터 새 버전을 받는다.
+        """
+        current = self._models.get(name)
+        spec = self._specs[name]
+        try:
+            stat = spec.local_path.stat()
+        except FileNotFoundError:
+            return False
+        signature = (stat.st_mtime_ns, stat.st_size)
+        if current is not None and signature == (current.mtime_ns, current.size):
+            return False
+        if self._failed.get(name) == signature:
+            return False
+
+        try:
+            new = self._load(spec)
+        except Exception:
+            self._failed[name] = signature
+            raise
+        with self._lock:
+            self._models[name] = new
+        if current is not None and new.version != current.version:
+            logger.info(f"[registry] {name} 교체: {current.version} → {new.version}")
+        return True
+
+    def refresh(self):
+        """이미 로딩된 모델들의 파일 변경을 확인해서 교체 (실패 시 기존 모델 유지)"""
+        for name in list(self._models):
+            try:
+                self.reload_if_changed(name)
+            except Exception as e:
+                logger.warning(f"[registry] {name} 재로딩 실패, 기존 버전 유지: {e}")
+
+    async def watch(self, interval: float = WATCH_INTERVAL_SEC):
+        while True:
+            await asyncio.sleep(interval)
+            await asyncio.to_thread(self.refresh)
+
+    def preload(self):
+        """등록된 모델을 미리 로딩 (실패한 모델은 첫 요청 때 다시 시도)"""
+        for name in list(self._specs):
+            try:
+                self.get(name)
+            except Exception as e:
+                logger.warning(f"[registry] {name} 사전 로딩 실패: {e}")
+
+    def versions(self) -> dict[str, str]:
+        return {name: m.version for name, m in self._models.items()}
+
+
+model_registry = ModelRegistry()
@@ -1,4 +1,9 @@
 # utils/preprocess.py
+from collections import Counter
+from itertools import repeat
+from types import MappingProxyType
+from typing import Mapping, NamedTuple
+
 import pandas as pd
 
 # ─── 병동 코드 목록 ─────────────────────────────
@@ -30,58 +35,67 @@ WARD_CD_TO_NAME = {
 
 MODEL23_WARD_CODES = ["105380","106250", "106260", "106270", "106280", "113870"]
 
+# ─── 병상 상태 코드 → 카운터 클래스 ─────────────────────────
+BED_STATUS_KEYS = ("embdCct", "dschCct", "admsApntCct", "useSckbCnt", "chupCct")
+BED_STATUS_CLASS = {
+    "Y": 0,   # embdCct
+    "P": 1,   # dschCct
+    "A": 2,   # admsApntCct
+    "N": 3,   # useSckbCnt
+    "W": 3,   # useSckbCnt
+    "C": 4,   # chupCct
+}
+
 # ─── 병상 상태 기반 공통 필드 파싱 ─────────────────────────
 def parse_bed_status_counts(ward: dict) -> dict:
     """
-    ward['trasItemLst']에서 병상 상태 코드별 카운트 계산
+    ward['trasItemLst']에서 병상 상태 코드별 카운트 계산.
+    상태 코드를 Counter(C 구현)로 한 번에 집계한 뒤 코드 종류(≤ 수 개)만큼만
+    클래스별로 합산하므로, 병상 수만큼 if/elif 분기를 타지 않는다.
     """
-    status_counts = {
-        "embdCct": 0,       # Y
-        "dschCct": 0,       # P
-        "admsApntCct": 0,   # A
-        "useSckbCnt": 0,    # N, W
-        "chupCct": 0        # C
-    }
-
-    for item in ward.get("trasItemLst", []):
-        code = item.get("ptrmUseDvsnCd")
-        if code == "Y":
-            status_counts["embdCct"] += 1
-        elif code == "P":
-            status_counts["dschCct"] += 1
-        elif code == "A":
-            status_counts["admsApntCct"] += 1
-        elif code in {"N", "W"}:
-            status_counts["useSckbCnt"] += 1
-        elif code == "C":
-            status_counts["chupCct"] += 1
+    class_counts = [0] * len(BED_STATUS_KEYS)
+    items = ward.get("trasItemLst", [])
+    for code, n in Counter(map(dict.get, items, repeat("ptrmUseDvsnCd"))).items():
+        cls = BED_STATUS_CLASS.get(code)
+        if cls is not None:
+            class_counts[cls] += n
 
     return {
         "wardCd": ward.get("wardCd"),
         "wardNm": ward.get("wardNm"),
-        **status_counts
+        **dict(zip(BED_STATUS_KEYS, class_counts))
     }
 
-# ─── 모델 1 전용 파서 ─────────────────────────────
-def parse_model1_input(realtime_data: dict) -> list[dict]:
-    """
-    모델 1: 병동 이름 기반 + 중환자실 병상 상태 파싱
-    """
-    result = []
+# ─── 병동 코드 조회 테이블 (import 시 1회 생성) ─────────────
+# wardCd → (모델1 병동명 | None, 모델2/3 대상 여부)
+WARD_ROUTES = {
+    ward_cd: (WARD_CD_TO_NAME.get(ward_cd), ward_cd in MODEL23_WARD_CODES)
+    for ward_cd in set(WARD_CD_TO_NAME) | set(MODEL23_WARD_CODES)
+}
+
+class ParsedSnapshot(NamedTuple):
+    """스냅샷 저장소가 요청 간에 공유하므로 읽기 전용 (tuple × 읽기 전용 row)"""
+    model1: tuple[Mapping, ...]    # 병동명('ward') 기준 병상 현황
+    model23: tuple[Mapping, ...]   # 중환자실 병동코드('ward_code') 기준 병상 현황
+
+# ─── 통합 파서: 스냅샷 1회 순회로 모델 1 / 모델 2·3 입력 동시 생성 ─────
+def parse_snapshot(realtime_data: dict) -> ParsedSnapshot:
+    model1, model23 = [], []
     for ptrm in realtime_data.get("ptrmInfo", []):
         for ptnt in ptrm.get("ptntDtlsCtrlAllLst", []):
             for ward in ptnt.get("wardLst", []):
                 ward_cd = str(ward.get("wardCd"))
-                MODEL1_WARD_CODES = set(WARD_CD_TO_NAME.keys())
-                if ward_cd in MODEL1_WARD_CODES:
-                    ward_name = WARD_CD_TO_NAME.get(ward_cd)
-                    if not ward_name:
-                        continue
-
-                    # 중환자실이면 상태 기반 파싱
-                    if ward_cd in MODEL23_WARD_CODES:
-                        parsed = parse_bed_status_counts(ward)
-                        parsed["ward"] = ward_name  # 모델에서 요구하는 'ward' 컬럼
+                route = WARD_ROUTES.get(ward_cd)
+                if route is None:
+                    continue
+                ward_name, is_icu = route
+
+                # 중환자실이면 상태 기반 파싱 (모델 1, 2·3 공용 — 병상 목록은 1회만 집계)
+                counts = parse_bed_status_counts(ward) if is_icu else None
+
+                if ward_name:
+                    if is_icu:
+                        parsed = {**counts, "ward": ward_name}  # 모델에서 요구하는 'ward' 컬럼
                     else:
                         parsed = {
                             "ward": ward_name,
@@ -91,33 +105,31 @@ def parse_model1_input(realtime_data: dict) -> list[dict]:
                             "admsApntCct": ward.get("admsApntCct", 0),
                             "chupCct": ward.get("chupCct", 0),
                         }
-                    result.append(parsed)
-    return result
+                    model1.append(parsed)
+
+                if is_icu:
+                    model23.append({**counts, "ward_code": ward_cd})
+    return ParsedSnapshot(tuple(map(MappingProxyType, model1)), tuple(map(MappingProxyType, model23)))
+
+def get_parsed_snapshot(realtime_data: dict) -> ParsedSnapshot:
+    """스냅샷 저장소가 미리 파싱해 둔 결과(`_parsed`)가 있으면 재사용, 없으면 파싱해서 붙여 둠"""
+    parsed = realtime_data.get("_parsed")
+    if parsed is None:
+        parsed = realtime_data["_parsed"] = parse_snapshot(realtime_data)
+    return parsed
+
+# ─── 모델 1 전용 파서 ─────────────────────────────
+def parse_model1_input(realtime_data: dict) -> list[dict]:
+    """
+    모델 1: 병동 이름 기반 + 중환자실 병상 상태 파싱 (호출자가 고쳐도 공유 파싱 결과에는 영향 없도록 복사본)
+    """
+    return [dict(row) for row in get_parsed_snapshot(realtime_data).model1]
 
 
 # ─── 모델 2 & 3 전용 파서 ────────────────────────
 
 def parse_model23_input(realtime_data: dict) -> list[dict]:
-    results = []
-    try:
-        for ptrm in realtime_data.get("ptrmInfo", []):
-            #print(" ptrmDvsnCd:", ptrm.get("ptrmDvsnCd"))
-            for ptnt in ptrm.get("ptntDtlsCtrlAllLst", []):
-                for ward in ptnt.get("wardLst", []):
-                    ward_cd = str(ward.get("wardCd"))
-                    #print("wardCd 탐색:", ward_cd)
-
-                    if ward_cd in MODEL23_WARD_CODES:
-                        parsed = parse_bed_status_counts(ward)
-                        parsed["ward_code"] = ward_cd #6월 23일 추가
-
-                        #print(" 병상 파싱 성공:", parsed)
-                        results.append(parsed)
-    except Exception as e:
-        #print(" parse_model23_input 내부 에러:", e)
-        raise e
-
-    return results
+    return [dict(row) for row in get_parsed_snapshot(realtime_data).model23]
 
 # ─── 모델 2 전용 파생 변수 생성 ───────────────────
 def generate_model2_features(df_today, df_lag1, df_lag7, target_date):
@@ -0,0 +1,93 @@
+# utils/response_cache.py >> 스냅샷 / 모델 버전 기준 응답 캐시 (LRU + ETag)
+import hashlib
+import os
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Hashable
+
+from fastapi.responses import JSONResponse
+
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "256"))
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    body: bytes   # JSONResponse와 같은 방식으로 직렬화한 본문
+    etag: str
+
+
+def render(content: dict) -> CachedResponse:
+    body = JSONResponse(content=content).body
+    return CachedResponse(body, '"' + hashlib.sha256(body).hexdigest()[:20] + '"')
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """If-None-Match 헤더(쉼표 목록, W/ 약한 비교, *)가 etag와 맞는지"""
+    if not if_none_match:
+        return False
+    tags = [t.strip().removeprefix("W/") for t in if_none_match.split(",")]
+    return "*" in tags or etag in tags
+
+
+class ResponseCache:
+    """
+    (엔드포인트, 입력, 스냅샷 reg_dtm, 날짜, 모델 버전) → 직렬화된 응답 본문.
+
+    - 예측은 새 스냅샷이 들어오거나 모델이 교체될 때만 바뀌므로 key에 버전을 넣어 두면 무효화가 따로 필요 없음
+      (이전 버전 항목은 더 이상 조회되지 않다가 LRU로 밀려남)
+    - 최대 max_entries개, 넘치면 가장 오래 쓰지 않은 항목부터 제거
+    - ETag는 본문 해시 → 버전이 바뀌어도 결과가 같으면 클라이언트는 계속 304를 받음
+    - 이벤트 루프에서만 접근하므로 lock 없음
+    """
+
+    def __init__(self, max_entries: int = RESPONSE_CACHE_SIZE):
+        self.max_entries = max(0, max_entries)
+        self._entries: OrderedDict[Hashable, CachedResponse] = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.not_modified = 0
+
+    def get(self, key: Hashable) -> CachedResponse | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(self, key: Hashable, entry: CachedResponse) -> CachedResponse:
+        if self.max_entries == 0:
+            return entry
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self.bytes -= len(old.body)
+        self._entries[key] = entry
+        self.bytes += len(entry.body)
+        while len(self._entries) > self.max_entries:
+            _, evicted = self._entries.popitem(last=False)
+            self.bytes -= len(evicted.body)
+            self.evictions += 1
+        return entry
+
+    def clear(self):
+        self._entries.clear()
+        self.bytes = 0
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "bytes": self.bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            "evictions": self.evictions,
+            "not_modified": self.not_modified,
+        }
+
+
+response_cache = ResponseCache()
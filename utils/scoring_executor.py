@@ -0,0 +1,58 @@
+# utils/scoring_executor.py >> 추천 계산(CPU) 전용 bounded executor
+import asyncio
+import functools
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+# 동시에 계산하는 요청 수 / 그 뒤에서 기다릴 수 있는 요청 수
+SCORING_WORKERS = int(os.getenv("SCORING_WORKERS", str(min(4, os.cpu_count() or 1))))
+SCORING_QUEUE = int(os.getenv("SCORING_QUEUE", str(SCORING_WORKERS * 8)))
+
+
+class ScoringExecutor:
+    """
+    피처 생성 · 모델 추론 같은 동기 계산을 이벤트 루프 밖 고정 크기 스레드 풀에서 실행.
+
+    - 이벤트 루프는 계산을 기다리는 동안 다른 요청(DB 조회, health-check)을 계속 처리
+    - 실행 중 + 대기 중 요청 수를 workers + queue로 제한 → 몰릴 때는 루프 안에서(async) 순서를 기다림
+    - numpy / pandas 연산은 GIL을 놓는 구간이 있어 workers > 1이면 계산끼리도 일부 겹침
+    """
+
+    def __init__(self, workers: int = SCORING_WORKERS, queue: int = SCORING_QUEUE):
+        self.workers = max(1, workers)
+        self.limit = self.workers + max(0, queue)
+        self._pool: ThreadPoolExecutor | None = None
+        self._slots = asyncio.Semaphore(self.limit)
+        self.in_flight = 0   # 슬롯을 잡은 요청 수 (실행 중 + 풀 대기)
+        self.waiting = 0     # 슬롯을 기다리는 요청 수
+
+    def _executor(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="scoring")
+        return self._pool
+
+    async def run(self, fn, *args, **kwargs):
+        self.waiting += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self.waiting -= 1
+        self.in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor(), functools.partial(fn, *args, **kwargs))
+        finally:
+            self.in_flight -= 1
+            self._slots.release()
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+            logger.info("[scoring] executor 종료")
+
+
+scoring_executor = ScoringExecutor()
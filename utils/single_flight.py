@@ -0,0 +1,49 @@
+# utils/single_flight.py >> 동일한 동시 요청을 계산 1회로 합치는 single-flight
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Hashable
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """
+    같은 key로 동시에 들어온 요청들이 진행 중인 계산 하나를 공유.
+
+    - 첫 요청(leader)이 계산을 별도 task로 시작하고, 끝나기 전에 같은 key로 온 요청(follower)은 그 task를 기다림
+    - 결과(또는 예외)는 모두에게 같은 객체로 전달 → 호출 쪽은 결과를 수정하지 않고 새 응답 본문을 만들어야 함
+    - 계산이 끝나면 key를 바로 지움 → 결과 캐시가 아니며, 이후 요청은 새로 계산
+    - 요청 하나가 취소(클라이언트 연결 끊김)되어도 shield로 감싸 두어 공유 계산은 계속 진행
+    """
+
+    def __init__(self):
+        self._calls: dict[Hashable, asyncio.Task] = {}
+        self.leaders = 0     # 실제로 계산을 시작한 요청 수
+        self.followers = 0   # 진행 중인 계산에 합류한 요청 수
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda t, k=key: self._forget(k, t))
+            self.leaders += 1
+        else:
+            self.followers += 1
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Hashable, task: asyncio.Task):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled() and task.exception() is not None:
+            logger.debug(f"[single-flight] {key} 계산 실패: {task.exception()}")
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+    def stats(self) -> dict[str, int]:
+        return {"in_flight": self.in_flight, "leaders": self.leaders, "followers": self.followers}
+
+
+single_flight = SingleFlight()
@@ -0,0 +1,216 @@
+# utils/snapshot_store.py >> 실시간 병상 스냅샷 in-memory 저장소
+import asyncio
+import logging
+import os
+import threading
+from datetime import date, datetime, timedelta
+
+from utils.db_loader import (
+    aget_latest_realtime_data,
+    aget_realtime_data_for_days,
+    get_latest_realtime_data,
+    get_realtime_data_for_days,
+    get_realtime_data_since,
+    log_breaker,
+)
+from utils.preprocess import parse_snapshot
+
+logger = logging.getLogger(__name__)
+
+# 추천 모델들이 참조하는 날짜 offset (today / lag1 / lag7)
+DEFAULT_OFFSETS = [0, 1, 7]
+POLL_INTERVAL_SEC = float(os.getenv("SNAPSHOT_POLL_SEC", "30"))
+# 갱신 1회 제한 시간 (poller 스레드의 동기 조회가 멈춰도 다음 주기를 막지 않도록)
+REFRESH_TIMEOUT_SEC = float(os.getenv("SNAPSHOT_REFRESH_TIMEOUT_SEC", "20"))
+# 최신 스냅샷이 이보다 오래되면 응답에 stale 표시
+STALE_AFTER_SEC = float(os.getenv("SNAPSHOT_STALE_SEC", "600"))
+
+
+def _with_parsed(row: dict) -> dict:
+    try:
+        row["_parsed"] = parse_snapshot(row)
+    except Exception as e:
+        logger.warning(f"[snapshot] 스냅샷 사전 파싱 실패 (요청 시 다시 파싱): {e}")
+    return row
+
+
+class SnapshotStore:
+    """
+    tb_api_log 병상 스냅샷을 메모리에 유지하는 저장소.
+
+    - 백그라운드 poller가 reg_dtm 증분만 조회해서 최신 스냅샷과 날짜별 이력을 갱신
+    - 추천 요청은 DB 대신 이 저장소에서 읽음 (poller가 아직 준비되지 않았으면 DB fallback)
+    - API 요청 경로는 alatest / aget_days(async 조회)로 fallback해 이벤트 루프를 막지 않고,
+      조회 결과는 저장소에 채워 두어 이어지는 동기 조회(latest / get_days)도 메모리에서 끝남
+    - 이력은 offsets에 해당하는 날짜만 보관하고, 날짜가 바뀌면 필요한 날짜를 다시 채움
+    - poller는 저장 시점에 스냅샷을 1회 파싱해 `_parsed`로 붙여 두므로 요청 경로에서는 JSON을 다시 순회하지 않음
+      (요청 경로 fallback으로 채운 스냅샷은 scoring_executor 안에서 처음 쓰일 때 파싱되어 `_parsed`가 붙음)
+    - DB가 느리거나 죽으면(timeout / breaker open) 마지막으로 받은 날짜 기준 이력으로 응답하고 (stale),
+      DB 재시도는 poller의 주기 갱신 1건이 맡음
+    - stale 여부는 저장소 상태 플래그가 아니라 alatest / aget_days가 데이터와 함께 (data, stale)로 돌려줌
+      (동시 요청 / poller 갱신이 다른 요청의 stale 표시를 바꾸지 않도록)
+    """
+
+    def __init__(self, offsets: list[int] = DEFAULT_OFFSETS):
+        self.offsets = sorted(set(offsets))
+        self._lock = threading.Lock()
+        self._days: dict[date, list[dict]] = {}   # 날짜별 스냅샷 (reg_dtm DESC)
+        self._latest: dict | None = None
+        self._task: asyncio.Task | None = None
+        self.ready = False
+
+    # ─── 조회 ─────────────────────────────────
+    @property
+    def version(self) -> datetime | None:
+        """현재 보관 중인 최신 스냅샷의 reg_dtm"""
+        latest = self._latest
+        return latest.get("_timestamp") if latest else None
+
+    def age(self) -> float | None:
+        """최신 스냅샷 reg_dtm 이후 지난 시간(초)"""
+        version = self.version
+        return (datetime.now() - version).total_seconds() if version else None
+
+    @property
+    def stale(self) -> bool:
+        return self._stale_at(self._latest)
+
+    @staticmethod
+    def _stale_at(latest: dict | None) -> bool:
+        """DB breaker가 열려 있거나 latest의 reg_dtm이 STALE_AFTER_SEC보다 오래됐는지"""
+        version = latest.get("_timestamp") if latest else None
+        age = (datetime.now() - version).total_seconds() if version else None
+        return not log_breaker.closed or (age is not None and age > STALE_AFTER_SEC)
+
+    def _stale_days(self, offsets: list[int], error: Exception) -> dict[int, list[dict]]:
+        """DB 조회 실패 시: 보관 중인 가장 최근 날짜를 today로 보고 offset 이력을 구성 (없으면 원래 예외)"""
+        with self._lock:
+            days = self._days
+        if not days:
+            raise error
+        base = max(days)
+        if any(base - timedelta(days=n) not in days for n in offsets):
+            raise error
+        logger.warning(f"[snapshot] 병상 로그 조회 실패 → {base} 기준 이전 이력으로 응답: {error!r}")
+        return {n: days[base - timedelta(days=n)] for n in offsets}
+
+    def latest(self) -> dict:
+        latest = self._latest   # poller 또는 alatest가 채운 값
+        if latest is not None:
+            return latest
+        return get_latest_realtime_data()
+
+    def get_days(self, offsets: list[int]) -> dict[int, list[dict]]:
+        """{offset: [json, ...]} — get_realtime_data_for_days와 동일한 형태"""
+        today = datetime.now().date()
+        with self._lock:
+            days = self._days
+        wanted = {n: today - timedelta(days=n) for n in offsets}
+        if any(d not in days for d in wanted.values()):
+            try:
+                return get_realtime_data_for_days(offsets)
+            except Exception as e:
+                return self._stale_days(offsets, e)
+        return {n: days[d] for n, d in wanted.items()}
+
+    # ─── 조회 (async, API 요청 경로) ───────────────
+    async def alatest(self) -> tuple[dict, bool]:
+        """(최신 스냅샷, stale)"""
+        latest = self._latest
+        if latest is None:
+            latest = await aget_latest_realtime_data()
+            self._seed(latest=latest)
+        return latest, self._stale_at(latest)
+
+    async def aget_days(self, offsets: list[int]) -> tuple[dict[int, list[dict]], bool]:
+        """
+        (get_days와 같은 결과, stale) — 저장소에 없는 날짜만 async로 조회 (파싱은 계산과 함께 scoring_executor에서).
+        DB 조회 실패로 이전 이력을 돌려줄 때는 stale=True.
+        """
+        today = datetime.now().date()
+        with self._lock:
+            days = self._days
+        wanted = {n: today - timedelta(days=n) for n in offsets}
+        missing = [n for n, d in wanted.items() if d not in days]
+        fetched = {}
+        if missing:
+            try:
+                fetched = await aget_realtime_data_for_days(missing, base_date=today)
+            except Exception as e:
+                return self._stale_days(offsets, e), True
+            self._seed(days={today - timedelta(days=n): rows for n, rows in fetched.items()})
+        return {n: fetched[n] if n in fetched else days[d] for n, d in wanted.items()}, self.stale
+
+    def _seed(self, latest: dict | None = None, days: dict[date, list[dict]] | None = None):
+        """요청 경로 fallback 결과를 저장소에 채움 (poller가 이미 채운 값은 덮어쓰지 않음)"""
+        today = datetime.now().date()
+        keep = {today - timedelta(days=n) for n in self.offsets}
+        with self._lock:
+            if latest is not None and self._latest is None:
+                self._latest = latest
+            added = {d: rows for d, rows in (days or {}).items() if d in keep and d not in self._days}
+            if added:
+                self._days = {**self._days, **added}
+
+    # ─── 갱신 ─────────────────────────────────
+    def refresh(self):
+        """증분 조회 1회 (동기 함수 — poller가 스레드에서 실행)"""
+        today = datetime.now().date()
+        wanted = {today - timedelta(days=n) for n in self.offsets}
+
+        with self._lock:
+            # 첫 갱신은 요청 경로가 채워 둔 값(_seed)을 믿지 않고 전부 다시 조회
+            days = dict(self._days) if self.ready else {}
+            latest = self._latest if self.ready else None
+
+        if latest is None:
+            latest = _with_parsed(get_latest_realtime_data())
+        else:
+            for row in reversed(get_realtime_data_since(latest["_timestamp"])):
+                row = _with_parsed(row)
+                d = row["_timestamp"].date()
+                if d in days:
+                    days[d] = [row] + days[d]
+                latest = row
+
+        missing = sorted((today - d).days for d in wanted if d not in days)
+        if missing:
+            for n, rows in get_realtime_data_for_days(missing, base_date=today).items():
+                days[today - timedelta(days=n)] = [_with_parsed(row) for row in rows]
+
+        with self._lock:
+            self._days = {d: rows for d, rows in days.items() if d in wanted}
+            self._latest = latest
+        self.ready = True
+
+    async def run(self, interval: float = POLL_INTERVAL_SEC, timeout: float = REFRESH_TIMEOUT_SEC):
+        loop = asyncio.get_running_loop()
+        refreshing = None
+        while True:
+            # 이전 갱신이 아직 멈춰 있으면 새로 시작하지 않고 계속 기다림 (DB 재시도는 항상 1건)
+            if refreshing is None or refreshing.done():
+                refreshing = loop.run_in_executor(None, self.refresh)
+            done, _ = await asyncio.wait({refreshing}, timeout=timeout)
+            if not done:
+                logger.warning(f"[snapshot] 병상 스냅샷 갱신이 {timeout:.0f}초 안에 끝나지 않음")
+                log_breaker.record_failure()
+            elif refreshing.exception() is not None:
+                logger.warning(f"[snapshot] 병상 스냅샷 갱신 실패: {refreshing.exception()}")
+            await asyncio.sleep(interval)
+
+    def start(self, interval: float = POLL_INTERVAL_SEC) -> asyncio.Task:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run(interval))
+        return self._task
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+snapshot_store = SnapshotStore()
@@ -0,0 +1,122 @@
+# utils/ward_snapshot.py >> 병동 병상 현황의 고정 슬롯 배열 표현
+import numpy as np
+import pandas as pd
+
+from utils.preprocess import WARD_CD_TO_NAME, MODEL23_WARD_CODES, get_parsed_snapshot
+
+# ─── 병상 상태 카운터 (열 인덱스 고정) ─────────────────
+COUNT_COLS = ("embdCct", "dschCct", "useSckbCnt", "admsApntCct", "chupCct")
+EMBD, DSCH, USE, ADMS, CHUP = range(len(COUNT_COLS))
+
+# ─── 병동 슬롯 (import 시 1회 생성) ─────────────────────
+WARD_CODES = tuple(sorted(set(WARD_CD_TO_NAME) | set(MODEL23_WARD_CODES)))
+WARD_SLOTS = {ward_cd: i for i, ward_cd in enumerate(WARD_CODES)}
+WARD_NAMES = tuple(WARD_CD_TO_NAME.get(ward_cd) for ward_cd in WARD_CODES)
+NAME_SLOTS = {name: WARD_SLOTS[ward_cd] for ward_cd, name in WARD_CD_TO_NAME.items()}
+
+
+class WardSnapshot:
+    """
+    스냅샷 하나의 병동별 병상 카운터 5종을 (병동 슬롯 × 5) int 배열로 보관.
+
+    - counts[slot, col] : WARD_CODES 순서로 고정된 슬롯, COUNT_COLS 순서의 카운터
+    - present[slot]     : 스냅샷에 해당 병동이 있었는지
+    - order             : 스냅샷 안에서 병동이 처음 등장한 순서 (기존 DataFrame 행 순서와 동일)
+    """
+    __slots__ = ("counts", "present", "order", "timestamp")
+
+    def __init__(self, counts: np.ndarray, present: np.ndarray, order: np.ndarray, timestamp=None):
+        self.counts = counts
+        self.present = present
+        self.order = order
+        self.timestamp = timestamp
+
+    @classmethod
+    def from_rows(cls, rows: list[dict], key: str, slots: dict, aggregate: str = "sum",
+                  timestamp=None) -> "WardSnapshot":
+        """
+        파싱된 병동 row 목록 → WardSnapshot.
+        같은 병동이 여러 번 나오면 aggregate="sum"은 합산, "first"는 첫 row만 사용.
+        """
+        counts = np.zeros((len(WARD_CODES), len(COUNT_COLS)), dtype=np.int64)
+        present = np.zeros(len(WARD_CODES), dtype=bool)
+        order = []
+        for row in rows:
+            slot = slots.get(row[key])
+            if slot is None:
+                continue
+            values = [row[c] for c in COUNT_COLS]
+            if not present[slot]:
+                counts[slot] = values
+                present[slot] = True
+                order.append(slot)
+            elif aggregate == "sum":
+                counts[slot] += values
+        return cls(counts, present, np.array(order, dtype=np.intp), timestamp)
+
+    @classmethod
+    def for_model1(cls, realtime_data: dict) -> "WardSnapshot":
+        """모델 1 입력: 병동명 기준, 중복 병동은 합산"""
+        return cls.from_rows(get_parsed_snapshot(realtime_data).model1, "ward", NAME_SLOTS,
+                             aggregate="sum", timestamp=realtime_data.get("_timestamp"))
+
+    @classmethod
+    def for_model23(cls, realtime_data: dict) -> "WardSnapshot":
+        """모델 2·3 입력: 중환자실 병동코드 기준, 중복 병동은 첫 row"""
+        return cls.from_rows(get_parsed_snapshot(realtime_data).model23, "ward_code", WARD_SLOTS,
+                             aggregate="first", timestamp=realtime_data.get("_timestamp"))
+
+    def __bool__(self) -> bool:
+        return bool(self.present.any())
+
+    @property
+    def total_beds(self) -> np.ndarray:
+        return self.counts.sum(axis=1)
+
+    def to_frame(self, key: str = "ward_code") -> pd.DataFrame:
+        """등장 순서대로 병동 row DataFrame 변환 (key="ward"이면 병동명)"""
+        labels = WARD_NAMES if key == "ward" else WARD_CODES
+        df = pd.DataFrame(self.counts[self.order], columns=list(COUNT_COLS))
+        df.insert(0, key, [labels[s] for s in self.order])
+        return df
+
+
+def latest_ward_snapshot(realtime_jsons: list[dict]) -> WardSnapshot | None:
+    """reg_dtm DESC 목록에서 중환자실 병동 row가 있는 가장 최근 스냅샷 (없으면 None)"""
+    for data in realtime_jsons:
+        snap = WardSnapshot.for_model23(data)
+        if snap:
+            return snap
+    return None
+
+
+# ─── 모델 2 파생 변수 (배열 연산) ─────────────────────
+MODEL2_FEATURES = ("free_beds", "occ_rate", "occupancy_change", "occ_rate_lag1", "occ_rate_lag7", "is_weekend")
+
+def model2_features(today: WardSnapshot, lag1: WardSnapshot | None, lag7: WardSnapshot | None,
+                    target_date) -> tuple[list[str], np.ndarray]:
+    """
+    generate_model2_features와 같은 피처를 DataFrame merge 없이 계산.
+    반환: (병동코드 목록, 병동 × MODEL2_FEATURES 행렬) — 행 순서는 today.order
+    """
+    slots = today.order
+    counts = today.counts[slots]
+    total = counts.sum(axis=1)
+    total = np.where(total == 0, 1, total).astype(float)
+    use = counts[:, USE].astype(float)
+
+    def lag_use(lag: WardSnapshot | None) -> np.ndarray:
+        if not lag:
+            return np.zeros(len(slots))
+        return np.where(lag.present[slots], lag.counts[slots, USE], np.nan)
+
+    use_lag1, use_lag7 = lag_use(lag1), lag_use(lag7)
+    X = np.column_stack([
+        counts[:, EMBD],
+        use / total,
+        use - use_lag1,
+        use_lag1 / total,
+        use_lag7 / total,
+        np.full(len(slots), int(target_date.weekday() >= 5)),
+    ]).astype(float)
+    return [WARD_CODES[s] for s in slots], X